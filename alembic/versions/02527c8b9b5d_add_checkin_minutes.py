@@ -0,0 +1,103 @@
+"""add checkin minutes
+
+Revision ID: 02527c8b9b5d
+Revises: aade2215890b
+Create Date: 2026-10-18 17:39:41.555052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '02527c8b9b5d'
+down_revision: Union[str, Sequence[str], None] = 'aade2215890b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same scheme as event_counters_apply: one upsert per statement, a shard per
+# backend, and deltas of events being deleted skipped. A check-in adds one to
+# its minute; moving or clearing checked_in_at takes it back from the old one.
+_APPLY_FUNCTION = """
+CREATE FUNCTION checkin_minutes_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO checkin_minutes (event_id, minute, shard, checked_in)
+        SELECT event_id, date_trunc('minute', checked_in_at), pg_backend_pid() % 8, count(*)
+        FROM new_rows WHERE checked_in_at IS NOT NULL
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (event_id, minute, shard) DO UPDATE
+        SET checked_in = checkin_minutes.checked_in + EXCLUDED.checked_in;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO checkin_minutes (event_id, minute, shard, checked_in)
+        SELECT o.event_id, date_trunc('minute', o.checked_in_at), pg_backend_pid() % 8, -count(*)
+        FROM old_rows o
+        WHERE o.checked_in_at IS NOT NULL
+          AND EXISTS (SELECT 1 FROM events e WHERE e.id = o.event_id)
+        GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (event_id, minute, shard) DO UPDATE
+        SET checked_in = checkin_minutes.checked_in + EXCLUDED.checked_in;
+    ELSE
+        INSERT INTO checkin_minutes (event_id, minute, shard, checked_in)
+        SELECT d.event_id, d.minute, pg_backend_pid() % 8, sum(d.checked_in)
+        FROM (
+            SELECT event_id, date_trunc('minute', checked_in_at) AS minute, 1 AS checked_in
+            FROM new_rows WHERE checked_in_at IS NOT NULL
+            UNION ALL
+            SELECT event_id, date_trunc('minute', checked_in_at), -1
+            FROM old_rows WHERE checked_in_at IS NOT NULL
+        ) d
+        WHERE EXISTS (SELECT 1 FROM events e WHERE e.id = d.event_id)
+        GROUP BY 1, 2
+        HAVING sum(d.checked_in) <> 0
+        ORDER BY 1, 2
+        ON CONFLICT (event_id, minute, shard) DO UPDATE
+        SET checked_in = checkin_minutes.checked_in + EXCLUDED.checked_in;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+_TRIGGERS = {
+    "attendees_minutes_insert": "AFTER INSERT ON attendees REFERENCING NEW TABLE AS new_rows",
+    "attendees_minutes_update": (
+        "AFTER UPDATE ON attendees REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "attendees_minutes_delete": "AFTER DELETE ON attendees REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('checkin_minutes',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('minute', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('checked_in', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'minute', 'shard')
+    )
+    # ### end Alembic commands ###
+
+    op.execute(_APPLY_FUNCTION)
+    for name, when in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {when} FOR EACH STATEMENT EXECUTE FUNCTION checkin_minutes_apply()")
+    op.execute(
+        "INSERT INTO checkin_minutes (event_id, minute, shard, checked_in) "
+        "SELECT event_id, date_trunc('minute', checked_in_at), 0, count(*) FROM attendees "
+        "WHERE checked_in_at IS NOT NULL GROUP BY 1, 2"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON attendees")
+    op.execute("DROP FUNCTION checkin_minutes_apply()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('checkin_minutes')
+    # ### end Alembic commands ###
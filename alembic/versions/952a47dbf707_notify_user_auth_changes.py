@@ -0,0 +1,51 @@
+"""notify user auth changes
+
+Revision ID: 952a47dbf707
+Revises: c20465d7fd94
+Create Date: 2026-10-18 17:44:56.642745
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '952a47dbf707'
+down_revision: Union[str, Sequence[str], None] = 'c20465d7fd94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTIFY user_auth_changed, <user id> when a user is deleted or changes the
+# password or email: every worker drops the user's cached principals (see
+# services.principals). Row-level: these are rare, single-row changes.
+_NOTIFY_FUNCTION = """
+CREATE FUNCTION user_auth_notify() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM pg_notify('user_auth_changed', OLD.id::text);
+    RETURN NULL;
+END
+$$
+"""
+
+_TRIGGERS = {
+    "users_auth_notify_update": (
+        "AFTER UPDATE OF password_hash, email ON users FOR EACH ROW "
+        "WHEN (OLD.password_hash IS DISTINCT FROM NEW.password_hash OR OLD.email IS DISTINCT FROM NEW.email)"
+    ),
+    "users_auth_notify_delete": "AFTER DELETE ON users FOR EACH ROW",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(_NOTIFY_FUNCTION)
+    for name, when in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {when} EXECUTE FUNCTION user_auth_notify()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON users")
+    op.execute("DROP FUNCTION user_auth_notify()")
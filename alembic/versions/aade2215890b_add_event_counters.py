@@ -0,0 +1,104 @@
+"""add event counters
+
+Revision ID: aade2215890b
+Revises: 0721f718ae15
+Create Date: 2026-10-18 17:37:31.477074
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aade2215890b'
+down_revision: Union[str, Sequence[str], None] = '0721f718ae15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Statement-level triggers: one upsert per statement and event, whether the
+# statement touches one attendee (a check-in) or fifty thousand (an import).
+# Each backend writes to its own shard (pid % 8), so concurrent check-ins of
+# one event rarely queue on the same counter row. Deltas of events being
+# deleted are skipped; their counters go with them (ON DELETE CASCADE).
+_APPLY_FUNCTION = """
+CREATE FUNCTION event_counters_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO event_counters (event_id, shard, attendees, checked_in)
+        SELECT event_id, pg_backend_pid() % 8, count(*), count(checked_in_at)
+        FROM new_rows GROUP BY event_id ORDER BY event_id
+        ON CONFLICT (event_id, shard) DO UPDATE
+        SET attendees = event_counters.attendees + EXCLUDED.attendees,
+            checked_in = event_counters.checked_in + EXCLUDED.checked_in;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO event_counters (event_id, shard, attendees, checked_in)
+        SELECT o.event_id, pg_backend_pid() % 8, -count(*), -count(o.checked_in_at)
+        FROM old_rows o
+        WHERE EXISTS (SELECT 1 FROM events e WHERE e.id = o.event_id)
+        GROUP BY o.event_id ORDER BY o.event_id
+        ON CONFLICT (event_id, shard) DO UPDATE
+        SET attendees = event_counters.attendees + EXCLUDED.attendees,
+            checked_in = event_counters.checked_in + EXCLUDED.checked_in;
+    ELSE
+        INSERT INTO event_counters (event_id, shard, attendees, checked_in)
+        SELECT d.event_id, pg_backend_pid() % 8, sum(d.attendees), sum(d.checked_in)
+        FROM (
+            SELECT event_id, 1 AS attendees, (checked_in_at IS NOT NULL)::int AS checked_in
+            FROM new_rows
+            UNION ALL
+            SELECT event_id, -1, -(checked_in_at IS NOT NULL)::int FROM old_rows
+        ) d
+        WHERE EXISTS (SELECT 1 FROM events e WHERE e.id = d.event_id)
+        GROUP BY d.event_id
+        HAVING sum(d.attendees) <> 0 OR sum(d.checked_in) <> 0
+        ORDER BY d.event_id
+        ON CONFLICT (event_id, shard) DO UPDATE
+        SET attendees = event_counters.attendees + EXCLUDED.attendees,
+            checked_in = event_counters.checked_in + EXCLUDED.checked_in;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+_TRIGGERS = {
+    "attendees_counters_insert": "AFTER INSERT ON attendees REFERENCING NEW TABLE AS new_rows",
+    "attendees_counters_update": (
+        "AFTER UPDATE ON attendees REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "attendees_counters_delete": "AFTER DELETE ON attendees REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('event_counters',
+    sa.Column('event_id', sa.UUID(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('attendees', sa.BigInteger(), nullable=False),
+    sa.Column('checked_in', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'shard')
+    )
+    # ### end Alembic commands ###
+
+    op.execute(_APPLY_FUNCTION)
+    for name, when in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {when} FOR EACH STATEMENT EXECUTE FUNCTION event_counters_apply()")
+    op.execute(
+        "INSERT INTO event_counters (event_id, shard, attendees, checked_in) "
+        "SELECT event_id, 0, count(*), count(checked_in_at) FROM attendees GROUP BY event_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON attendees")
+    op.execute("DROP FUNCTION event_counters_apply()")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('event_counters')
+    # ### end Alembic commands ###
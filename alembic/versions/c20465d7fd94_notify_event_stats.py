@@ -0,0 +1,53 @@
+"""notify event stats
+
+Revision ID: c20465d7fd94
+Revises: 02527c8b9b5d
+Create Date: 2026-10-18 17:41:48.048888
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c20465d7fd94'
+down_revision: Union[str, Sequence[str], None] = '02527c8b9b5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# NOTIFY event_stats, <event id> for every event a statement changed. Postgres
+# delivers notifications at commit and folds identical ones of a transaction,
+# so a batch of check-ins is one message per event (see services.stats_stream).
+_NOTIFY_FUNCTION = """
+CREATE FUNCTION event_stats_notify() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('event_stats', event_id::text) FROM (SELECT DISTINCT event_id FROM old_rows) o;
+    ELSE
+        PERFORM pg_notify('event_stats', event_id::text) FROM (SELECT DISTINCT event_id FROM new_rows) n;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+_TRIGGERS = {
+    "attendees_stats_notify_insert": "AFTER INSERT ON attendees REFERENCING NEW TABLE AS new_rows",
+    "attendees_stats_notify_update": "AFTER UPDATE ON attendees REFERENCING NEW TABLE AS new_rows",
+    "attendees_stats_notify_delete": "AFTER DELETE ON attendees REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(_NOTIFY_FUNCTION)
+    for name, when in _TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER {name} {when} FOR EACH STATEMENT EXECUTE FUNCTION event_stats_notify()")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in _TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON attendees")
+    op.execute("DROP FUNCTION event_stats_notify()")
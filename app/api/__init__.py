@@ -1,18 +1,48 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.core.config import settings
+from app.api.deps import admission
 from app.api.routes.auth import router as auth_router
 from app.api.routes.me import router as me_router
 from app.api.routes.events import router as events_router
-from app.api.routes.attendees import router as attendees_router
-from app.api.routes.checkin import router as checkin_router
-from app.api.routes.stats import router as stats_router
 from app.api.routes.scanner import router as scanner_router
+from app.api.routes.checkin_ws import router as checkin_ws_router
+from app.api.routes.devices import router as devices_router
+from app.api.routes.stats_timeline import router as stats_timeline_router
+from app.api.routes.stats_stream import router as stats_stream_router
+from app.api.routes.attendee_import import router as attendee_import_router
+from app.api.routes.attendee_export import router as attendee_export_router
+from app.api.routes.attendee_search import router as attendee_search_router
+from app.api.routes.attendee_qr import router as attendee_qr_router
+
+if settings.DB_ASYNC:
+    from app.api.routes.aio.attendees import router as attendees_router
+    from app.api.routes.aio.checkin import router as checkin_router
+    from app.api.routes.aio.stats import router as stats_router
+else:
+    from app.api.routes.attendees import router as attendees_router
+    from app.api.routes.checkin import router as checkin_router
+    from app.api.routes.stats import router as stats_router
+
+# HTTP routes hold an admission slot while they run; the long-lived websocket and
+# SSE streams do not, or a few open dashboards would turn check-ins away
+admitted = APIRouter(dependencies=[Depends(admission)])
+admitted.include_router(auth_router)
+admitted.include_router(me_router)
+admitted.include_router(events_router)
+admitted.include_router(attendee_import_router)
+# before the attendees router, whose /{attendee_id} would otherwise match these paths
+admitted.include_router(attendee_export_router)
+admitted.include_router(attendee_search_router)
+admitted.include_router(attendee_qr_router)
+admitted.include_router(attendees_router)
+admitted.include_router(checkin_router)
+admitted.include_router(stats_router)
+admitted.include_router(stats_timeline_router)
+admitted.include_router(scanner_router)
+admitted.include_router(devices_router)
 
 api_router = APIRouter(prefix="/api/v1")
-api_router.include_router(auth_router)
-api_router.include_router(me_router)
-api_router.include_router(events_router)
-api_router.include_router(attendees_router)
-api_router.include_router(checkin_router)
-api_router.include_router(stats_router)
-api_router.include_router(scanner_router)
\ No newline at end of file
+api_router.include_router(admitted)
+api_router.include_router(stats_stream_router)
+api_router.include_router(checkin_ws_router)
@@ -1,59 +1,271 @@
+import math
+import secrets
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Literal
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.security import ALGORITHM
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
+from app.models.event import Event
 from app.models.user import User
-
-from typing import Optional
+from app.services.principals import Principal, principal_cache
+from app.services.rate_limit import admission_gate, rate_limiter
+from app.services.scanner_cache import key_digest, scanner_key_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 
+def _credentials_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid authentication credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-def get_current_user_optional(
-    db: Session = Depends(get_db),
-    token: str | None = Depends(oauth2_scheme),
-) -> User | None:
-    if not token:
-        return None
+
+def _decode_claims(token: str) -> tuple[uuid.UUID, float | None] | None:
+    """(user id, exp) of a valid token, None otherwise."""
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
         sub = payload.get("sub")
         if not sub:
             return None
-        user_id = uuid.UUID(sub)
-    except (JWTError, ValueError):
+        exp = payload.get("exp")
+        return uuid.UUID(sub), float(exp) if exp is not None else None
+    except (JWTError, ValueError, TypeError):
+        return None
+
+
+def _remember(
+    token: str, user: User | None, expires_at: float | None, generation: int
+) -> Principal | None:
+    if user is None:
         return None
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, expires_at, generation)
+    return principal
+
+
+def get_current_user_optional(
+    db: Session = Depends(get_db),
+    token: str | None = Depends(oauth2_scheme),
+) -> Principal | None:
+    if not token:
+        return None
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation
+    claims = _decode_claims(token)
+    if claims is None:
+        return None
+    user_id, expires_at = claims
+    return _remember(token, db.get(User, user_id), expires_at, generation)
 
-    user = db.get(User, user_id)
-    return user
 
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
-) -> User:
-    credentials_error = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid authentication credentials",
-        headers={"WWW-Authenticate": "Bearer"},
+) -> Principal:
+    principal = get_current_user_optional(db, token)
+    if principal is None:
+        raise _credentials_error()
+    return principal
+
+
+async def get_current_user_optional_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str | None = Depends(oauth2_scheme),
+) -> Principal | None:
+    if not token:
+        return None
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    generation = principal_cache.generation
+    claims = _decode_claims(token)
+    if claims is None:
+        return None
+    user_id, expires_at = claims
+    return _remember(token, await db.get(User, user_id), expires_at, generation)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    principal = await get_current_user_optional_async(db, token)
+    if principal is None:
+        raise _credentials_error()
+    return principal
+
+
+def _owned(event: Event | None, user_id: uuid.UUID) -> Event:
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.owner_user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+    return event
+
+
+def _user_and_event(user_id: uuid.UUID, event_id: uuid.UUID) -> Select:
+    # one round trip for both: no user row means a bad token, no event half a 404
+    return (
+        select(User, Event)
+        .select_from(User)
+        .outerjoin(Event, Event.id == event_id)
+        .where(User.id == user_id)
     )
 
+
+def get_owned_event(
+    event_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    token: str | None = Depends(oauth2_scheme),
+) -> Event:
+    """
+    The /events/{event_id} event, if the caller owns it (401/404/403
+    otherwise). Authenticates too, so routes need no get_current_user: with
+    the principal cached this is one events lookup, without it one joined
+    users + events query. Like any dependency, it is resolved once per
+    request however many others depend on it.
+    """
+    if not token:
+        raise _credentials_error()
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return _owned(db.get(Event, event_id), principal.id)
+
+    generation = principal_cache.generation
+    claims = _decode_claims(token)
+    if claims is None:
+        raise _credentials_error()
+    user_id, expires_at = claims
+    row = db.execute(_user_and_event(user_id, event_id)).first()
+    if row is None:
+        raise _credentials_error()
+    user, event = row
+    _remember(token, user, expires_at, generation)
+    return _owned(event, user.id)
+
+
+async def get_owned_event_async(
+    event_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    token: str | None = Depends(oauth2_scheme),
+) -> Event:
+    """get_owned_event for the DB_ASYNC routers."""
+    if not token:
+        raise _credentials_error()
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return _owned(await db.get(Event, event_id), principal.id)
+
+    generation = principal_cache.generation
+    claims = _decode_claims(token)
+    if claims is None:
+        raise _credentials_error()
+    user_id, expires_at = claims
+    row = (await db.execute(_user_and_event(user_id, event_id))).first()
+    if row is None:
+        raise _credentials_error()
+    user, event = row
+    _remember(token, user, expires_at, generation)
+    return _owned(event, user.id)
+
+
+def scanner_client(scanner_key: str) -> str:
+    """Rate-limit client of a scanner key that is known to unlock an event."""
+    return f"scanner:{key_digest(scanner_key)}"
+
+
+def _client_key(
+    request: Request, token: str | None, scanner_key: str | None, by: Literal["client", "ip"]
+) -> str:
+    if by == "client":
+        # only keys this worker has seen unlock an event get a bucket of their own:
+        # made-up keys would each start with a full one. A valid key is cached by
+        # its first check-in (or the token index), which is charged to the client IP
+        if scanner_key and scanner_key_cache.peek(scanner_key) is not None:
+            return scanner_client(scanner_key)
+        if token:
+            # the signed claims are enough here, no database needed
+            claims = _decode_claims(token)
+            if claims is not None:
+                return f"user:{claims[0]}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def rate_limit(
+    route: str, by: Literal["client", "ip"] = "client"
+) -> Callable[..., Awaitable[None]]:
+    """
+    Dependency charging the caller's token bucket for `route` (see
+    RATE_LIMIT_* in settings); 429 with Retry-After once it is empty.
+    `by="client"` buckets per known scanner key, then user, then IP;
+    `by="ip"` per client IP only.
+    """
+
+    async def dependency(
+        request: Request,
+        token: str | None = Depends(oauth2_scheme),
+        x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
+    ) -> None:
+        if settings.SCANNER_CACHE_URL:
+            # the scanner key lookup is a Redis round trip: keep it off the event loop
+            client = await run_in_threadpool(_client_key, request, token, x_scanner_key, by)
+        else:
+            client = _client_key(request, token, x_scanner_key, by)
+        wait = await rate_limiter.check_async(route, client)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return dependency
+
+
+async def admission() -> AsyncIterator[None]:
+    """
+    Router-level dependency holding one of the worker's ADMISSION_MAX_IN_FLIGHT
+    slots for the request: resolved before the route's own dependencies, so an
+    overloaded worker answers 503 before touching the database.
+    """
+    if not admission_gate.try_enter():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
-        sub = payload.get("sub")
-        if not sub:
-            raise credentials_error
-        user_id = uuid.UUID(sub)
-    except (JWTError, ValueError):
-        raise credentials_error
-
-    user = db.get(User, user_id)
-    if not user:
-        raise credentials_error
-    return user
+        yield
+    finally:
+        admission_gate.leave()
+
+
+def metrics_access(authorization: str | None = Header(default=None)) -> None:
+    """
+    Router-level dependency of /metrics: counters and pool internals are for
+    operators, so they are served only with "Authorization: Bearer
+    <METRICS_TOKEN>", and not at all (404) while METRICS_TOKEN is unset.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise _credentials_error()
@@ -0,0 +1,5 @@
+"""
+Async twins of the hottest routers, served when settings.DB_ASYNC is on.
+They keep the paths and contracts of their sync counterparts but await an
+AsyncSession instead of holding a threadpool worker while Postgres answers.
+"""
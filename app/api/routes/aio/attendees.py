@@ -0,0 +1,105 @@
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_owned_event_async
+from app.api.routes.attendees import _page_query
+from app.db.session import get_async_db
+from app.models.attendee import Attendee
+from app.schemas.attendee import (
+    AttendeeBulkCreate,
+    AttendeeCreate,
+    AttendeeListOut,
+    AttendeeOut,
+    QRPayloadOut,
+)
+from app.services.attendees import create_attendees
+from app.services.pagination import split_page
+from app.services.token_index import token_index
+
+router = APIRouter(
+    prefix="/events/{event_id}/attendees",
+    tags=["attendees"],
+    dependencies=[Depends(get_owned_event_async)],
+)
+
+
+@router.post("", response_model=AttendeeOut, status_code=201)
+async def create_attendee(
+    event_id: uuid.UUID,
+    payload: AttendeeCreate,
+    db: AsyncSession = Depends(get_async_db),
+) -> Row:
+    (attendee,) = await db.run_sync(create_attendees, event_id, [payload])
+    token_index.add_attendees(event_id, [attendee])
+    return attendee
+
+
+@router.post("/bulk", response_model=list[AttendeeOut], status_code=201)
+async def bulk_create_attendees(
+    event_id: uuid.UUID,
+    payload: AttendeeBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+) -> list[Row]:
+    # one INSERT and one commit for the whole upload; tokens are generated in memory
+    created = await db.run_sync(create_attendees, event_id, payload.attendees)
+    token_index.add_attendees(event_id, created)
+    return created
+
+
+@router.get("", response_model=AttendeeListOut)
+async def list_attendees(
+    event_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    q: str | None = Query(default=None, description="Search by name or email"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=True, description="Also count every match"),
+) -> AttendeeListOut:
+    base_filter = [Attendee.event_id == event_id]
+    if q:
+        like = f"%{q.strip()}%"
+        base_filter.append(or_(Attendee.full_name.ilike(like), Attendee.email.ilike(like)))
+
+    total = None
+    if include_total:
+        total = (
+            await db.scalar(select(func.count()).select_from(Attendee).where(*base_filter)) or 0
+        )
+
+    rows = (await db.scalars(_page_query(base_filter, limit, offset, cursor))).all()
+    items, next_cursor = split_page(rows, limit)
+
+    return AttendeeListOut(
+        items=items, limit=limit, offset=offset, total=total, next_cursor=next_cursor
+    )
+
+
+@router.get("/{attendee_id}", response_model=AttendeeOut)
+async def get_attendee(
+    event_id: uuid.UUID,
+    attendee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> Attendee:
+    attendee = await db.get(Attendee, attendee_id)
+    if not attendee or attendee.event_id != event_id:
+        raise HTTPException(status_code=404, detail="Attendee not found")
+
+    return attendee
+
+
+@router.get("/{attendee_id}/qr", response_model=QRPayloadOut)
+async def get_attendee_qr_payload(
+    event_id: uuid.UUID,
+    attendee_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> QRPayloadOut:
+    attendee = await db.get(Attendee, attendee_id)
+    if not attendee or attendee.event_id != event_id:
+        raise HTTPException(status_code=404, detail="Attendee not found")
+
+    payload = attendee.qr_token
+    return QRPayloadOut(qr_token=attendee.qr_token, payload=payload)
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user_optional_async, rate_limit
+from app.api.routes.checkin import _log, _to_batch_response, _to_response, _to_scans
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.schemas.checkin import (
+    CheckInBatchRequest,
+    CheckInBatchResponse,
+    CheckInRequest,
+    CheckInResponse,
+)
+from app.services.checkin import Scan, check_in_many
+from app.services.group_commit import group_committer
+from app.services.principals import Principal
+
+router = APIRouter(prefix="/checkin", tags=["checkin"])
+
+
+@router.post("", response_model=CheckInResponse, dependencies=[Depends(rate_limit("checkin"))])
+async def checkin(
+    payload: CheckInRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal | None = Depends(get_current_user_optional_async),
+    x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
+) -> CheckInResponse:
+    started = time.perf_counter()
+    scan = Scan(
+        qr_token=payload.qr_token,
+        user_id=user.id if user is not None else None,
+        scanner_key=x_scanner_key,
+        scanned_at=payload.scanned_at,
+    )
+    if settings.CHECKIN_GROUP_COMMIT:
+        # nothing else runs on this session: don't hold a connection while the group commits
+        await db.close()
+        result = await asyncio.wrap_future(group_committer.submit(scan))
+    else:
+        # the check-in engine is shared with the sync router; run_sync drives it
+        # over the async connection without blocking the event loop
+        result = (await db.run_sync(check_in_many, [scan]))[0]
+    _log(result, payload.device_id, started)
+    return _to_response(result)
+
+
+@router.post(
+    "/batch",
+    response_model=CheckInBatchResponse,
+    dependencies=[Depends(rate_limit("checkin_batch"))],
+)
+async def checkin_batch(
+    payload: CheckInBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal | None = Depends(get_current_user_optional_async),
+    x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
+) -> CheckInBatchResponse:
+    started = time.perf_counter()
+    results = await db.run_sync(check_in_many, _to_scans(payload, user, x_scanner_key))
+    for item, result in zip(payload.items, results, strict=True):
+        _log(result, item.device_id, started)
+    return _to_batch_response(payload, results)
@@ -0,0 +1,25 @@
+import uuid
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_owned_event_async
+from app.db.session import get_async_db
+from app.services.event_counters import counts_query
+
+router = APIRouter(prefix="/events", tags=["stats"])
+
+
+@router.get("/{event_id}/stats", dependencies=[Depends(get_owned_event_async)])
+async def event_stats(
+    event_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+) -> dict[str, int]:
+    # trigger-maintained counters: constant cost whatever the event size
+    total, checked_in = (await db.execute(counts_query(event_id))).one()
+
+    return {
+        "total": int(total),
+        "checked_in": int(checked_in),
+        "not_checked_in": int(total - checked_in),
+    }
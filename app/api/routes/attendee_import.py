@@ -0,0 +1,83 @@
+import uuid
+from collections.abc import AsyncIterator, Iterator
+from typing import Literal
+
+import anyio.from_thread
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import get_owned_event
+from app.core.config import settings
+from app.db.session import engine
+from app.schemas.attendee import AttendeeImportOut
+from app.services.attendee_import import (
+    ImportFormatError,
+    ImportReport,
+    import_attendees,
+    parse_csv,
+    parse_ndjson,
+    validate,
+)
+
+router = APIRouter(
+    prefix="/events/{event_id}/attendees",
+    tags=["attendees"],
+    dependencies=[Depends(get_owned_event)],
+)
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+def _blocking_chunks(stream: AsyncIterator[bytes]) -> Iterator[bytes]:
+    """Pulls the request body from a worker thread, one chunk at a time."""
+
+    async def receive() -> bytes | None:
+        try:
+            return await anext(stream)
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := anyio.from_thread.run(receive)) is not None:
+        if chunk:
+            yield chunk
+
+
+@router.post("/import", response_model=AttendeeImportOut)
+async def import_attendees_file(
+    event_id: uuid.UUID,
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(
+        default=None, description="Defaults to the request's Content-Type"
+    ),
+) -> ImportReport:
+    """
+    Imports a guest list streamed as the raw request body: CSV with a header
+    row (full_name, email) or NDJSON ({"full_name", "email"} per line).
+
+    Rows are parsed and validated as they arrive and COPYed into Postgres in
+    batches, so memory stays flat whatever the file size. Valid rows are
+    imported in one transaction; invalid ones are reported by line number.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or _CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format="
+        )
+
+    parse = parse_csv if fmt == "csv" else parse_ndjson
+    report = ImportReport()
+    rows = validate(parse(_blocking_chunks(request.stream())), report)
+    try:
+        report.imported = await run_in_threadpool(
+            import_attendees, engine, event_id, rows, settings.ATTENDEE_IMPORT_BATCH_ROWS
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return report
@@ -0,0 +1,154 @@
+import csv
+import io
+import time
+import uuid
+import zipfile
+from collections.abc import Iterator
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_owned_event
+from app.db.session import engine, get_db
+from app.models.attendee import Attendee
+from app.services.qr_render import MEDIA_TYPES, get_qr_image, qr_cache, render_many
+
+router = APIRouter(
+    prefix="/events/{event_id}/attendees",
+    tags=["attendees"],
+    dependencies=[Depends(get_owned_event)],
+)
+
+# rows fetched per server-side cursor round trip
+FETCH_ROWS = 5_000
+# archive bytes buffered before a chunk is handed to the response
+CHUNK_BYTES = 256 * 1024
+
+ImageFormat = Literal["png", "svg"]
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match compares weakly, so a W/ prefix is ignored
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+@router.get("/{attendee_id}/qr.{fmt}")
+def get_attendee_qr_image(
+    event_id: uuid.UUID,
+    attendee_id: uuid.UUID,
+    fmt: ImageFormat,
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """
+    The attendee's QR code as PNG or SVG. The ETag is derived from the token
+    and the rendering settings, so revalidation (If-None-Match) answers 304
+    without rendering or reading the image cache.
+    """
+    attendee = db.get(Attendee, attendee_id)
+    if not attendee or attendee.event_id != event_id:
+        raise HTTPException(status_code=404, detail="Attendee not found")
+
+    etag = qr_cache.etag(attendee.qr_token, fmt)
+    # private: the image is a credential; no-cache: revalidate, the attendee may be deleted
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        get_qr_image(attendee.qr_token, fmt), media_type=MEDIA_TYPES[fmt], headers=headers
+    )
+
+
+class _ZipStream:
+    """
+    Write-only, unseekable sink for zipfile. Without seek() zipfile writes a
+    data descriptor after each member instead of patching its header, which
+    is what lets the archive go out while it is being built.
+    """
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        self.size = 0
+        return data
+
+
+def _rows(event_id: uuid.UUID, *columns) -> Iterator[tuple]:
+    # its own connection: the request's session is closed before the body is streamed
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=FETCH_ROWS).execute(
+            select(*columns)
+            .where(Attendee.event_id == event_id)
+            .order_by(Attendee.created_at, Attendee.id)
+        )
+        yield from result.tuples()
+
+
+def _archive(event_id: uuid.UUID, fmt: ImageFormat) -> Iterator[bytes]:
+    stream = _ZipStream()
+    date_time = time.localtime()[:6]
+
+    def member(name: str, compress: bool) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=date_time)
+        info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        return info
+
+    with zipfile.ZipFile(stream, "w") as archive:
+        # the manifest comes first (a separate pass) so badges can be mail-merged from it
+        with archive.open(member("attendees.csv", compress=True), "w") as raw:
+            manifest = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+            writer = csv.writer(manifest)
+            writer.writerow(("file", "id", "full_name", "email"))
+            for attendee_id, full_name, email in _rows(
+                event_id, Attendee.id, Attendee.full_name, Attendee.email
+            ):
+                writer.writerow((f"{attendee_id}.{fmt}", attendee_id, full_name, email))
+                if stream.size >= CHUNK_BYTES:
+                    yield stream.take()
+            manifest.flush()
+            manifest.detach()
+
+        # PNGs are already compressed; SVGs deflate well
+        rows = _rows(event_id, Attendee.id, Attendee.qr_token)
+        for attendee_id, image in render_many(rows, fmt):
+            archive.writestr(member(f"{attendee_id}.{fmt}", compress=fmt == "svg"), image)
+            if stream.size >= CHUNK_BYTES:
+                yield stream.take()
+    yield stream.take()
+
+
+@router.get("/qr.zip")
+def get_attendee_qr_archive(
+    event_id: uuid.UUID,
+    format: ImageFormat = Query(default="png"),
+) -> StreamingResponse:
+    """
+    Every attendee's QR code in one ZIP, for printing badges: an
+    attendees.csv manifest, then one image per attendee named by id.
+
+    Images are rendered on a process pool (reusing the image cache) and the
+    archive is streamed as they complete, so memory stays flat and the first
+    bytes go out before the last code is rendered.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="qr-{event_id}.zip"'}
+    return StreamingResponse(
+        _archive(event_id, format), media_type="application/zip", headers=headers
+    )
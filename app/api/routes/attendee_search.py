@@ -0,0 +1,31 @@
+import uuid
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_owned_event
+from app.db.session import get_db
+from app.models.attendee import Attendee
+from app.schemas.attendee import AttendeeOut
+from app.services.attendee_search import search_attendees
+
+router = APIRouter(
+    prefix="/events/{event_id}/attendees",
+    tags=["attendees"],
+    dependencies=[Depends(get_owned_event)],
+)
+
+
+@router.get("/search", response_model=list[AttendeeOut])
+def search(
+    event_id: uuid.UUID,
+    q: str = Query(min_length=1, max_length=200, description="Name or email, as typed so far"),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_db),
+) -> list[Attendee]:
+    """
+    Search-as-you-type for the door: every word is a prefix ("jo sm" finds
+    "John Smith"), best matches first, no total count. Typos are tolerated
+    when the database has pg_trgm.
+    """
+    return search_attendees(db, event_id, q, limit)
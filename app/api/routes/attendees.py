@@ -1,14 +1,12 @@
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, or_, select
+from sqlalchemy import Row, Select, func, or_, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import get_owned_event
 from app.db.session import get_db
 from app.models.attendee import Attendee
-from app.models.event import Event
-from app.models.user import User
 from app.schemas.attendee import (
     AttendeeBulkCreate,
     AttendeeCreate,
@@ -16,18 +14,27 @@ from app.schemas.attendee import (
     AttendeeOut,
     QRPayloadOut,
 )
-from app.services.qr import generate_unique_qr_token
-
-router = APIRouter(prefix="/events/{event_id}/attendees", tags=["attendees"])
+from app.services.attendees import create_attendees
+from app.services.pagination import InvalidCursorError, newest_first, split_page
+from app.services.token_index import token_index
+
+# every route is event-scoped: the caller must own the event
+router = APIRouter(
+    prefix="/events/{event_id}/attendees",
+    tags=["attendees"],
+    dependencies=[Depends(get_owned_event)],
+)
 
 
-def _get_owned_event(db: Session, user: User, event_id: uuid.UUID) -> Event:
-    event = db.get(Event, event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if event.owner_user_id != user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-    return event
+def _page_query(filters: list, limit: int, offset: int, cursor: str | None) -> Select:
+    # the cursor is the fast path for deep pages; offset is kept for existing clients
+    if cursor is not None and offset:
+        raise HTTPException(status_code=400, detail="Pass either cursor or offset, not both")
+    try:
+        stmt = newest_first(select(Attendee).where(*filters), Attendee, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return stmt if cursor is not None else stmt.offset(offset)
 
 
 @router.post("", response_model=AttendeeOut, status_code=201)
@@ -35,20 +42,9 @@ def create_attendee(
     event_id: uuid.UUID,
     payload: AttendeeCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> Attendee:
-    _get_owned_event(db, user, event_id)
-
-    token = generate_unique_qr_token(db)
-    attendee = Attendee(
-        event_id=event_id,
-        full_name=payload.full_name,
-        email=str(payload.email) if payload.email else None,
-        qr_token=token,
-    )
-    db.add(attendee)
-    db.commit()
-    db.refresh(attendee)
+) -> Row:
+    (attendee,) = create_attendees(db, event_id, [payload])
+    token_index.add_attendees(event_id, [attendee])
     return attendee
 
 
@@ -57,26 +53,10 @@ def bulk_create_attendees(
     event_id: uuid.UUID,
     payload: AttendeeBulkCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> list[Attendee]:
-    _get_owned_event(db, user, event_id)
-
-    created: list[Attendee] = []
-    for a in payload.attendees:
-        token = generate_unique_qr_token(db)
-        attendee = Attendee(
-            event_id=event_id,
-            full_name=a.full_name,
-            email=str(a.email) if a.email else None,
-            qr_token=token,
-        )
-        db.add(attendee)
-        created.append(attendee)
-
-    db.commit()
-    for attendee in created:
-        db.refresh(attendee)
-
+) -> list[Row]:
+    # one INSERT and one commit for the whole upload; tokens are generated in memory
+    created = create_attendees(db, event_id, payload.attendees)
+    token_index.add_attendees(event_id, created)
     return created
 
 
@@ -84,29 +64,27 @@ def bulk_create_attendees(
 def list_attendees(
     event_id: uuid.UUID,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
     q: str | None = Query(default=None, description="Search by name or email"),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=True, description="Also count every match"),
 ) -> AttendeeListOut:
-    _get_owned_event(db, user, event_id)
-
     base_filter = [Attendee.event_id == event_id]
     if q:
         like = f"%{q.strip()}%"
         base_filter.append(or_(Attendee.full_name.ilike(like), Attendee.email.ilike(like)))
 
-    total = db.scalar(select(func.count()).select_from(Attendee).where(*base_filter)) or 0
+    total = None
+    if include_total:
+        total = db.scalar(select(func.count()).select_from(Attendee).where(*base_filter)) or 0
 
-    rows = db.scalars(
-        select(Attendee)
-        .where(*base_filter)
-        .order_by(Attendee.created_at.desc())
-        .limit(limit)
-        .offset(offset)
-    ).all()
+    rows = db.scalars(_page_query(base_filter, limit, offset, cursor)).all()
+    items, next_cursor = split_page(rows, limit)
 
-    return AttendeeListOut(items=rows, limit=limit, offset=offset, total=total)
+    return AttendeeListOut(
+        items=items, limit=limit, offset=offset, total=total, next_cursor=next_cursor
+    )
 
 
 @router.get("/{attendee_id}", response_model=AttendeeOut)
@@ -114,10 +92,7 @@ def get_attendee(
     event_id: uuid.UUID,
     attendee_id: uuid.UUID,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
 ) -> Attendee:
-    _get_owned_event(db, user, event_id)
-
     attendee = db.get(Attendee, attendee_id)
     if not attendee or attendee.event_id != event_id:
         raise HTTPException(status_code=404, detail="Attendee not found")
@@ -130,10 +105,7 @@ def get_attendee_qr_payload(
     event_id: uuid.UUID,
     attendee_id: uuid.UUID,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
 ) -> QRPayloadOut:
-    _get_owned_event(db, user, event_id)
-
     attendee = db.get(Attendee, attendee_id)
     if not attendee or attendee.event_id != event_id:
         raise HTTPException(status_code=404, detail="Attendee not found")
@@ -1,34 +1,101 @@
+import uuid
+from collections.abc import Callable
+from typing import Any, TypeVar
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import create_access_token, hash_password, verify_password
-from app.db.session import get_db
+from app.api.deps import rate_limit
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RegisterRequest, TokenResponse
+from app.services.passwords import PasswordPoolBusyError, password_hasher
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+T = TypeVar("T")
 
-@router.post("/register", status_code=201)
-def register(payload: RegisterRequest, db: Session = Depends(get_db)) -> dict[str, str]:
-    existing = db.scalar(select(User).where(User.email == payload.email))
-    if existing:
-        raise HTTPException(status_code=409, detail="Email already registered")
 
-    user = User(email=payload.email, password_hash=hash_password(payload.password))
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins at once, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _find_user(db: Session, email: str) -> User | None:
+    return db.scalar(select(User).where(User.email == email))
+
+
+def _create_user(db: Session, email: str, password_hash: str) -> User:
+    user = User(email=email, password_hash=password_hash)
     db.add(user)
     db.commit()
     db.refresh(user)
+    return user
+
+
+def _rehash(db: Session, user_id: uuid.UUID, password_hash: str) -> None:
+    db.execute(update(User).where(User.id == user_id).values(password_hash=password_hash))
+    db.commit()
+
+
+def _in_session(fn: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+async def _run_db(fn: Callable[..., T], *args: Any) -> T:
+    return await run_in_threadpool(_in_session, fn, *args)
+
+
+# async routes: each database call gets its own short session on the threadpool and
+# bcrypt runs on its own process pool, so neither a thread nor a pooled connection
+# is held while a hash is computed
+
+
+@router.post(
+    "/register", status_code=201, dependencies=[Depends(rate_limit("register", by="ip"))]
+)
+async def register(payload: RegisterRequest) -> dict[str, str]:
+    existing = await _run_db(_find_user, payload.email)
+    if existing:
+        raise HTTPException(status_code=409, detail="Email already registered")
+
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except PasswordPoolBusyError:
+        raise _busy() from None
+    try:
+        user = await _run_db(_create_user, payload.email, password_hash)
+    except IntegrityError:
+        # registered by a concurrent request while this one was hashing
+        raise HTTPException(status_code=409, detail="Email already registered") from None
     return {"id": str(user.id), "email": user.email}
 
 
-@router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> TokenResponse:
-    user = db.scalar(select(User).where(User.email == payload.email))
-    if not user or not verify_password(payload.password, user.password_hash):
+@router.post(
+    "/login", response_model=TokenResponse, dependencies=[Depends(rate_limit("login", by="ip"))]
+)
+async def login(payload: LoginRequest) -> TokenResponse:
+    user = await _run_db(_find_user, payload.email)
+    ok, new_hash = False, None
+    if user:
+        try:
+            ok, new_hash = await password_hasher.verify(payload.password, user.password_hash)
+        except PasswordPoolBusyError:
+            raise _busy() from None
+    if not user or not ok:
         # avoid leaking which part failed
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
 
+    if new_hash is not None:
+        # the stored hash predates the current cost factor
+        await _run_db(_rehash, user.id, new_hash)
     token = create_access_token(subject=str(user.id))
     return TokenResponse(access_token=token)
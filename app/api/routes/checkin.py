@@ -1,166 +1,138 @@
-from datetime import datetime, timezone
+import time
 
 from fastapi import APIRouter, Depends, Header, HTTPException, status
-from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user_optional
+from app.api.deps import get_current_user_optional, rate_limit
+from app.core.config import settings
 from app.db.session import get_db
-from app.models.attendee import Attendee
-from app.models.event import Event
-from app.models.user import User
-from app.schemas.checkin import CheckInRequest, CheckInResponse
+from app.schemas.checkin import (
+    CheckInBatchItem,
+    CheckInBatchRequest,
+    CheckInBatchResponse,
+    CheckInRequest,
+    CheckInResponse,
+)
+from app.services.checkin import CheckInResult, CheckInStatus, Scan, check_in_many
+from app.services.checkin_log import checkin_log_writer
+from app.services.group_commit import group_committer
+from app.services.principals import Principal
 
 router = APIRouter(prefix="/checkin", tags=["checkin"])
 
+_ERRORS: dict[CheckInStatus, tuple[int, str]] = {
+    CheckInStatus.NOT_FOUND: (status.HTTP_404_NOT_FOUND, "Invalid QR token"),
+    CheckInStatus.FORBIDDEN: (status.HTTP_403_FORBIDDEN, "Not allowed"),
+    CheckInStatus.UNAUTHORIZED: (status.HTTP_401_UNAUTHORIZED, "Missing or invalid scanner key"),
+}
 
-@router.post("", response_model=CheckInResponse)
-def checkin(
-    payload: CheckInRequest,
-    db: Session = Depends(get_db),
-    user: User | None = Depends(get_current_user_optional),
-    x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
-) -> CheckInResponse:
-    attendee = db.scalar(select(Attendee).where(Attendee.qr_token == payload.qr_token))
-    if not attendee:
-        raise HTTPException(status_code=404, detail="Invalid QR token")
 
-    event = db.get(Event, attendee.event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
+def _to_response(result: CheckInResult) -> CheckInResponse:
+    if result.status in _ERRORS:
+        status_code, detail = _ERRORS[result.status]
+        raise HTTPException(status_code=status_code, detail=detail)
+    return CheckInResponse(
+        attendee_id=result.attendee_id,
+        event_id=result.event_id,
+        full_name=result.full_name,
+        checked_in_at=result.checked_in_at,
+        already_checked_in=result.status is CheckInStatus.ALREADY_CHECKED_IN,
+    )
+
+
+def _log(result: CheckInResult, device_id: str | None, started: float) -> None:
+    checkin_log_writer.record(result, device_id, (time.perf_counter() - started) * 1000)
 
-    # ✅ Auth logic:
-    # - If JWT user is present, must be the event owner
-    # - Otherwise require X-Scanner-Key to match the event's scanner_key
-    if user is not None:
-        if event.owner_user_id != user.id:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-    else:
-        if not x_scanner_key or x_scanner_key != event.scanner_key:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing or invalid scanner key",
-            )
-
-    # Idempotent response if already checked in
-    if attendee.checked_in_at is not None:
-        return CheckInResponse(
-            attendee_id=attendee.id,
-            event_id=attendee.event_id,
-            full_name=attendee.full_name,
-            checked_in_at=attendee.checked_in_at,
-            already_checked_in=True,
-        )
 
-    now = datetime.now(timezone.utc)
-
-    # Atomic update to avoid double-checkins on race
-    result = db.execute(
-        update(Attendee)
-        .where(Attendee.id == attendee.id, Attendee.checked_in_at.is_(None))
-        .values(checked_in_at=now)
-        .returning(Attendee.checked_in_at)
-    ).first()
-
-    db.commit()
-
-    if not result:
-        db.refresh(attendee)
-        return CheckInResponse(
-            attendee_id=attendee.id,
-            event_id=attendee.event_id,
-            full_name=attendee.full_name,
-            checked_in_at=attendee.checked_in_at,  # should be set by winner
-            already_checked_in=True,
+def _to_scans(
+    payload: CheckInBatchRequest, user: Principal | None, scanner_key: str | None
+) -> list[Scan]:
+    user_id = user.id if user is not None else None
+    return [
+        Scan(
+            qr_token=item.qr_token,
+            user_id=user_id,
+            scanner_key=scanner_key,
+            scanned_at=item.scanned_at,
+        )
+        for item in payload.items
+    ]
+
+
+def _to_batch_item(item: CheckInRequest, result: CheckInResult) -> CheckInBatchItem:
+    if result.status in _ERRORS:
+        status_code, detail = _ERRORS[result.status]
+        return CheckInBatchItem(
+            qr_token=item.qr_token,
+            device_id=item.device_id,
+            status_code=status_code,
+            detail=detail,
         )
+    return CheckInBatchItem(
+        qr_token=item.qr_token,
+        device_id=item.device_id,
+        status_code=status.HTTP_200_OK,
+        result=_to_response(result),
+    )
 
-    checked_time = result[0]
-    return CheckInResponse(
-        attendee_id=attendee.id,
-        event_id=attendee.event_id,
-        full_name=attendee.full_name,
-        checked_in_at=checked_time,
-        already_checked_in=False,
+
+def _to_batch_response(
+    payload: CheckInBatchRequest, results: list[CheckInResult]
+) -> CheckInBatchResponse:
+    return CheckInBatchResponse(
+        items=[
+            _to_batch_item(item, result)
+            for item, result in zip(payload.items, results, strict=True)
+        ]
     )
 
 
-# from datetime import datetime, timezone
-
-# from fastapi import APIRouter, Depends, HTTPException, status
-# from sqlalchemy import select, update
-# from sqlalchemy.orm import Session
-
-# from app.api.deps import get_current_user
-# from app.db.session import get_db
-# from app.models.attendee import Attendee
-# from app.models.event import Event
-# from app.models.user import User
-# from app.schemas.checkin import CheckInRequest, CheckInResponse
-
-# router = APIRouter(prefix="/checkin", tags=["checkin"])
-
-
-# @router.post("", response_model=CheckInResponse)
-# def checkin(
-#     payload: CheckInRequest,
-#     db: Session = Depends(get_db),
-#     user: User = Depends(get_current_user),
-# ) -> CheckInResponse:
-#     """
-#     Idempotent check-in:
-#     - Invalid token => 404
-#     - Already checked in => return already_checked_in=True
-#     - First check-in => set checked_in_at (atomic update) and return already_checked_in=False
-#     """
-#     attendee = db.scalar(select(Attendee).where(Attendee.qr_token == payload.qr_token))
-#     if not attendee:
-#         raise HTTPException(status_code=404, detail="Invalid QR token")
-
-#     # ensure the scanning user owns the event (owner-only MVP)
-#     event = db.get(Event, attendee.event_id)
-#     if not event:
-#         raise HTTPException(status_code=404, detail="Event not found")
-#     if event.owner_user_id != user.id:
-#         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
-
-#     # If already checked in, return idempotent success
-#     if attendee.checked_in_at is not None:
-#         return CheckInResponse(
-#             attendee_id=attendee.id,
-#             event_id=attendee.event_id,
-#             full_name=attendee.full_name,
-#             checked_in_at=attendee.checked_in_at,
-#             already_checked_in=True,
-#         )
-
-#     now = datetime.now(timezone.utc)
-
-#     # Atomic update: only set if checked_in_at is NULL
-#     result = db.execute(
-#         update(Attendee)
-#         .where(Attendee.id == attendee.id, Attendee.checked_in_at.is_(None))
-#         .values(checked_in_at=now)
-#         .returning(Attendee.checked_in_at)
-#     ).first()
-
-#     db.commit()
-
-#     # If another request won the race, result will be None
-#     if not result:
-#         db.refresh(attendee)
-#         return CheckInResponse(
-#             attendee_id=attendee.id,
-#             event_id=attendee.event_id,
-#             full_name=attendee.full_name,
-#             checked_in_at=attendee.checked_in_at,  # type: ignore[arg-type]
-#             already_checked_in=True,
-#         )
-
-#     checked_time = result[0]
-#     return CheckInResponse(
-#         attendee_id=attendee.id,
-#         event_id=attendee.event_id,
-#         full_name=attendee.full_name,
-#         checked_in_at=checked_time,
-#         already_checked_in=False,
-#     )
+@router.post("", response_model=CheckInResponse, dependencies=[Depends(rate_limit("checkin"))])
+def checkin(
+    payload: CheckInRequest,
+    db: Session = Depends(get_db),
+    user: Principal | None = Depends(get_current_user_optional),
+    x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
+) -> CheckInResponse:
+    started = time.perf_counter()
+    # ✅ Auth logic (evaluated inside the check-in statement):
+    # - If JWT user is present, must be the event owner
+    # - Otherwise require X-Scanner-Key to match the event's scanner_key
+    scan = Scan(
+        qr_token=payload.qr_token,
+        user_id=user.id if user is not None else None,
+        scanner_key=x_scanner_key,
+        scanned_at=payload.scanned_at,
+    )
+    if settings.CHECKIN_GROUP_COMMIT:
+        # the committer writes on a connection of its own: hand back the one the
+        # principal lookup may hold, or waiting handlers can drain the pool it needs
+        db.close()
+        result = group_committer.check_in(scan)
+    else:
+        result = check_in_many(db, [scan])[0]
+    _log(result, payload.device_id, started)
+    return _to_response(result)
+
+
+@router.post(
+    "/batch",
+    response_model=CheckInBatchResponse,
+    dependencies=[Depends(rate_limit("checkin_batch"))],
+)
+def checkin_batch(
+    payload: CheckInBatchRequest,
+    db: Session = Depends(get_db),
+    user: Principal | None = Depends(get_current_user_optional),
+    x_scanner_key: str | None = Header(default=None, alias="X-Scanner-Key"),
+) -> CheckInBatchResponse:
+    """
+    Applies queued or multi-lane scans with one set-based UPDATE in one
+    transaction. Every item gets its own status; a failing item never
+    aborts the rest of the batch.
+    """
+    started = time.perf_counter()
+    results = check_in_many(db, _to_scans(payload, user, x_scanner_key))
+    for item, result in zip(payload.items, results, strict=True):
+        _log(result, item.device_id, started)
+    return _to_batch_response(payload, results)
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import logging
+import math
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.api.deps import scanner_client
+from app.api.routes.checkin import _log, _to_batch_item
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas.checkin import CheckInRequest
+from app.services.checkin import Scan, check_in_many
+from app.services.group_commit import group_committer
+from app.services.rate_limit import rate_limiter
+from app.services.scanner_cache import resolve_scanner_key
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/checkin", tags=["checkin"])
+
+# scans a single connection may have in flight before we stop reading frames
+MAX_IN_FLIGHT = 32
+POLICY_VIOLATION_UNAUTHORIZED = 4401
+
+T = TypeVar("T")
+
+
+def _in_session(fn: Callable[..., T], *args: Any) -> T:
+    with SessionLocal() as db:
+        return fn(db, *args)
+
+
+async def _run_db(fn: Callable[..., T], *args: Any) -> T:
+    """Runs a sync `fn(db, ...)` without blocking the event loop, in either DB mode."""
+    if settings.DB_ASYNC:
+        async with AsyncSessionLocal() as db:
+            return await db.run_sync(fn, *args)
+    return await run_in_threadpool(_in_session, fn, *args)
+
+
+def _error_frame(frame_id: Any, status_code: int, detail: Any) -> dict[str, Any]:
+    return {"id": frame_id, "status_code": status_code, "detail": detail}
+
+
+@router.websocket("/ws")
+async def checkin_ws(websocket: WebSocket) -> None:
+    """
+    Persistent check-in channel for scanner devices.
+
+    1. The first frame authenticates the connection: {"scanner_key": "..."}.
+       The server answers {"type": "ready"} or closes with code 4401.
+    2. Every following frame is a CheckInRequest plus a client-chosen "id":
+       {"id": 7, "qr_token": "...", "device_id": "..."}.
+       Answers echo the id and have the shape of a batch item
+       ({"id", "qr_token", "device_id", "status_code", "detail", "result"}).
+
+    Frames are pipelined: up to MAX_IN_FLIGHT scans per connection run
+    concurrently, so answers may arrive out of order. Each scan is charged
+    to the scanner key's RATE_LIMIT_CHECKIN bucket, as POST /checkin is;
+    past it, frames are answered with status_code 429 and "retry_after"
+    (seconds) and the connection stays open. A scan that fails server-side
+    (database error, pool timeout) is answered with status_code 503.
+    """
+    await websocket.accept()
+    try:
+        try:
+            auth = json.loads(await websocket.receive_text())
+        except ValueError:
+            auth = None
+        scanner_key = auth.get("scanner_key") if isinstance(auth, dict) else None
+        if not isinstance(scanner_key, str) or not scanner_key:
+            await websocket.close(POLICY_VIOLATION_UNAUTHORIZED, "Missing or invalid scanner key")
+            return
+        if await _run_db(resolve_scanner_key, scanner_key) is None:
+            await websocket.close(POLICY_VIOLATION_UNAUTHORIZED, "Missing or invalid scanner key")
+            return
+        await websocket.send_json({"type": "ready"})
+        client = scanner_client(scanner_key)
+
+        in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        send_lock = asyncio.Lock()
+        pending: set[asyncio.Task[None]] = set()
+
+        async def reply(message: dict[str, Any]) -> None:
+            async with send_lock:
+                await websocket.send_json(message)
+
+        async def process(frame: dict[str, Any]) -> None:
+            started = time.perf_counter()
+            try:
+                try:
+                    payload = CheckInRequest.model_validate(frame)
+                except ValidationError as e:
+                    await reply(_error_frame(frame.get("id"), 422, e.errors(include_url=False)))
+                    return
+                # the key is re-checked on every scan, so a rotation takes effect mid-connection
+                scan = Scan(
+                    qr_token=payload.qr_token,
+                    scanner_key=scanner_key,
+                    scanned_at=payload.scanned_at,
+                )
+                try:
+                    if settings.CHECKIN_GROUP_COMMIT:
+                        result = await asyncio.wrap_future(group_committer.submit(scan))
+                    else:
+                        result = (await _run_db(check_in_many, [scan]))[0]
+                except Exception:
+                    # a database error or pool timeout: the scanner retries this frame
+                    logger.exception("websocket check-in failed")
+                    await reply(_error_frame(frame.get("id"), 503, "Check-in failed, retry"))
+                    return
+                _log(result, payload.device_id, started)
+                item = _to_batch_item(payload, result)
+                await reply({"id": frame.get("id"), **item.model_dump(mode="json")})
+            finally:
+                in_flight.release()
+
+        try:
+            while True:
+                text = await websocket.receive_text()
+                try:
+                    frame = json.loads(text)
+                except ValueError:
+                    frame = None
+                if not isinstance(frame, dict):
+                    await reply(_error_frame(None, 400, "Frames must be JSON objects"))
+                    continue
+                wait = await rate_limiter.check_async("checkin", client)
+                if wait > 0:
+                    throttled = _error_frame(frame.get("id"), 429, "Too many requests")
+                    await reply({**throttled, "retry_after": math.ceil(wait)})
+                    continue
+
+                await in_flight.acquire()
+                task = asyncio.create_task(process(frame))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            for task in pending:
+                task.cancel()
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,75 @@
+import uuid
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_owned_event
+from app.db.session import get_db
+from app.models.checkin_log import CheckinLog
+from app.schemas.device import DeviceThroughputOut
+from app.services.checkin import CheckInStatus
+
+router = APIRouter(prefix="/events", tags=["devices"])
+
+
+@router.get(
+    "/{event_id}/devices",
+    response_model=list[DeviceThroughputOut],
+    dependencies=[Depends(get_owned_event)],
+)
+def device_throughput(
+    event_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    since: datetime | None = Query(default=None, description="Only count scans after this time"),
+) -> list[DeviceThroughputOut]:
+    """
+    Per-device scan counts, outcomes and latency from the check-in log.
+    Scans of unknown tokens cannot be tied to an event and are not included.
+    """
+    def outcome_count(*statuses: CheckInStatus):
+        return func.count().filter(CheckinLog.outcome.in_([s.value for s in statuses]))
+
+    filters = [CheckinLog.event_id == event_id]
+    if since is not None:
+        filters.append(CheckinLog.scanned_at >= since)
+
+    rows = db.execute(
+        select(
+            CheckinLog.device_id,
+            func.count().label("scans"),
+            outcome_count(CheckInStatus.CHECKED_IN).label("checked_in"),
+            outcome_count(CheckInStatus.ALREADY_CHECKED_IN).label("already_checked_in"),
+            outcome_count(
+                CheckInStatus.NOT_FOUND, CheckInStatus.FORBIDDEN, CheckInStatus.UNAUTHORIZED
+            ).label("rejected"),
+            func.min(CheckinLog.scanned_at).label("first_scan_at"),
+            func.max(CheckinLog.scanned_at).label("last_scan_at"),
+            func.avg(CheckinLog.latency_ms).label("avg_latency_ms"),
+            func.percentile_cont(0.95).within_group(CheckinLog.latency_ms).label("p95_latency_ms"),
+        )
+        .where(*filters)
+        .group_by(CheckinLog.device_id)
+        .order_by(func.count().desc())
+    ).all()
+
+    devices: list[DeviceThroughputOut] = []
+    for row in rows:
+        # at least a minute, so a single burst does not read as an absurd rate
+        minutes = max((row.last_scan_at - row.first_scan_at).total_seconds() / 60, 1.0)
+        devices.append(
+            DeviceThroughputOut(
+                device_id=row.device_id,
+                scans=row.scans,
+                checked_in=row.checked_in,
+                already_checked_in=row.already_checked_in,
+                rejected=row.rejected,
+                first_scan_at=row.first_scan_at,
+                last_scan_at=row.last_scan_at,
+                scans_per_minute=row.scans / minutes,
+                avg_latency_ms=float(row.avg_latency_ms),
+                p95_latency_ms=float(row.p95_latency_ms),
+            )
+        )
+    return devices
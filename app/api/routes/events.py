@@ -1,15 +1,14 @@
-import uuid
-
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_owned_event
 from app.db.session import get_db
 from app.models.event import Event
-from app.models.user import User
 from app.schemas.event import EventCreate, EventListOut, EventOut
 
+from app.services.pagination import InvalidCursorError, newest_first, split_page
+from app.services.principals import Principal
 from app.services.scanner_key import generate_scanner_key
 
 router = APIRouter(prefix="/events", tags=["events"])
@@ -19,7 +18,7 @@ router = APIRouter(prefix="/events", tags=["events"])
 def create_event(
     payload: EventCreate,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
 ) -> Event:
     event = Event(
         owner_user_id=user.id,
@@ -37,34 +36,33 @@ def create_event(
 @router.get("", response_model=EventListOut)
 def list_events(
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_user),
     limit: int = Query(default=20, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=True, description="Also count every event"),
 ) -> EventListOut:
-    total = db.scalar(select(func.count()).select_from(Event).where(Event.owner_user_id == user.id)) or 0
-
-    rows = db.scalars(
-        select(Event)
-        .where(Event.owner_user_id == user.id)
-        .order_by(Event.created_at.desc())
-        .limit(limit)
-        .offset(offset)
-    ).all()
+    if cursor is not None and offset:
+        raise HTTPException(status_code=400, detail="Pass either cursor or offset, not both")
 
-    return EventListOut(items=rows, limit=limit, offset=offset, total=total)
+    owned = Event.owner_user_id == user.id
+    total = None
+    if include_total:
+        total = db.scalar(select(func.count()).select_from(Event).where(owned)) or 0
 
+    try:
+        stmt = newest_first(select(Event).where(owned), Event, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if cursor is None:
+        stmt = stmt.offset(offset)
+    items, next_cursor = split_page(db.scalars(stmt).all(), limit)
 
-@router.get("/{event_id}", response_model=EventOut)
-def get_event(
-    event_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> Event:
-    event = db.get(Event, event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
+    return EventListOut(
+        items=items, limit=limit, offset=offset, total=total, next_cursor=next_cursor
+    )
 
-    if event.owner_user_id != user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
 
+@router.get("/{event_id}", response_model=EventOut)
+def get_event(event: Event = Depends(get_owned_event)) -> Event:
     return event
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends
 
 from app.api.deps import get_current_user
-from app.models.user import User
+from app.services.principals import Principal
 
 router = APIRouter(prefix="/me", tags=["me"])
 
 
 @router.get("")
-def me(user: User = Depends(get_current_user)) -> dict[str, str]:
+def me(user: Principal = Depends(get_current_user)) -> dict[str, str]:
     return {"id": str(user.id), "email": user.email}
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import metrics_access
+from app.core import metrics
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(metrics_access)])
+
+
+@router.get("")
+def get_metrics() -> dict[str, Any]:
+    return metrics.snapshot()
+
+
+@router.get("/db")
+def get_db_metrics() -> dict[str, Any]:
+    """
+    Connection pools of this worker: connections checked out, callers
+    queued for one, and checkout latency (all checkouts, and those that
+    had to queue because the pool was exhausted).
+    """
+    return {"sync": pool_status(engine.pool), "async": pool_status(async_engine.sync_engine.pool)}
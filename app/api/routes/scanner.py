@@ -1,46 +1,33 @@
-import uuid
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
+from app.api.deps import get_owned_event
+from app.db.listener import notify
 from app.db.session import get_db
 from app.models.event import Event
-from app.models.user import User
 from app.schemas.scanner import ScannerKeyOut
+from app.services.scanner_cache import INVALIDATE_CHANNEL, key_digest, scanner_key_cache
 from app.services.scanner_key import generate_scanner_key
 
 router = APIRouter(prefix="/events", tags=["scanner"])
 
 
-def _get_owned_event(db: Session, user: User, event_id: uuid.UUID) -> Event:
-    event = db.get(Event, event_id)
-    if not event:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if event.owner_user_id != user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-    return event
-
-
 @router.get("/{event_id}/scanner-key", response_model=ScannerKeyOut)
-def get_scanner_key(
-    event_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> ScannerKeyOut:
-    event = _get_owned_event(db, user, event_id)
+def get_scanner_key(event: Event = Depends(get_owned_event)) -> ScannerKeyOut:
     return ScannerKeyOut(scanner_key=event.scanner_key)
 
 
 @router.post("/{event_id}/scanner-key/rotate", response_model=ScannerKeyOut)
 def rotate_scanner_key(
-    event_id: uuid.UUID,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    event: Event = Depends(get_owned_event),
 ) -> ScannerKeyOut:
-    event = _get_owned_event(db, user, event_id)
+    old_key = event.scanner_key
     event.scanner_key = generate_scanner_key()
     db.add(event)
+    # other workers drop the old key from their cache when this commits
+    notify(db, INVALIDATE_CHANNEL, key_digest(old_key))
     db.commit()
     db.refresh(event)
+    scanner_key_cache.invalidate(old_key)
     return ScannerKeyOut(scanner_key=event.scanner_key)
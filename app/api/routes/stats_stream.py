@@ -0,0 +1,27 @@
+import uuid
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_owned_event
+from app.services.stats_stream import stats_hub
+
+router = APIRouter(prefix="/events", tags=["stats"])
+
+
+@router.get("/{event_id}/stats/stream", dependencies=[Depends(get_owned_event)])
+def stream_event_stats(event_id: uuid.UUID) -> StreamingResponse:
+    """
+    Live event stats as server-sent events: a `stats` event with the same
+    body as GET /stats on connect and after every change, at most one per
+    STATS_STREAM_INTERVAL_S. Changes are pushed by Postgres (LISTEN/NOTIFY),
+    so idle streams cost no queries beyond a periodic keep-alive read.
+
+    Authenticated with the usual bearer token, so browsers read it with
+    fetch() rather than EventSource (which cannot send headers).
+    """
+    # no-transform/X-Accel-Buffering: proxies must not buffer or compress the stream
+    headers = {"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"}
+    return StreamingResponse(
+        stats_hub.stream(event_id), media_type="text/event-stream", headers=headers
+    )
@@ -0,0 +1,105 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_owned_event
+from app.db.session import get_db
+from app.models.checkin_minute import CheckinMinute
+from app.schemas.stats import TimelineBucketOut, TimelineOut
+
+router = APIRouter(prefix="/events", tags=["stats"])
+
+BUCKETS = {"1m": timedelta(minutes=1), "5m": timedelta(minutes=5), "1h": timedelta(hours=1)}
+# buckets are aligned on this instant, i.e. on UTC minutes and hours
+_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+# points returned at most, empty buckets included
+MAX_BUCKETS = 10_000
+
+
+def _floor(value: datetime, width: timedelta) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value - (value - _ORIGIN) % width
+
+
+@router.get(
+    "/{event_id}/stats/timeline",
+    response_model=TimelineOut,
+    dependencies=[Depends(get_owned_event)],
+)
+def checkin_timeline(
+    event_id: uuid.UUID,
+    bucket: Literal["1m", "5m", "1h"] = Query(default="5m"),
+    start: datetime | None = Query(default=None, description="Window start (inclusive)"),
+    end: datetime | None = Query(default=None, description="Window end (exclusive)"),
+    db: Session = Depends(get_db),
+) -> TimelineOut:
+    """
+    Arrivals per bucket with running totals, ready to plot. Reads the
+    per-minute rollup kept by triggers on attendees, so a 12-hour event is at
+    most 720 rows (per shard) of one index range, whatever its size. Empty
+    buckets between the first and the last check-in (or the window bounds)
+    are included as zeros.
+    """
+    width = BUCKETS[bucket]
+    start = _floor(start, width) if start is not None else None
+    end = _floor(end - timedelta(microseconds=1), width) + width if end is not None else None
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    filters = [CheckinMinute.event_id == event_id]
+    if start is not None:
+        filters.append(CheckinMinute.minute >= start)
+    if end is not None:
+        filters.append(CheckinMinute.minute < end)
+    bucket_start = func.date_bin(width, CheckinMinute.minute, _ORIGIN)
+    counts = dict(
+        db.execute(
+            select(bucket_start, func.sum(CheckinMinute.checked_in))
+            .where(*filters)
+            .group_by(bucket_start)
+            .having(func.sum(CheckinMinute.checked_in) != 0)
+        ).all()
+    )
+
+    cumulative = 0
+    if start is not None:
+        cumulative = db.scalar(
+            select(func.coalesce(func.sum(CheckinMinute.checked_in), 0)).where(
+                CheckinMinute.event_id == event_id, CheckinMinute.minute < start
+            )
+        )
+
+    first = start if start is not None else min(counts, default=None)
+    last = end - width if end is not None else max(counts, default=None)
+    buckets: list[TimelineBucketOut] = []
+    if first is not None and last is not None and first <= last:
+        if (last - first) // width + 1 > MAX_BUCKETS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"More than {MAX_BUCKETS} buckets; use a larger bucket or a narrower window",
+            )
+        at = first
+        while at <= last:
+            checked_in = int(counts.get(at, 0))
+            cumulative += checked_in
+            buckets.append(
+                TimelineBucketOut(start=at, checked_in=checked_in, cumulative=cumulative)
+            )
+            at += width
+
+    peak = max(buckets, key=lambda b: b.checked_in, default=None)
+    if peak is not None and peak.checked_in == 0:
+        peak = None
+    return TimelineOut(
+        bucket=bucket,
+        bucket_seconds=int(width.total_seconds()),
+        checked_in_by_window_end=int(cumulative),
+        peak=peak,
+        peak_per_minute=peak.checked_in / (width / timedelta(minutes=1)) if peak else 0.0,
+        buckets=buckets,
+    )
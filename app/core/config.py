@@ -1,3 +1,4 @@
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,9 +7,121 @@ class Settings(BaseSettings):
 
     ENV: str = "local"
     DATABASE_URL: str
+    # LISTEN needs a session-level connection: set a direct URL when DATABASE_URL is PgBouncer
+    DATABASE_LISTEN_URL: str = ""
     JWT_SECRET: str
     JWT_EXPIRES_MIN: int = 60
     CORS_ORIGINS: str = ""
+    # bearer token of /metrics and /metrics/db; empty: not served
+    METRICS_TOKEN: str = ""
+
+    # serve checkin/attendees/stats with async handlers on an AsyncEngine
+    DB_ASYNC: bool = False
+
+    # connection pool of each engine (sync and async), per worker; see /metrics/db to size it.
+    # Pre-ping costs a round trip per checkout; without it, recycling and SQLAlchemy's
+    # reconnect-on-disconnect handle dropped connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # behind PgBouncer in transaction mode: no client-side pool, no prepared statements
+    DB_PGBOUNCER: bool = False
+
+    # scanner key -> event cache; set SCANNER_CACHE_URL (redis://...) to share it
+    SCANNER_CACHE_URL: str = ""
+    SCANNER_CACHE_TTL_S: float = 300.0
+    SCANNER_CACHE_SIZE: int = 10_000
+
+    # verified bearer token -> principal cache; entries live until the token's exp,
+    # capped at PRINCIPAL_CACHE_TTL_S. PRINCIPAL_CACHE_SIZE=0 disables it
+    PRINCIPAL_CACHE_TTL_S: float = 300.0
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
+    # bcrypt runs on its own process pool (per worker); past PASSWORD_POOL_MAX_QUEUE
+    # waiting hashes, register/login answer 503
+    PASSWORD_POOL_PROCESSES: int = 2
+    PASSWORD_POOL_MAX_QUEUE: int = 32
+    # cost of new hashes: calibrated at startup to PASSWORD_HASH_TARGET_MS (never
+    # below PASSWORD_HASH_MIN_ROUNDS), or PASSWORD_HASH_ROUNDS when the target is 0
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_TARGET_MS: float = 250.0
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+
+    # token buckets per route, "<requests>/<s|min|h>[:burst]" (empty: no limit).
+    # Check-ins are counted per scanner key, else per user, else per client IP;
+    # login/register per client IP, so leave room for a venue behind one NAT.
+    # RATE_LIMIT_URL (redis://...) shares the buckets between workers.
+    RATE_LIMIT_CHECKIN: str = "20/s:40"
+    RATE_LIMIT_CHECKIN_BATCH: str = "5/s:10"
+    RATE_LIMIT_LOGIN: str = "120/min"
+    RATE_LIMIT_REGISTER: str = "120/min"
+    RATE_LIMIT_URL: str = ""
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    # API requests a worker serves at once; more are answered 503. 0 disables
+    ADMISSION_MAX_IN_FLIGHT: int = 64
+
+    # oldest client scanned_at a replayed scan may keep; older ones (a wrong device
+    # clock, a forged payload) are recorded this far back instead
+    CHECKIN_MAX_SCAN_AGE_S: float = 86_400.0
+
+    # merge check-ins arriving within the window into one UPDATE + one commit
+    CHECKIN_GROUP_COMMIT: bool = False
+    CHECKIN_GROUP_COMMIT_WINDOW_MS: float = 5.0
+    CHECKIN_GROUP_COMMIT_MAX_BATCH: int = 500
+
+    # buffered COPY of every scan attempt into checkin_log
+    CHECKIN_LOG_ENABLED: bool = True
+    CHECKIN_LOG_FLUSH_MS: float = 250.0
+    CHECKIN_LOG_MAX_BATCH: int = 5_000
+    CHECKIN_LOG_MAX_QUEUE: int = 100_000
+
+    # in-memory qr_token index for events starting within the horizon
+    TOKEN_INDEX_ENABLED: bool = True
+    TOKEN_INDEX_HORIZON_MIN: float = 120.0
+    TOKEN_INDEX_TRAIL_MIN: float = 720.0
+    TOKEN_INDEX_REFRESH_S: float = 60.0
+    TOKEN_INDEX_MAX_ATTENDEES: int = 1_000_000
+
+    # rows per COPY batch of POST /events/{id}/attendees/import
+    ATTENDEE_IMPORT_BATCH_ROWS: int = 5_000
+
+    # short-lived answers for repeat scans and for tokens that matched nothing
+    SCAN_CACHE_ENABLED: bool = True
+    SCAN_CACHE_POSITIVE_TTL_S: float = 10.0
+    SCAN_CACHE_POSITIVE_SIZE: int = 50_000
+    SCAN_CACHE_NEGATIVE_TTL_S: float = 60.0
+    SCAN_CACHE_NEGATIVE_SIZE: int = 100_000
+
+    # rendered QR images; QR_CACHE_DIR defaults to <tmp>/qr-checkin
+    QR_CACHE_DIR: str = ""
+    QR_SCALE: int = 10
+    QR_BORDER: int = 4
+    # worker processes for batch rendering; 0 means one per CPU
+    QR_RENDER_PROCESSES: int = 0
+
+    # drift repair of the trigger-maintained event_counters; 0 disables the job
+    EVENT_COUNTERS_RECONCILE_S: float = 3600.0
+    EVENT_COUNTERS_RECONCILE_BATCH: int = 500
+
+    # signed QR tokens, verifiable without the database: "kid:secret,kid2:secret2".
+    # New attendees get tokens signed with QR_SIGNING_KID (opaque tokens when empty);
+    # keep retired kids listed for as long as their tokens must stay valid.
+    QR_SIGNING_KEYS: str = ""
+    QR_SIGNING_KID: str = ""
+
+    # live stats over SSE: updates are coalesced per interval; a stream with no
+    # change re-reads the counters and sends a keep-alive after STATS_STREAM_MAX_AGE_S
+    STATS_STREAM_INTERVAL_S: float = 1.0
+    STATS_STREAM_MAX_AGE_S: float = 15.0
+
+    @model_validator(mode="after")
+    def _check_signing_kid(self) -> "Settings":
+        kids = {item.split(":", 1)[0].strip() for item in self.QR_SIGNING_KEYS.split(",")}
+        if self.QR_SIGNING_KID and self.QR_SIGNING_KID not in kids:
+            raise ValueError("QR_SIGNING_KID must be one of the kids in QR_SIGNING_KEYS")
+        return self
 
 
 settings = Settings()
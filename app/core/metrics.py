@@ -0,0 +1,89 @@
+import bisect
+import threading
+from typing import Any
+
+
+class Counter:
+    """Monotonic, thread-safe counter."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def snapshot(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Thread-safe histogram with fixed upper-bound buckets (cumulative, Prometheus style)."""
+
+    def __init__(self, name: str, buckets: tuple[float, ...]) -> None:
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._count += 1
+            self._sum += value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+        cumulative: dict[str, int] = {}
+        running = 0
+        for bound, n in zip(self.buckets, counts, strict=False):
+            running += n
+            cumulative[f"le_{bound:g}"] = running
+        cumulative["le_inf"] = count
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+
+_registry: dict[str, Counter | Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def counter(name: str) -> Counter:
+    """Returns the process-wide counter registered under `name`, creating it on first use."""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Counter(name)
+        if not isinstance(metric, Counter):
+            raise TypeError(f"metric {name!r} is not a counter")
+        return metric
+
+
+def histogram(name: str, buckets: tuple[float, ...]) -> Histogram:
+    """Returns the process-wide histogram registered under `name`, creating it on first use."""
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Histogram(name, buckets)
+        if not isinstance(metric, Histogram):
+            raise TypeError(f"metric {name!r} is not a histogram")
+        return metric
+
+
+def snapshot() -> dict[str, Any]:
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {m.name: m.snapshot() for m in sorted(metrics, key=lambda m: m.name)}
@@ -0,0 +1,92 @@
+import logging
+import threading
+from collections.abc import Callable
+
+import psycopg
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], None]
+Resync = Callable[[], None]
+
+
+def notify(db: Session, channel: str, payload: str) -> None:
+    """Queues a NOTIFY on the session's transaction; listeners get it on commit."""
+    db.execute(select(func.pg_notify(channel, payload)))
+
+
+class PgListener:
+    """
+    Runs LISTEN on a dedicated connection in a daemon thread and dispatches
+    notifications to in-process handlers. Every uvicorn worker runs its own
+    listener, so one NOTIFY reaches all of them.
+    """
+
+    def __init__(self, database_url: str, poll_seconds: float = 1.0) -> None:
+        url = make_url(database_url).set(drivername="postgresql")
+        self._conninfo = url.render_as_string(hide_password=False)
+        self._poll_seconds = poll_seconds
+        self._handlers: dict[str, list[Handler]] = {}
+        self._resyncs: list[Resync] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_listen(self, resync: Resync) -> None:
+        """
+        Registers a callback run after every (re)LISTEN: notifications sent
+        while the connection was down are lost, so whatever they keep fresh
+        must start over.
+        """
+        self._resyncs.append(resync)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._poll_seconds * 2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self._conninfo, autocommit=True) as conn:
+                    for channel in self._handlers:
+                        conn.execute(f'LISTEN "{channel}"')
+                    self._resync()
+                    while not self._stop.is_set():
+                        for n in conn.notifies(timeout=self._poll_seconds):
+                            self._dispatch(n.channel, n.payload)
+            except psycopg.Error:
+                logger.warning("pg listener connection lost; reconnecting", exc_info=True)
+                self._stop.wait(self._poll_seconds)
+
+    def _resync(self) -> None:
+        for resync in self._resyncs:
+            try:
+                resync()
+            except Exception:
+                logger.exception("pg listener resync failed")
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception("pg listener handler failed for channel %s", channel)
+
+
+listener = PgListener(settings.DATABASE_LISTEN_URL or settings.DATABASE_URL)
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import counter, histogram
+
+_LATENCY_BUCKETS_MS = (0.1, 0.5, 1.0, 5.0, 10.0, 50.0, 100.0, 500.0, 1000.0, 5000.0, 30000.0)
+
+
+class PoolMetrics:
+    """Checkout instrumentation of one engine's pool, registered as db.pool.<name>.*."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.checkout_ms = histogram(f"db.pool.{name}.checkout_ms", _LATENCY_BUCKETS_MS)
+        # checkouts that found every connection in use, i.e. queued for one
+        self.wait_ms = histogram(f"db.pool.{name}.wait_ms", _LATENCY_BUCKETS_MS)
+        self.timeouts = counter(f"db.pool.{name}.timeouts")
+        # checkouts in progress that found the pool exhausted
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def enter(self) -> None:
+        with self._lock:
+            self._waiting += 1
+
+    def leave(self) -> None:
+        with self._lock:
+            self._waiting -= 1
+
+
+class _InstrumentedPool:
+    """Mixin timing Pool.connect(): queueing, connecting and pre-ping included."""
+
+    metrics: PoolMetrics
+
+    def connect(self):  # type: ignore[no-untyped-def]
+        saturated = _saturated(self)  # type: ignore[arg-type]
+        started = time.perf_counter()
+        if saturated:
+            self.metrics.enter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        except PoolTimeoutError:
+            self.metrics.timeouts.inc()
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.metrics.checkout_ms.observe(elapsed_ms)
+            if saturated:
+                self.metrics.leave()
+                self.metrics.wait_ms.observe(elapsed_ms)
+
+
+def _saturated(pool: Pool) -> bool:
+    # read without the pool's lock: a checkout racing this one may be misfiled, not lost
+    if not isinstance(pool, QueuePool) or settings.DB_MAX_OVERFLOW < 0:
+        return False
+    return pool.checkedin() == 0 and pool.overflow() >= settings.DB_MAX_OVERFLOW
+
+
+def _instrumented(pool_class: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    # a subclass per engine: Pool.recreate() (engine.dispose()) keeps the class, not attributes
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (_InstrumentedPool, pool_class),
+        {"metrics": metrics},
+    )
+
+
+def engine_options(name: str, is_async: bool = False) -> dict[str, Any]:
+    """
+    create_engine() keyword arguments from the DB_POOL_* settings.
+
+    With DB_PGBOUNCER, PgBouncer (transaction pooling) owns the pool: each
+    checkout opens a connection to it (NullPool), and psycopg never
+    prepares statements, since the next transaction may run on another
+    server connection.
+    """
+    metrics = PoolMetrics(name)
+    if settings.DB_PGBOUNCER:
+        return {
+            "poolclass": _instrumented(NullPool, metrics),
+            "connect_args": {"prepare_threshold": None},
+        }
+    return {
+        "poolclass": _instrumented(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def pool_status(pool: Pool) -> dict[str, Any]:
+    """Point-in-time view of a pool, with its checkout metrics."""
+    status: dict[str, Any] = {"pool": type(pool).__name__.removeprefix("Instrumented")}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    metrics: PoolMetrics | None = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(
+            waiting=metrics.waiting,
+            timeouts=metrics.timeouts.value,
+            checkout_ms=metrics.checkout_ms.snapshot(),
+            wait_ms=metrics.wait_ms.snapshot(),
+        )
+    return status
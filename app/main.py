@@ -1,14 +1,49 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
 from app.api import api_router
+from app.api.routes.metrics import router as metrics_router
 from app.core.config import settings
+from app.db.listener import listener
 from app.db.session import engine
+from app.services.checkin_log import checkin_log_writer
+from app.services.event_counters import counter_reconciler
+from app.services.passwords import password_hasher
+from app.services.qr_render import shutdown_render_pool
+from app.services.token_index import token_index
 from fastapi.staticfiles import StaticFiles
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # cross-worker cache invalidation (scanner key rotation, ...)
+    listener.start()
+    # loads the token index of events about to start, then keeps it current
+    token_index.start()
+    # repairs event_counters drift now and then
+    counter_reconciler.start()
+    # bcrypt cost for new hashes, from this machine's speed
+    if settings.PASSWORD_HASH_TARGET_MS > 0:
+        password_hasher.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS, settings.PASSWORD_HASH_MIN_ROUNDS
+        )
+    try:
+        yield
+    finally:
+        counter_reconciler.stop()
+        token_index.stop()
+        listener.stop()
+        checkin_log_writer.flush()
+        shutdown_render_pool()
+        password_hasher.shutdown()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="QR Check-in API", version="0.1.0")
+    app = FastAPI(title="QR Check-in API", version="0.1.0", lifespan=lifespan)
 
     # CORS (production: set strict origins)
     origins = [o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip()]
@@ -35,6 +70,7 @@ def create_app() -> FastAPI:
             return {"status": "not_ready"}
 
     app.include_router(api_router)
+    app.include_router(metrics_router)
 
     app.mount("/web", StaticFiles(directory="web", html=True), name="web")
 
@@ -1,3 +1,6 @@
 from app.models.attendee import Attendee  # noqa: F401
+from app.models.checkin_log import CheckinLog  # noqa: F401
+from app.models.checkin_minute import CheckinMinute  # noqa: F401
 from app.models.event import Event  # noqa: F401
+from app.models.event_counter import EventCounter  # noqa: F401
 from app.models.user import User  # noqa: F401
@@ -1,11 +1,16 @@
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from app.db.base import Base, TimestampMixin, UUIDPrimaryKeyMixin
 
 class Attendee(Base, UUIDPrimaryKeyMixin, TimestampMixin):
     __tablename__ = "attendees"
+    # newest-first keyset pagination within an event
+    __table_args__ = (
+        Index("ix_attendees_event_id_created_at_id", "event_id", "created_at", "id"),
+        Index("ix_attendees_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     event_id: Mapped[str] = mapped_column(
         UUID(as_uuid=True), 
@@ -21,5 +26,16 @@ class Attendee(Base, UUIDPrimaryKeyMixin, TimestampMixin):
     qr_token: Mapped[str] = mapped_column(String(128), unique=True, index=True, nullable=False)
 
     checked_in_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # words of the name and of the email (split on @ and .), for prefix search
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('simple'::regconfig, "
+            "COALESCE(full_name, '') || ' ' || translate(COALESCE(email, ''), '@.', '  '))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
  
     event = relationship("Event", back_populates="attendees")
\ No newline at end of file
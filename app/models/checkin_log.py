@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import DateTime, Float, ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base, UUIDPrimaryKeyMixin
+
+class CheckinLog(Base, UUIDPrimaryKeyMixin):
+    """Append-only record of every scan attempt, written in bulk by CheckinLogWriter."""
+
+    __tablename__ = "checkin_log"
+    __table_args__ = (Index("ix_checkin_log_event_id_scanned_at", "event_id", "scanned_at"),)
+
+    # null when the token matched no attendee
+    event_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.id", ondelete="CASCADE"),
+        nullable=True
+    )
+    attendee_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+
+    device_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    outcome: Mapped[str] = mapped_column(String(32), nullable=False)
+    latency_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    scanned_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import BigInteger, DateTime, ForeignKey, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+class CheckinMinute(Base):
+    """
+    Check-ins per event and minute (of checked_in_at), maintained by triggers
+    on attendees (see the add_checkin_minutes migration). Sharded like
+    EventCounter: a minute's count is the sum of its rows.
+    """
+
+    __tablename__ = "checkin_minutes"
+
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    minute: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+
+    checked_in: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
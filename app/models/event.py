@@ -1,11 +1,15 @@
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base, UUIDPrimaryKeyMixin, TimestampMixin
 
 class Event(Base, UUIDPrimaryKeyMixin, TimestampMixin):
     __tablename__ = "events"
+    # newest-first keyset pagination of an owner's events
+    __table_args__ = (
+        Index("ix_events_owner_user_id_created_at_id", "owner_user_id", "created_at", "id"),
+    )
 
     owner_user_id: Mapped[str] = mapped_column(
         UUID(as_uuid=True), 
@@ -0,0 +1,24 @@
+import uuid
+from sqlalchemy import BigInteger, ForeignKey, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.db.base import Base
+
+class EventCounter(Base):
+    """
+    Attendee counts of an event, maintained by triggers on attendees (see the
+    add_event_counters migration). Each event has up to SHARDS rows that sum
+    to its counts, so concurrent check-ins rarely wait on the same row.
+    """
+
+    __tablename__ = "event_counters"
+
+    event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("events.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+
+    attendees: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    checked_in: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -10,7 +10,7 @@ class AttendeeCreate(BaseModel):
 
 
 class AttendeeBulkCreate(BaseModel):
-    attendees: list[AttendeeCreate] = Field(min_length=1, max_length=500)
+    attendees: list[AttendeeCreate] = Field(min_length=1, max_length=50_000)
 
 
 class AttendeeOut(BaseModel):
@@ -30,7 +30,26 @@ class AttendeeListOut(BaseModel):
     items: list[AttendeeOut]
     limit: int
     offset: int
-    total: int
+    # null when the request set include_total=false
+    total: int | None
+    # pass as ?cursor= to get the next page; null on the last page
+    next_cursor: str | None = None
+
+
+class AttendeeImportError(BaseModel):
+    line: int
+    error: str
+
+
+class AttendeeImportOut(BaseModel):
+    imported: int
+    failed: int
+    errors: list[AttendeeImportError]
+    # more rows failed than are listed in `errors`
+    errors_truncated: bool
+
+    class Config:
+        from_attributes = True
 
 
 class QRPayloadOut(BaseModel):
@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field
 class CheckInRequest(BaseModel):
     qr_token: str = Field(min_length=10, max_length=256)
     device_id: str | None = Field(default=None, max_length=100)
+    # client-side scan time, used when a scanner replays queued scans
+    scanned_at: datetime | None = None
 
 
 class CheckInResponse(BaseModel):
@@ -15,3 +17,19 @@ class CheckInResponse(BaseModel):
     full_name: str
     checked_in_at: datetime
     already_checked_in: bool
+
+
+class CheckInBatchRequest(BaseModel):
+    items: list[CheckInRequest] = Field(min_length=1, max_length=1000)
+
+
+class CheckInBatchItem(BaseModel):
+    qr_token: str
+    device_id: str | None
+    status_code: int
+    detail: str | None = None
+    result: CheckInResponse | None = None
+
+
+class CheckInBatchResponse(BaseModel):
+    items: list[CheckInBatchItem]
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class DeviceThroughputOut(BaseModel):
+    device_id: str | None
+    scans: int
+    checked_in: int
+    already_checked_in: int
+    rejected: int
+    first_scan_at: datetime
+    last_scan_at: datetime
+    scans_per_minute: float
+    avg_latency_ms: float
+    p95_latency_ms: float
@@ -24,4 +24,7 @@ class EventListOut(BaseModel):
     items: list[EventOut]
     limit: int
     offset: int
-    total: int
+    # null when the request set include_total=false
+    total: int | None
+    # pass as ?cursor= to get the next page; null on the last page
+    next_cursor: str | None = None
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class TimelineBucketOut(BaseModel):
+    start: datetime
+    checked_in: int
+    # check-ins up to the end of this bucket, including those before the window
+    cumulative: int
+
+
+class TimelineOut(BaseModel):
+    bucket: str
+    bucket_seconds: int
+    # check-ins up to the end of the window (the event total is in /stats)
+    checked_in_by_window_end: int
+    # busiest bucket of the window, and its rate
+    peak: TimelineBucketOut | None
+    peak_per_minute: float
+    buckets: list[TimelineBucketOut]
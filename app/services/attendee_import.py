@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any
+
+from psycopg.rows import namedtuple_row
+from pydantic import ValidationError
+from sqlalchemy import Engine
+
+from app.schemas.attendee import AttendeeCreate
+from app.services.qr import new_qr_token
+from app.services.token_index import token_index
+
+# per-row errors echoed back; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+_STAGING_SQL = (
+    "CREATE TEMP TABLE attendee_import "
+    "(id uuid, full_name text, email text, qr_token text) ON COMMIT DROP"
+)
+_COPY_SQL = "COPY attendee_import (id, full_name, email, qr_token) FROM STDIN"
+_MERGE_SQL = """
+    INSERT INTO attendees (id, event_id, full_name, email, qr_token)
+    SELECT s.id, %(event_id)s, s.full_name, s.email, s.qr_token
+    FROM attendee_import s
+    WHERE NOT EXISTS (SELECT 1 FROM attendees a WHERE a.id = s.id)
+    ON CONFLICT (qr_token) DO NOTHING
+"""
+_COLLIDED_SQL = """
+    SELECT s.id FROM attendee_import s
+    WHERE NOT EXISTS (SELECT 1 FROM attendees a WHERE a.id = s.id)
+"""
+_RETOKEN_SQL = """
+    UPDATE attendee_import s SET qr_token = v.qr_token
+    FROM unnest(%(ids)s::uuid[], %(qr_tokens)s::text[]) AS v(id, qr_token)
+    WHERE s.id = v.id
+"""
+# the imported rows, for the token index of a warm event
+_IMPORTED_SQL = """
+    SELECT s.id, s.full_name, s.qr_token, NULL::timestamptz AS checked_in_at
+    FROM attendee_import s
+"""
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be read at all (encoding, CSV structure, missing header)."""
+
+
+@dataclass
+class RowError:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def add_error(self, line: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line=line, error=error))
+        else:
+            self.errors_truncated = True
+
+
+class ChunkReader(io.RawIOBase):
+    """A read-only file over an iterator of byte chunks, so uploads can be parsed as they arrive."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _text(chunks: Iterable[bytes]) -> io.TextIOWrapper:
+    # utf-8-sig: spreadsheet exports often start with a BOM
+    raw = io.BufferedReader(ChunkReader(chunks))
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+def parse_csv(chunks: Iterable[bytes]) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    """Yields (line, row) for every CSV record; the header must name a full_name column."""
+    reader = csv.DictReader(_text(chunks))
+    try:
+        if reader.fieldnames is None or "full_name" not in reader.fieldnames:
+            raise ImportFormatError("CSV header must include a full_name column")
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as e:
+        raise ImportFormatError(f"line {reader.line_num}: {e}") from e
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("Upload is not valid UTF-8") from e
+
+
+def parse_ndjson(chunks: Iterable[bytes]) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    """Yields (line, object) for every non-blank line, or (line, message) if it is not JSON."""
+    try:
+        for line_num, line in enumerate(_text(chunks), start=1):
+            if not line.strip():
+                continue
+            try:
+                value = json.loads(line)
+            except ValueError:
+                yield line_num, "Invalid JSON"
+                continue
+            yield line_num, value if isinstance(value, dict) else "Each line must be a JSON object"
+    except UnicodeDecodeError as e:
+        raise ImportFormatError("Upload is not valid UTF-8") from e
+
+
+def validate(
+    rows: Iterable[tuple[int, dict[str, Any] | str]], report: ImportReport
+) -> Iterator[AttendeeCreate]:
+    """Passes valid rows on and records the others in `report`."""
+    for line, row in rows:
+        if isinstance(row, str):
+            report.add_error(line, row)
+            continue
+        # empty CSV cells mean "no value"
+        data = {k: v for k, v in row.items() if k and v not in ("", None)}
+        try:
+            yield AttendeeCreate.model_validate(data)
+        except ValidationError as e:
+            first = e.errors(include_url=False)[0]
+            where = ".".join(str(part) for part in first["loc"])
+            report.add_error(line, f"{where}: {first['msg']}" if where else first["msg"])
+
+
+def import_attendees(
+    db_engine: Engine,
+    event_id: uuid.UUID,
+    attendees: Iterable[AttendeeCreate],
+    batch_size: int,
+    max_tries: int = 5,
+) -> int:
+    """
+    Streams attendees into a temporary staging table with COPY, `batch_size`
+    rows at a time, then merges the staging table into `attendees` in one
+    INSERT ... SELECT. Memory stays flat whatever the upload size, and the
+    whole import commits or rolls back as one transaction.
+
+    Tokens are generated per batch without probing the table; rows whose
+    token collides are re-drawn and merged again. Returns the rows imported.
+    If the event is warm, the token index learns the new attendees once the
+    import has committed.
+    """
+    imported = 0
+    rows: list[Any] = []
+    attendees = iter(attendees)
+    with db_engine.begin() as conn:
+        raw = conn.connection.driver_connection
+        with raw.cursor() as cur:
+            cur.execute(_STAGING_SQL)
+            while batch := list(islice(attendees, batch_size)):
+                with cur.copy(_COPY_SQL) as copy:
+                    for a in batch:
+                        attendee_id = uuid.uuid4()
+                        copy.write_row(
+                            (
+                                attendee_id,
+                                a.full_name,
+                                str(a.email) if a.email else None,
+                                new_qr_token(event_id, attendee_id),
+                            )
+                        )
+
+            for _ in range(max_tries):
+                cur.execute(_MERGE_SQL, {"event_id": event_id})
+                imported += cur.rowcount
+                collided = [row[0] for row in cur.execute(_COLLIDED_SQL)]
+                if not collided:
+                    break
+                cur.execute(
+                    _RETOKEN_SQL,
+                    {
+                        "ids": collided,
+                        "qr_tokens": [new_qr_token(event_id, i) for i in collided],
+                    },
+                )
+            else:
+                # extremely unlikely unless DB is under attack or misconfigured; rolls back
+                raise RuntimeError("Failed to generate unique QR tokens")
+
+            if token_index.is_warm(event_id):
+                with raw.cursor(row_factory=namedtuple_row) as imported_cur:
+                    rows = imported_cur.execute(_IMPORTED_SQL).fetchall()
+    token_index.add_attendees(event_id, rows)
+    return imported
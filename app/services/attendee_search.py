@@ -0,0 +1,121 @@
+import re
+import time
+import uuid
+
+from sqlalchemy import Integer, String, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session, aliased, undefer
+
+from app.models.attendee import Attendee
+
+# at most this many words of the query are used
+MAX_WORDS = 8
+# matches ranked per result asked for (the newest ones): a one-letter prefix can match
+# most of a large event, and Postgres reads rows until it has found them all
+CANDIDATES_PER_RESULT = 2
+# created by the migration only where pg_trgm is available
+TRIGRAM_INDEX = "ix_attendees_full_name_trgm"
+# how long a probe for it is trusted: the index can be created or dropped at runtime
+TRIGRAM_PROBE_TTL_S = 300.0
+
+_WORD = re.compile(r"\w+")
+# (index found, monotonic time of the probe)
+_trigram_probe: tuple[bool, float] | None = None
+
+
+def prefix_query(q: str) -> str | None:
+    """
+    Turns free text into a tsquery where every word is a prefix:
+    "jo smi" -> "jo:* & smi:*". Only word characters survive, so user input
+    can never inject tsquery operators.
+    """
+    words = _WORD.findall(q.lower())[:MAX_WORDS]
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def trigram_available(db: Session) -> bool:
+    """
+    Whether the optional pg_trgm index exists (see the attendee search
+    migration), probed at most every TRIGRAM_PROBE_TTL_S.
+    """
+    global _trigram_probe
+    now = time.monotonic()
+    if _trigram_probe is None or now - _trigram_probe[1] >= TRIGRAM_PROBE_TTL_S:
+        found = db.scalar(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": TRIGRAM_INDEX}
+        )
+        _trigram_probe = (bool(found), now)
+    return _trigram_probe[0]
+
+
+def _search_statement():
+    """
+    The newest `candidates` attendees of an event matching a tsquery, ranked
+    (ts_rank_cd, then name), first `limit` of them. Built once: this runs per
+    keystroke, and building it took longer than running it for most prefixes.
+    """
+    query = func.to_tsquery("simple", bindparam("tsquery", type_=String))
+    candidates = (
+        select(Attendee)
+        .options(undefer(Attendee.search_vector))
+        .where(
+            Attendee.event_id == bindparam("event_id", type_=UUID(as_uuid=True)),
+            Attendee.search_vector.op("@@")(query),
+        )
+        .order_by(Attendee.created_at.desc(), Attendee.id.desc())
+        .limit(bindparam("candidates", type_=Integer))
+        .subquery()
+    )
+    # ranked outside the subquery: only the candidates kept, not every match, pay for it
+    candidate = aliased(Attendee, candidates)
+    return (
+        select(candidate)
+        .order_by(func.ts_rank_cd(candidates.c.search_vector, query).desc(), candidate.full_name)
+        .limit(bindparam("limit", type_=Integer))
+    )
+
+
+_SEARCH_STATEMENT = _search_statement()
+
+
+def search_attendees(db: Session, event_id: uuid.UUID, q: str, limit: int) -> list[Attendee]:
+    """
+    Ranked search over names and emails for interactive typing.
+
+    Every word of `q` is matched as a prefix against the GIN-indexed
+    search_vector, best matches first (ts_rank_cd, then name). Only the
+    newest `limit` * CANDIDATES_PER_RESULT matches are ranked, so the cost
+    follows the page, not the number of matches: for a one-letter prefix on
+    an event with a million attendees, Postgres walks the event's
+    newest-first index and stops once it has them, as the attendee listing
+    does; rare matches come from the GIN index. When that leaves the page
+    short and pg_trgm is installed, names similar to `q` fill the rest,
+    which is what catches typos ("jonh" -> "John").
+    """
+    tsquery = prefix_query(q)
+    if tsquery is None:
+        return []
+
+    params = {
+        "event_id": event_id,
+        "tsquery": tsquery,
+        "candidates": limit * CANDIDATES_PER_RESULT,
+        "limit": limit,
+    }
+    hits = list(db.scalars(_SEARCH_STATEMENT, params))
+
+    if len(hits) < limit and trigram_available(db):
+        found = [a.id for a in hits]
+        hits += db.scalars(
+            select(Attendee)
+            .where(
+                Attendee.event_id == event_id,
+                Attendee.full_name.op("%")(q),
+                Attendee.id.not_in(found),
+            )
+            .order_by(func.similarity(Attendee.full_name, q).desc())
+            .limit(limit - len(hits))
+        )
+    return hits
@@ -0,0 +1,494 @@
+import enum
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import (
+    DateTime,
+    String,
+    and_,
+    bindparam,
+    case,
+    cast,
+    false,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.models.attendee import Attendee
+from app.models.event import Event
+from app.services.qr import InvalidTokenError, SignedToken, verify_qr_token
+from app.services.scan_cache import RecentCheckIn, scan_cache
+from app.services.scanner_cache import scanner_key_cache
+from app.services.token_index import EventIndex, IndexEntry, token_index
+
+
+class CheckInStatus(str, enum.Enum):
+    CHECKED_IN = "checked_in"
+    ALREADY_CHECKED_IN = "already_checked_in"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+    UNAUTHORIZED = "unauthorized"
+
+
+@dataclass
+class CheckInResult:
+    status: CheckInStatus
+    attendee_id: uuid.UUID | None = None
+    event_id: uuid.UUID | None = None
+    full_name: str | None = None
+    checked_in_at: datetime | None = None
+    # when this scan happened (see _scan_time); the check-in log records it
+    scanned_at: datetime | None = None
+
+
+@dataclass
+class Scan:
+    qr_token: str
+    user_id: uuid.UUID | None = None
+    scanner_key: str | None = None
+    scanned_at: datetime | None = None
+
+
+def _checkin_statement(by_event: bool, by_id: bool = False):
+    """
+    One statement that looks every scanned token up, authorizes each scan
+    against its event (owner when a JWT user is present, scanner key otherwise)
+    and claims the check-in only if `checked_in_at IS NULL`.
+
+    Scans are passed as parallel arrays and unnested server-side, so the
+    statement has the same shape for one scan or a thousand. The outer SELECT
+    returns one row per known token: "no row" means an unknown token and
+    `claimed` tells a first scan from a repeat one.
+
+    With `by_event`, every scan carries the event its scanner key was already
+    resolved to (see scanner_cache), and the events table is not touched.
+
+    With `by_id`, scans of signed tokens also carry the attendee id the token
+    names, and that attendee is read by primary key; the qr_token index is
+    only probed for the opaque tokens of the batch (a NULL attendee id).
+    """
+    arrays = [
+        (cast(bindparam("qr_tokens"), ARRAY(String)), "qr_token"),
+        (cast(bindparam("scanned_ats"), ARRAY(DateTime(timezone=True))), "scanned_at"),
+    ]
+    if by_event:
+        arrays.append((cast(bindparam("event_ids"), ARRAY(UUID(as_uuid=True))), "event_id"))
+    else:
+        arrays.append((cast(bindparam("user_ids"), ARRAY(UUID(as_uuid=True))), "user_id"))
+        arrays.append((cast(bindparam("scanner_keys"), ARRAY(String)), "scanner_key"))
+    if by_id:
+        arrays.append((cast(bindparam("attendee_ids"), ARRAY(UUID(as_uuid=True))), "attendee_id"))
+    scans = (
+        func.unnest(*(array for array, _ in arrays))
+        .table_valued(*(name for _, name in arrays), with_ordinality="idx")
+        .render_derived(name="scans")
+    )
+
+    if by_event:
+        authorized = Attendee.event_id == scans.c.event_id
+    else:
+        authorized = case(
+            (scans.c.user_id.is_not(None), Event.owner_user_id == scans.c.user_id),
+            (scans.c.scanner_key.is_not(None), Event.scanner_key == scans.c.scanner_key),
+            else_=false(),
+        )
+
+    if by_id:
+        # an alias, or the subquery would correlate to the joined attendees row
+        opaque = aliased(Attendee)
+        by_token = select(opaque.id).where(opaque.qr_token == scans.c.qr_token)
+        found = and_(
+            Attendee.id == func.coalesce(scans.c.attendee_id, by_token.scalar_subquery()),
+            # the row must still carry this token
+            Attendee.qr_token == scans.c.qr_token,
+        )
+    else:
+        found = Attendee.qr_token == scans.c.qr_token
+    target = (
+        select(
+            scans.c.idx,
+            scans.c.scanned_at,
+            Attendee.id,
+            Attendee.event_id,
+            Attendee.full_name,
+            Attendee.checked_in_at,
+            authorized.label("authorized"),
+        )
+        .select_from(scans)
+        .join(Attendee, found)
+    )
+    if not by_event:
+        target = target.join(Event, Event.id == Attendee.event_id)
+    target = target.cte("target")
+
+    claimed = (
+        update(Attendee)
+        .where(
+            Attendee.id == target.c.id,
+            target.c.authorized,
+            Attendee.checked_in_at.is_(None),
+        )
+        .values(checked_in_at=target.c.scanned_at)
+        .returning(Attendee.id, Attendee.checked_in_at)
+        .cte("claimed")
+    )
+
+    return select(
+        target.c.idx,
+        target.c.id,
+        target.c.event_id,
+        target.c.full_name,
+        target.c.authorized,
+        func.coalesce(claimed.c.checked_in_at, target.c.checked_in_at).label("checked_in_at"),
+        claimed.c.id.is_not(None).label("claimed"),
+    ).select_from(target.outerjoin(claimed, claimed.c.id == target.c.id))
+
+
+def _claim_statement():
+    """
+    Claims attendees whose token was resolved in memory (see token_index):
+    only the conditional UPDATE by primary key is left for Postgres.
+    """
+    claims = (
+        func.unnest(
+            cast(bindparam("attendee_ids"), ARRAY(UUID(as_uuid=True))),
+            cast(bindparam("scanned_ats"), ARRAY(DateTime(timezone=True))),
+        )
+        .table_valued("id", "scanned_at")
+        .render_derived(name="claims")
+    )
+    return (
+        update(Attendee)
+        .where(Attendee.id == claims.c.id, Attendee.checked_in_at.is_(None))
+        .values(checked_in_at=claims.c.scanned_at)
+        .returning(Attendee.id, Attendee.checked_in_at)
+    )
+
+
+# keyed by (by_event, by_id)
+_STATEMENTS = {
+    (by_event, by_id): _checkin_statement(by_event, by_id)
+    for by_event in (False, True)
+    for by_id in (False, True)
+}
+_CLAIM_STATEMENT = _claim_statement()
+
+
+_forged = counter("signed_tokens.forged")
+_wrong_event = counter("signed_tokens.wrong_event")
+_clamped = counter("checkin.scanned_at_clamped")
+
+
+def _scan_time(scanned_at: datetime | None, now: datetime) -> datetime:
+    # replayed scans keep the client's scan time, but never land in the future
+    # nor further back than CHECKIN_MAX_SCAN_AGE_S
+    if scanned_at is None:
+        return now
+    if scanned_at.tzinfo is None:
+        scanned_at = scanned_at.replace(tzinfo=timezone.utc)
+    oldest = now - timedelta(seconds=settings.CHECKIN_MAX_SCAN_AGE_S)
+    clamped = min(max(scanned_at, oldest), now)
+    if clamped != scanned_at:
+        _clamped.inc()
+    return clamped
+
+
+def _autocommit(db: Session) -> None:
+    if not db.in_transaction():
+        # a lone UPDATE is atomic by itself; skip the BEGIN/COMMIT round trips
+        db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+
+
+def _from_scan_cache(scan: Scan, event_id: uuid.UUID | None) -> CheckInResult | None:
+    """Answers debounced repeats and known-bad tokens without a query."""
+    if scan_cache.is_rejected(scan.qr_token):
+        return CheckInResult(status=CheckInStatus.NOT_FOUND)
+    recent = scan_cache.recent(scan.qr_token)
+    if recent is None:
+        return None
+    if scan.user_id is not None:
+        authorized = scan.user_id == recent.owner_user_id
+    else:
+        authorized = event_id is not None and event_id == recent.event_id
+    if not authorized:
+        return None
+    return CheckInResult(
+        status=CheckInStatus.ALREADY_CHECKED_IN,
+        attendee_id=recent.attendee_id,
+        event_id=recent.event_id,
+        full_name=recent.full_name,
+        checked_in_at=recent.checked_in_at,
+    )
+
+
+def _verify_signed(
+    scan: Scan, event_id: uuid.UUID | None
+) -> tuple[SignedToken | None, CheckInResult | None]:
+    """
+    Checks a signed token's MAC and event on the CPU. Returns the verified
+    token (None for opaque tokens), or a refusal that needs no query: forged
+    tokens are NOT_FOUND, and a scanner key resolved to another event than the
+    token's is UNAUTHORIZED, as the database would have answered.
+    """
+    try:
+        signed = verify_qr_token(scan.qr_token)
+    except InvalidTokenError:
+        _forged.inc()
+        return None, CheckInResult(status=CheckInStatus.NOT_FOUND)
+    if signed is not None and event_id is not None and signed.event_id != event_id:
+        _wrong_event.inc()
+        return signed, CheckInResult(
+            status=CheckInStatus.UNAUTHORIZED,
+            attendee_id=signed.attendee_id,
+            event_id=signed.event_id,
+        )
+    return signed, None
+
+
+def _find_indexed(scan: Scan, event_id: uuid.UUID | None) -> tuple[EventIndex, IndexEntry] | None:
+    """The scan's attendee from the warm token index, if the scan is allowed to claim it."""
+    if scan.user_id is not None:
+        found = token_index.find(scan.qr_token)
+        if found is not None and found[0].owner_user_id == scan.user_id:
+            return found
+        return None
+    if event_id is not None:
+        return token_index.find(scan.qr_token, event_id)
+    # unresolved scanner keys (and refusals) are answered by the database
+    return None
+
+
+def _claim_indexed(
+    db: Session,
+    claims: list[tuple[Scan, EventIndex, IndexEntry]],
+    by_token: dict[str, CheckInResult],
+    raced: dict[uuid.UUID, CheckInResult],
+) -> None:
+    _autocommit(db)
+    rows = db.execute(
+        _CLAIM_STATEMENT,
+        {
+            "attendee_ids": [entry.attendee_id for _, _, entry in claims],
+            "scanned_ats": [scan.scanned_at for scan, _, _ in claims],
+        },
+    ).all()
+    db.commit()
+
+    claimed = dict(rows)
+    for scan, index, entry in claims:
+        checked_in_at = claimed.get(entry.attendee_id)
+        result = CheckInResult(
+            status=(
+                CheckInStatus.CHECKED_IN
+                if checked_in_at is not None
+                else CheckInStatus.ALREADY_CHECKED_IN
+            ),
+            attendee_id=entry.attendee_id,
+            event_id=index.event_id,
+            full_name=entry.full_name,
+            checked_in_at=checked_in_at,
+        )
+        if checked_in_at is None:
+            # checked in by another worker since the index was loaded
+            raced[entry.attendee_id] = result
+        by_token[scan.qr_token] = result
+
+
+def _check_in_db(
+    db: Session,
+    scans: list[Scan],
+    event_ids: list[uuid.UUID | None],
+    attendee_ids: list[uuid.UUID | None],
+    by_token: dict[str, CheckInResult],
+    raced: dict[uuid.UUID, CheckInResult],
+) -> None:
+    by_event = all(event_id is not None for event_id in event_ids)
+    by_id = any(attendee_id is not None for attendee_id in attendee_ids)
+    params = {
+        "qr_tokens": [s.qr_token for s in scans],
+        "scanned_ats": [s.scanned_at for s in scans],
+    }
+    if by_event:
+        params["event_ids"] = event_ids
+    else:
+        params["user_ids"] = [s.user_id for s in scans]
+        params["scanner_keys"] = [s.scanner_key for s in scans]
+    if by_id:
+        params["attendee_ids"] = attendee_ids
+    statement = _STATEMENTS[by_event, by_id]
+    generation = scanner_key_cache.generation
+    _autocommit(db)
+    rows = db.execute(statement, params).all()
+    db.commit()
+
+    for row in rows:
+        scan = scans[row.idx - 1]
+        if not row.authorized:
+            status = (
+                CheckInStatus.FORBIDDEN if scan.user_id is not None else CheckInStatus.UNAUTHORIZED
+            )
+            # ids are kept for the check-in log; routes never echo them on errors
+            by_token[scan.qr_token] = CheckInResult(
+                status=status, attendee_id=row.id, event_id=row.event_id
+            )
+            continue
+
+        if not by_event and scan.user_id is None:
+            scanner_key_cache.put(scan.scanner_key, row.event_id, generation)
+
+        result = CheckInResult(
+            status=CheckInStatus.CHECKED_IN if row.claimed else CheckInStatus.ALREADY_CHECKED_IN,
+            attendee_id=row.id,
+            event_id=row.event_id,
+            full_name=row.full_name,
+            checked_in_at=row.checked_in_at,
+        )
+        if result.checked_in_at is None:
+            # lost the race: a concurrent scan committed after our snapshot was taken
+            raced[row.id] = result
+        by_token[scan.qr_token] = result
+
+
+def check_in_many(db: Session, scans: Sequence[Scan]) -> list[CheckInResult]:
+    """
+    Set-based check-in: every scan is resolved by one statement in one
+    transaction, with the same `checked_in_at IS NULL` guard as a single scan.
+    Results are returned in input order. A token scanned more than once in the
+    same batch is claimed by its first occurrence; later ones are repeats.
+
+    Signed tokens (see services.qr) are verified first: forged ones and those
+    of another event than the scanner key's are refused without a query, and
+    valid ones are looked up by attendee id. Repeats of recent check-ins and
+    tokens that recently matched nothing are answered by scan_cache. Tokens
+    of warm events (see token_index) skip the lookup: repeats are answered
+    from memory and first scans only run the UPDATE by primary key.
+    """
+    if not scans:
+        return []
+
+    now = datetime.now(timezone.utc)
+    # from here on every scan carries the time it is recorded at
+    scans = [replace(scan, scanned_at=_scan_time(scan.scanned_at, now)) for scan in scans]
+
+    # each token goes to the database once; duplicates are resolved below
+    first_index: dict[str, int] = {}
+    for i, scan in enumerate(scans):
+        first_index.setdefault(scan.qr_token, i)
+    unique = [scans[i] for i in first_index.values()]
+
+    # scanner keys already seen by this worker skip the events lookup entirely
+    event_ids = [
+        scanner_key_cache.get_event_id(s.scanner_key)
+        if s.user_id is None and s.scanner_key
+        else None
+        for s in unique
+    ]
+
+    by_token: dict[str, CheckInResult] = {}
+    raced: dict[uuid.UUID, CheckInResult] = {}
+    claims: list[tuple[Scan, EventIndex, IndexEntry]] = []
+    rest: list[Scan] = []
+    rest_event_ids: list[uuid.UUID | None] = []
+    rest_attendee_ids: list[uuid.UUID | None] = []
+    for scan, event_id in zip(unique, event_ids, strict=True):
+        signed, refused = _verify_signed(scan, event_id)
+        if refused is not None:
+            by_token[scan.qr_token] = refused
+            continue
+        cached = _from_scan_cache(scan, event_id)
+        if cached is not None:
+            by_token[scan.qr_token] = cached
+            continue
+        found = _find_indexed(scan, event_id)
+        if found is None:
+            rest.append(scan)
+            rest_event_ids.append(event_id)
+            rest_attendee_ids.append(signed.attendee_id if signed is not None else None)
+        elif found[1].checked_in_at is not None:
+            index, entry = found
+            by_token[scan.qr_token] = CheckInResult(
+                status=CheckInStatus.ALREADY_CHECKED_IN,
+                attendee_id=entry.attendee_id,
+                event_id=index.event_id,
+                full_name=entry.full_name,
+                checked_in_at=entry.checked_in_at,
+            )
+        else:
+            claims.append((scan, *found))
+
+    if claims:
+        _claim_indexed(db, claims, by_token, raced)
+    if rest:
+        _check_in_db(db, rest, rest_event_ids, rest_attendee_ids, by_token, raced)
+
+    if raced:
+        for attendee_id, checked_in_at in db.execute(
+            select(Attendee.id, Attendee.checked_in_at).where(Attendee.id.in_(raced))
+        ):
+            raced.pop(attendee_id).checked_in_at = checked_in_at
+        # an indexed attendee that no longer exists
+        for scan in unique:
+            result = by_token.get(scan.qr_token)
+            if result is not None and result.attendee_id in raced:
+                token_index.discard(result.event_id, scan.qr_token)
+                by_token[scan.qr_token] = CheckInResult(status=CheckInStatus.NOT_FOUND)
+
+    for scan in unique:
+        result = by_token.get(scan.qr_token)
+        if result is None:
+            scan_cache.reject(scan.qr_token)
+        elif result.checked_in_at is not None:
+            # keeps warm events current with check-ins made through the database path
+            token_index.observe(
+                result.event_id,
+                scan.qr_token,
+                result.attendee_id,
+                result.full_name,
+                result.checked_in_at,
+            )
+            scan_cache.remember(
+                scan.qr_token,
+                RecentCheckIn(
+                    attendee_id=result.attendee_id,
+                    event_id=result.event_id,
+                    full_name=result.full_name,
+                    checked_in_at=result.checked_in_at,
+                    # an authorized JWT scan proves the user owns the event
+                    owner_user_id=scan.user_id,
+                ),
+            )
+
+    results: list[CheckInResult] = []
+    for i, scan in enumerate(scans):
+        result = by_token.get(scan.qr_token, CheckInResult(status=CheckInStatus.NOT_FOUND))
+        status = result.status
+        if i != first_index[scan.qr_token] and status is CheckInStatus.CHECKED_IN:
+            status = CheckInStatus.ALREADY_CHECKED_IN
+        results.append(replace(result, status=status, scanned_at=scan.scanned_at))
+    return results
+
+
+def check_in(
+    db: Session,
+    qr_token: str,
+    user_id: uuid.UUID | None = None,
+    scanner_key: str | None = None,
+    scanned_at: datetime | None = None,
+) -> CheckInResult:
+    """
+    Idempotent check-in in a single round trip:
+    - Unknown token => NOT_FOUND
+    - JWT user that does not own the event => FORBIDDEN
+    - No user and missing/wrong scanner key => UNAUTHORIZED
+    - Already checked in => ALREADY_CHECKED_IN
+    - First check-in => CHECKED_IN
+    """
+    scan = Scan(qr_token=qr_token, user_id=user_id, scanner_key=scanner_key, scanned_at=scanned_at)
+    return check_in_many(db, [scan])[0]
@@ -0,0 +1,157 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import psycopg
+from sqlalchemy import Engine
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.session import engine
+from app.services.checkin import CheckInResult
+
+logger = logging.getLogger(__name__)
+
+_COPY_SQL = (
+    "COPY checkin_log (id, event_id, attendee_id, device_id, outcome, latency_ms, scanned_at) "
+    "FROM STDIN"
+)
+
+
+@dataclass
+class CheckinLogEntry:
+    event_id: uuid.UUID | None
+    attendee_id: uuid.UUID | None
+    device_id: str | None
+    outcome: str
+    latency_ms: float
+    scanned_at: datetime
+
+
+class CheckinLogWriter:
+    """
+    Buffers scan attempts in memory and a background thread COPYs them into
+    `checkin_log` in batches, so logging never adds a round trip to a scan.
+
+    The buffer is bounded: when Postgres cannot keep up, new entries are
+    dropped (and counted) rather than slowing the doors down.
+    """
+
+    def __init__(
+        self,
+        db_engine: Engine,
+        flush_interval_s: float,
+        max_batch: int,
+        max_queue: int,
+        enabled: bool = True,
+    ) -> None:
+        self._engine = db_engine
+        self.enabled = enabled
+        self.flush_interval_s = flush_interval_s
+        self.max_batch = max_batch
+        self._queue: queue.Queue[CheckinLogEntry] = queue.Queue(maxsize=max_queue)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # serializes the background flush with explicit flush() calls
+        self._flush_lock = threading.Lock()
+
+        self.written = counter("checkin_log.written")
+        self.dropped = counter("checkin_log.dropped")
+        self.failed = counter("checkin_log.failed")
+
+    def record(self, result: CheckInResult, device_id: str | None, latency_ms: float) -> None:
+        if not self.enabled:
+            return
+        entry = CheckinLogEntry(
+            event_id=result.event_id,
+            attendee_id=result.attendee_id,
+            device_id=device_id,
+            outcome=result.status.value,
+            latency_ms=latency_ms,
+            # the time check-in stored: a replayed offline scan is logged when it happened
+            scanned_at=result.scanned_at or datetime.now(timezone.utc),
+        )
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped.inc()
+
+    def flush(self) -> None:
+        """Writes everything buffered so far; also used at shutdown and by tests."""
+        with self._flush_lock:
+            while batch := self._drain(self.max_batch):
+                self._write(batch)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="checkin-log", daemon=True)
+                self._thread.start()
+
+    def _drain(self, limit: int) -> list[CheckinLogEntry]:
+        batch: list[CheckinLogEntry] = []
+        try:
+            while len(batch) < limit:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            # let the buffer fill for one interval instead of writing row by row
+            time.sleep(self.flush_interval_s)
+            self.flush()
+
+    def _copy(self, batch: list[CheckinLogEntry]) -> None:
+        with self._engine.begin() as conn:
+            raw = conn.connection.driver_connection
+            with raw.cursor() as cur, cur.copy(_COPY_SQL) as copy:
+                for e in batch:
+                    copy.write_row(
+                        (
+                            uuid.uuid4(),
+                            e.event_id,
+                            e.attendee_id,
+                            e.device_id,
+                            e.outcome,
+                            e.latency_ms,
+                            e.scanned_at,
+                        )
+                    )
+
+    def _write(self, batch: list[CheckinLogEntry]) -> None:
+        try:
+            self._copy(batch)
+        except (psycopg.IntegrityError, psycopg.DataError):
+            # one bad row (e.g. its event deleted meanwhile) fails the whole COPY:
+            # bisect to keep the others, a few round trips per bad row
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                self._write(batch[:middle])
+                self._write(batch[middle:])
+                return
+            self.failed.inc()
+            logger.warning("dropped a check-in log entry", exc_info=True)
+            return
+        except Exception:
+            self.failed.inc(len(batch))
+            logger.exception("failed to write %d check-in log entries", len(batch))
+            return
+        self.written.inc(len(batch))
+
+
+checkin_log_writer = CheckinLogWriter(
+    engine,
+    flush_interval_s=settings.CHECKIN_LOG_FLUSH_MS / 1000,
+    max_batch=settings.CHECKIN_LOG_MAX_BATCH,
+    max_queue=settings.CHECKIN_LOG_MAX_QUEUE,
+    enabled=settings.CHECKIN_LOG_ENABLED,
+)
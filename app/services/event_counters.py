@@ -0,0 +1,147 @@
+import logging
+import threading
+import uuid
+from collections.abc import Sequence
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.session import SessionLocal
+from app.models.event import Event
+from app.models.event_counter import EventCounter
+
+logger = logging.getLogger(__name__)
+
+# arbitrary key of the advisory lock that keeps reconciliation to one worker at a time
+_RECONCILE_LOCK = 0x51C0_0018
+
+# Counts and stored counters are read by one statement, so they come from the
+# same snapshot. A transaction's attendee changes and its trigger deltas
+# commit together, so concurrent writers leave `truth - stored` unchanged:
+# adding that drift on top of whatever the counters hold by then is safe
+# without locking anything.
+_RECONCILE_SQL = text("""
+    WITH truth AS (
+        SELECT e.id AS event_id, count(a.id) AS attendees, count(a.checked_in_at) AS checked_in
+        FROM events e LEFT JOIN attendees a ON a.event_id = e.id
+        WHERE e.id = ANY(:event_ids)
+        GROUP BY e.id
+    ), stored AS (
+        SELECT event_id, sum(attendees) AS attendees, sum(checked_in) AS checked_in
+        FROM event_counters
+        WHERE event_id = ANY(:event_ids)
+        GROUP BY event_id
+    )
+    INSERT INTO event_counters (event_id, shard, attendees, checked_in)
+    SELECT t.event_id, 0,
+           t.attendees - coalesce(s.attendees, 0),
+           t.checked_in - coalesce(s.checked_in, 0)
+    FROM truth t LEFT JOIN stored s ON s.event_id = t.event_id
+    WHERE t.attendees <> coalesce(s.attendees, 0) OR t.checked_in <> coalesce(s.checked_in, 0)
+    ORDER BY t.event_id
+    ON CONFLICT (event_id, shard) DO UPDATE
+    SET attendees = event_counters.attendees + EXCLUDED.attendees,
+        checked_in = event_counters.checked_in + EXCLUDED.checked_in
+    RETURNING event_id
+""")
+
+
+def counts_query(event_id: uuid.UUID) -> Select:
+    """(attendees, checked_in) of one event: a sum over at most a few counter rows."""
+    return select(
+        func.coalesce(func.sum(EventCounter.attendees), 0),
+        func.coalesce(func.sum(EventCounter.checked_in), 0),
+    ).where(EventCounter.event_id == event_id)
+
+
+def reconcile(db: Session, event_ids: Sequence[uuid.UUID]) -> list[uuid.UUID]:
+    """
+    Recounts the given events and corrects their counters where they drifted
+    (e.g. rows changed while the triggers were disabled, or a manual fix).
+    Returns the events that were repaired.
+    """
+    repaired = list(db.scalars(_RECONCILE_SQL, {"event_ids": list(event_ids)}))
+    db.commit()
+    return repaired
+
+
+class CounterReconciler:
+    """
+    Daemon thread that walks every event, `batch_size` at a time, every
+    `interval_s` seconds and repairs counter drift. Each batch is one
+    statement over the batch's attendees. Workers coordinate through an
+    advisory lock, so only one of them runs a pass at a time.
+    """
+
+    def __init__(
+        self,
+        interval_s: float,
+        batch_size: int = 500,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.interval_s = interval_s
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self.repaired = counter("event_counters.repaired")
+
+    def run_once(self) -> list[uuid.UUID]:
+        """One full pass; returns the events that were repaired."""
+        repaired: list[uuid.UUID] = []
+        after: uuid.UUID | None = None
+        with self._session_factory() as db:
+            while not self._stop.is_set():
+                stmt = select(Event.id).order_by(Event.id).limit(self.batch_size)
+                if after is not None:
+                    stmt = stmt.where(Event.id > after)
+                event_ids = list(db.scalars(stmt))
+                if not event_ids:
+                    break
+                # held until the batch commits
+                if not db.scalar(select(func.pg_try_advisory_xact_lock(_RECONCILE_LOCK))):
+                    db.rollback()
+                    logger.info("counter reconciliation already running elsewhere")
+                    break
+                repaired += reconcile(db, event_ids)
+                after = event_ids[-1]
+        if repaired:
+            self.repaired.inc(len(repaired))
+            logger.warning("repaired drifted counters of %d events", len(repaired))
+        return repaired
+
+    def start(self) -> None:
+        if self.interval_s <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="counter-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        # the counters are right by construction; the first pass can wait
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("counter reconciliation failed")
+
+
+counter_reconciler = CounterReconciler(
+    interval_s=settings.EVENT_COUNTERS_RECONCILE_S,
+    batch_size=settings.EVENT_COUNTERS_RECONCILE_BATCH,
+)
+
+
+if __name__ == "__main__":
+    # one pass on demand, e.g. from cron or after a bulk fix in psql
+    logging.basicConfig(level=logging.INFO)
+    print(f"repaired {len(counter_reconciler.run_once())} events")
@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import counter, histogram
+from app.db.session import SessionLocal
+from app.services.checkin import CheckInResult, Scan, check_in_many
+
+logger = logging.getLogger(__name__)
+
+_Pending = tuple[Scan, "Future[CheckInResult]", float]
+
+
+class GroupCommitter:
+    """
+    Merges check-ins that arrive within `window_s` of each other into one
+    set-based UPDATE and one commit (see check_in_many), then resolves each
+    caller's future with its own result.
+
+    A single daemon thread owns the flushes, so at most one group is being
+    written at a time and each flush uses one pooled connection.
+    """
+
+    def __init__(
+        self,
+        window_s: float,
+        max_batch: int,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.window_s = window_s
+        self.max_batch = max_batch
+        self._session_factory = session_factory
+        self._queue: queue.Queue[_Pending] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+        self.batch_size = histogram(
+            "checkin.group_commit.batch_size", (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+        )
+        self.wait_ms = histogram(
+            "checkin.group_commit.wait_ms", (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+        )
+        self.flushes = counter("checkin.group_commit.flushes")
+
+    def submit(self, scan: Scan) -> "Future[CheckInResult]":
+        self._ensure_started()
+        future: Future[CheckInResult] = Future()
+        self._queue.put((scan, future, time.perf_counter()))
+        return future
+
+    def check_in(self, scan: Scan) -> CheckInResult:
+        return self.submit(scan).result()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="checkin-group-commit", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self) -> list[_Pending]:
+        first = self._queue.get()
+        batch = [first]
+        # the window opens when the first scan of the group arrives
+        deadline = first[2] + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._flush(self._collect())
+
+    def _flush(self, batch: list[_Pending]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            self.wait_ms.observe((started - enqueued_at) * 1000)
+
+        # a token is written at most once per statement: repeats (possibly with
+        # other credentials) go into a follow-up statement in the same flush
+        while batch:
+            seen: set[str] = set()
+            group: list[_Pending] = []
+            rest: list[_Pending] = []
+            for pending in batch:
+                if pending[0].qr_token in seen:
+                    rest.append(pending)
+                else:
+                    seen.add(pending[0].qr_token)
+                    group.append(pending)
+            self._write(group)
+            batch = rest
+
+    def _write(self, group: list[_Pending]) -> None:
+        self.flushes.inc()
+        self.batch_size.observe(len(group))
+        try:
+            with self._session_factory() as db:
+                results = check_in_many(db, [scan for scan, _, _ in group])
+        except Exception as e:
+            logger.exception("group commit of %d check-ins failed", len(group))
+            for _, future, _ in group:
+                future.set_exception(e)
+            return
+        for (_, future, _), result in zip(group, results, strict=True):
+            future.set_result(result)
+
+
+group_committer = GroupCommitter(
+    window_s=settings.CHECKIN_GROUP_COMMIT_WINDOW_MS / 1000,
+    max_batch=settings.CHECKIN_GROUP_COMMIT_MAX_BATCH,
+)
@@ -0,0 +1,49 @@
+import base64
+import uuid
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from sqlalchemy import Select, tuple_
+
+T = TypeVar("T")
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except ValueError as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def newest_first(stmt: Select, model: Any, limit: int, cursor: str | None = None) -> Select:
+    """
+    Orders `stmt` by (created_at, id) descending and, given a cursor, starts
+    right after the row it points to. Unlike OFFSET, the index seek costs
+    the same on every page. One extra row is fetched to tell if a next page
+    exists (see `split_page`).
+    """
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def split_page(rows: Sequence[T], limit: int) -> tuple[list[T], str | None]:
+    """The page's items and the cursor of the next page (None on the last one)."""
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+    last: Any = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
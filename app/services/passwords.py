@@ -0,0 +1,140 @@
+import asyncio
+import functools
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, TypeVar
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# bcrypt cost factors calibration may pick from; each step doubles the work
+MAX_ROUNDS = 16
+_LATENCY_BUCKETS_MS = (50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0)
+
+
+class PasswordPoolBusyError(RuntimeError):
+    """Every hashing process is busy and the queue is full; the caller should retry later."""
+
+
+@functools.lru_cache(maxsize=4)
+def _context(rounds: int) -> CryptContext:
+    # min_rounds: hashes below the current cost need an update, stronger ones are kept
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+def _hash(password: str, rounds: int) -> str:
+    # runs in a worker process
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, password_hash: str, rounds: int) -> tuple[bool, str | None]:
+    # runs in a worker process; a new hash comes back when the stored one is below `rounds`
+    return _context(rounds).verify_and_update(password, password_hash)
+
+
+def calibrate_rounds(target_ms: float, min_rounds: int, samples: int = 2) -> int:
+    """
+    The bcrypt cost whose hash takes closest to `target_ms` on this machine,
+    never below `min_rounds`. Times `min_rounds` (the cheapest allowed cost)
+    and extrapolates, since every extra round doubles the work.
+    """
+    elapsed = math.inf
+    for _ in range(samples):
+        started = time.perf_counter()
+        _hash("calibration", min_rounds)
+        elapsed = min(elapsed, time.perf_counter() - started)
+    rounds = min_rounds + round(math.log2(target_ms / 1000 / elapsed))
+    return max(min_rounds, min(MAX_ROUNDS, rounds))
+
+
+class PasswordHasher:
+    """
+    bcrypt on a dedicated process pool, so a burst of logins burns its own
+    CPUs instead of holding the threads that serve check-ins; routes await
+    the result without blocking a thread.
+
+    At most `processes` hashes run at once and `max_queue` more wait; past
+    that, calls fail fast with PasswordPoolBusyError (a 503) rather than
+    queueing for seconds behind the burst.
+    """
+
+    def __init__(self, processes: int, max_queue: int, rounds: int) -> None:
+        self.processes = processes
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._pending = 0
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+        self.rejected = counter("passwords.rejected")
+        self.rehashed = counter("passwords.rehashed")
+        self.latency_ms = histogram("passwords.latency_ms", _LATENCY_BUCKETS_MS)
+
+    def calibrate(self, target_ms: float, min_rounds: int) -> int:
+        """Sets the cost for new hashes from a measurement; logins upgrade older hashes."""
+        self.rounds = calibrate_rounds(target_ms, min_rounds)
+        logger.info("bcrypt cost set to %d rounds (target %.0f ms)", self.rounds, target_ms)
+        return self.rounds
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that runs server threads is not safe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        # only touched from the event loop, so a plain counter is enough
+        if self._pending >= self.processes + self.max_queue:
+            self.rejected.inc()
+            raise PasswordPoolBusyError("password hashing is saturated")
+        self._pending += 1
+        started = time.perf_counter()
+        try:
+            # cancelled with the request while still queued: the hash is never computed
+            return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self._pending -= 1
+            self.latency_ms.observe((time.perf_counter() - started) * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        """(matches, replacement hash when the stored one is below the current cost)."""
+        ok, new_hash = await self._run(_verify_and_update, password, password_hash, self.rounds)
+        if new_hash is not None:
+            self.rehashed.inc()
+        return ok, new_hash
+
+
+password_hasher = PasswordHasher(
+    processes=settings.PASSWORD_POOL_PROCESSES,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    rounds=settings.PASSWORD_HASH_ROUNDS,
+)
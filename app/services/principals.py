@@ -0,0 +1,126 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.listener import listener
+from app.models.user import User
+
+# notified by triggers on users (see the notify_user_auth_changes migration)
+INVALIDATE_CHANNEL = "user_auth_changed"
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """The authenticated user, as routes see it: only what they read from it."""
+
+    id: uuid.UUID
+    email: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email)
+
+
+def token_digest(token: str) -> str:
+    # bearer tokens are credentials: the cache only ever holds their digest
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PrincipalCache:
+    """
+    Maps verified bearer tokens (by digest) to their principal, so a request
+    with a known token skips both the JWT check and the users lookup.
+
+    An entry lives until its token expires, and at most `ttl` seconds as a
+    safety net for missed invalidations; the least recently used entries go
+    first once `max_size` is reached. Deleting a user or changing their
+    password or email fires a NOTIFY that evicts their entries in every
+    worker (`invalidate_user`).
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        # digest -> (principal, expiry as a wall-clock timestamp)
+        self._data: OrderedDict[str, tuple[Principal, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by every invalidation, see put()
+        self._generation = 0
+
+        self.hits = counter("principal_cache.hits")
+        self.misses = counter("principal_cache.misses")
+        self.invalidations = counter("principal_cache.invalidations")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, token: str) -> Principal | None:
+        if not self.max_size:
+            return None
+        digest = token_digest(token)
+        with self._lock:
+            entry = self._data.get(digest)
+            if entry is not None and entry[1] <= time.time():
+                del self._data[digest]
+                entry = None
+            if entry is None:
+                self.misses.inc()
+                return None
+            self._data.move_to_end(digest)
+        self.hits.inc()
+        return entry[0]
+
+    def put(
+        self, token: str, principal: Principal, expires_at: float | None, generation: int
+    ) -> None:
+        """
+        Caches a principal resolved from the database. `generation` is the
+        value read before that lookup: if an invalidation ran in between, the
+        principal may already be stale and is not cached.
+        """
+        if not self.max_size:
+            return
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        digest = token_digest(token)
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._data[digest] = (principal, deadline)
+            self._data.move_to_end(digest)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id: str | uuid.UUID) -> None:
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            return
+        self.invalidations.inc()
+        with self._lock:
+            self._generation += 1
+            # a full scan: invalidations are rare, lookups are not
+            stale = [digest for digest, (p, _) in self._data.items() if p.id == user_id]
+            for digest in stale:
+                del self._data[digest]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_S)
+# user deletions and credential changes committed by any worker evict here too
+listener.subscribe(INVALIDATE_CHANNEL, principal_cache.invalidate_user)
+listener.on_listen(principal_cache.clear)
@@ -1,19 +1,110 @@
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import re
 import secrets
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+import uuid
+from dataclasses import dataclass
 
-from app.models.attendee import Attendee
+from app.core.config import settings
 
+# signed tokens read "q1.<kid>.<event id + attendee id>.<mac>"; opaque tokens never contain "."
+SIGNED_PREFIX = "q1."
+# bytes of HMAC-SHA256 kept in the token (128 bits)
+MAC_BYTES = 16
 
-def generate_unique_qr_token(db: Session, length_bytes: int = 32, max_tries: int = 5) -> str:
+_KID = re.compile(r"[A-Za-z0-9_-]{1,16}")
+
+
+def generate_qr_token(length_bytes: int = 32) -> str:
     """
-    Generates a URL-safe random token and ensures uniqueness in DB.
+    Generates a URL-safe random token. Uniqueness is enforced by the
+    unique constraint on attendees.qr_token (see services.attendees).
     length_bytes=32 => long token (good security).
     """
-    for _ in range(max_tries):
-        token = secrets.token_urlsafe(length_bytes)
-        exists = db.scalar(select(Attendee.id).where(Attendee.qr_token == token))
-        if not exists:
-            return token
-    # extremely unlikely unless DB is under attack or misconfigured
-    raise RuntimeError("Failed to generate unique QR token")
+    return secrets.token_urlsafe(length_bytes)
+
+
+class InvalidTokenError(ValueError):
+    """A token in the signed format that is malformed, forged or signed with an unknown key."""
+
+
+@dataclass(frozen=True)
+class SignedToken:
+    kid: str
+    event_id: uuid.UUID
+    attendee_id: uuid.UUID
+
+
+@functools.lru_cache(maxsize=8)
+def parse_signing_keys(spec: str) -> dict[str, bytes]:
+    """Parses QR_SIGNING_KEYS: comma-separated "kid:secret" pairs."""
+    keys: dict[str, bytes] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        kid, sep, secret = item.partition(":")
+        if not sep or not _KID.fullmatch(kid) or not secret:
+            raise ValueError(f"QR_SIGNING_KEYS: expected kid:secret, got {kid!r}")
+        keys[kid] = secret.encode()
+    return keys
+
+
+@functools.lru_cache(maxsize=4096)
+def _event_key(secret: bytes, event_id: uuid.UUID) -> bytes:
+    # one key per event: a key leaked from one event cannot sign tokens for another
+    return hmac.new(secret, b"qr-token:" + event_id.bytes, hashlib.sha256).digest()
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _mac(secret: bytes, event_id: uuid.UUID, signed_part: str) -> bytes:
+    key = _event_key(secret, event_id)
+    return hmac.new(key, signed_part.encode(), hashlib.sha256).digest()[:MAC_BYTES]
+
+
+def sign_qr_token(event_id: uuid.UUID, attendee_id: uuid.UUID, kid: str | None = None) -> str:
+    kid = kid or settings.QR_SIGNING_KID
+    secret = parse_signing_keys(settings.QR_SIGNING_KEYS)[kid]
+    signed_part = f"{SIGNED_PREFIX}{kid}.{_b64(event_id.bytes + attendee_id.bytes)}"
+    return f"{signed_part}.{_b64(_mac(secret, event_id, signed_part))}"
+
+
+def verify_qr_token(qr_token: str) -> SignedToken | None:
+    """
+    Checks a signed token with CPU work only. Returns None for opaque tokens,
+    which can only be resolved by the database, and raises InvalidTokenError
+    for signed ones that do not verify with any configured key.
+    """
+    if not qr_token.startswith(SIGNED_PREFIX):
+        return None
+    signed_part, _, mac = qr_token.rpartition(".")
+    try:
+        _, kid, body = signed_part.split(".")
+        ids = _unb64(body)
+        given = _unb64(mac)
+    except (ValueError, binascii.Error) as e:
+        raise InvalidTokenError("Malformed token") from e
+    if len(ids) != 32 or len(given) != MAC_BYTES:
+        raise InvalidTokenError("Malformed token")
+    secret = parse_signing_keys(settings.QR_SIGNING_KEYS).get(kid)
+    if secret is None:
+        # never issued, or signed with a key that has since been retired
+        raise InvalidTokenError("Unknown signing key")
+    event_id = uuid.UUID(bytes=ids[:16])
+    if not hmac.compare_digest(given, _mac(secret, event_id, signed_part)):
+        raise InvalidTokenError("Bad signature")
+    return SignedToken(kid=kid, event_id=event_id, attendee_id=uuid.UUID(bytes=ids[16:]))
+
+
+def new_qr_token(event_id: uuid.UUID, attendee_id: uuid.UUID) -> str:
+    """A token for a new attendee: signed when QR_SIGNING_KID is set, opaque otherwise."""
+    if settings.QR_SIGNING_KID:
+        return sign_qr_token(event_id, attendee_id)
+    return generate_qr_token()
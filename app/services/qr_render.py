@@ -0,0 +1,169 @@
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import TypeVar
+
+import segno
+
+from app.core.config import settings
+from app.core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+# bump when the rendering below changes, so cached images and ETags are not reused
+RENDER_VERSION = 1
+# tokens sent to a worker process at a time
+RENDER_CHUNK = 256
+
+
+def render_qr(qr_token: str, fmt: str, scale: int, border: int) -> bytes:
+    buffer = io.BytesIO()
+    segno.make(qr_token, error="m", micro=False).save(
+        buffer, kind=fmt, scale=scale, border=border
+    )
+    return buffer.getvalue()
+
+
+class QRImageCache:
+    """
+    Rendered QR images on disk, content-addressed: the file name is the
+    SHA-256 of everything that determines the image (token, format, scale,
+    border, RENDER_VERSION). The same digest is the image's strong ETag, so a
+    conditional request is answered without touching the disk, and the token
+    itself never appears in a file name.
+
+    Entries never go stale; the directory can be wiped at any time.
+    """
+
+    def __init__(self, directory: str, scale: int, border: int) -> None:
+        self.directory = Path(directory or os.path.join(tempfile.gettempdir(), "qr-checkin"))
+        self.scale = scale
+        self.border = border
+
+    def digest(self, qr_token: str, fmt: str) -> str:
+        key = f"{RENDER_VERSION}|{fmt}|{self.scale}|{self.border}|{qr_token}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def etag(self, qr_token: str, fmt: str) -> str:
+        return f'"{self.digest(qr_token, fmt)}"'
+
+    def _path(self, digest: str, fmt: str) -> Path:
+        return self.directory / digest[:2] / f"{digest}.{fmt}"
+
+    def get(self, qr_token: str, fmt: str) -> tuple[bytes, bool]:
+        """Returns the image and whether it came from disk; renders and stores it otherwise."""
+        path = self._path(self.digest(qr_token, fmt), fmt)
+        try:
+            return path.read_bytes(), True
+        except FileNotFoundError:
+            pass
+        image = render_qr(qr_token, fmt, self.scale, self.border)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write-then-rename, so concurrent readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(image)
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("could not cache QR image in %s", self.directory, exc_info=True)
+        return image, False
+
+
+qr_cache = QRImageCache(settings.QR_CACHE_DIR, settings.QR_SCALE, settings.QR_BORDER)
+
+_hits = counter("qr_cache.hits")
+_misses = counter("qr_cache.misses")
+
+
+def get_qr_image(qr_token: str, fmt: str) -> bytes:
+    image, hit = qr_cache.get(qr_token, fmt)
+    (_hits if hit else _misses).inc()
+    return image
+
+
+def _render_chunk(
+    qr_tokens: list[str], fmt: str, directory: str, scale: int, border: int
+) -> list[tuple[bytes, bool]]:
+    # runs in a worker process; the cache is rebuilt there from plain arguments
+    cache = QRImageCache(directory, scale, border)
+    return [cache.get(qr_token, fmt) for qr_token in qr_tokens]
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _processes() -> int:
+    return settings.QR_RENDER_PROCESSES or os.cpu_count() or 1
+
+
+def render_pool() -> ProcessPoolExecutor:
+    """The process pool batch rendering runs on, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs server threads is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=_processes(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_many(items: Iterable[tuple[T, str]], fmt: str) -> Iterator[tuple[T, bytes]]:
+    """
+    Renders (item, qr_token) pairs on the process pool and yields
+    (item, image) in input order, as soon as each chunk is done.
+
+    Only a few chunks per worker are in flight, so memory stays bounded
+    however many tokens come in, and the caller can stream results while
+    the rest is still rendering.
+    """
+    pool = render_pool()
+    in_flight: deque[tuple[list[T], Future[list[tuple[bytes, bool]]]]] = deque()
+    max_in_flight = 2 * _processes()
+    items = iter(items)
+    try:
+        while True:
+            while len(in_flight) < max_in_flight and (chunk := list(islice(items, RENDER_CHUNK))):
+                keys = [item for item, _ in chunk]
+                future = pool.submit(
+                    _render_chunk,
+                    [qr_token for _, qr_token in chunk],
+                    fmt,
+                    str(qr_cache.directory),
+                    qr_cache.scale,
+                    qr_cache.border,
+                )
+                in_flight.append((keys, future))
+            if not in_flight:
+                return
+            keys, future = in_flight.popleft()
+            for key, (image, hit) in zip(keys, future.result(), strict=True):
+                (_hits if hit else _misses).inc()
+                yield key, image
+    finally:
+        # the client went away: do not render what nobody will read
+        for _, future in in_flight:
+            future.cancel()
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import anyio
+
+from app.core.config import settings
+from app.core.metrics import counter
+
+_SPEC = re.compile(r"\s*(\d+(?:\.\d+)?)\s*/\s*(s|min|h)\s*(?::\s*(\d+(?:\.\d+)?))?\s*")
+_UNIT_SECONDS = {"s": 1.0, "min": 60.0, "h": 3600.0}
+
+
+@dataclass(frozen=True)
+class Limit:
+    # tokens added per second, and bucket size (the burst allowed after a quiet period)
+    rate: float
+    burst: float
+
+
+def parse_limit(spec: str) -> Limit | None:
+    """
+    Parses "<requests>/<s|min|h>[:burst]", e.g. "20/s:40" or "120/min" (the
+    burst defaults to the request count). An empty spec means no limit.
+    """
+    if not spec.strip():
+        return None
+    m = _SPEC.fullmatch(spec)
+    if not m:
+        raise ValueError(f"bad rate limit {spec!r}, expected e.g. 20/s:40 or 120/min")
+    count, unit, burst = m.groups()
+    rate = float(count) / _UNIT_SECONDS[unit]
+    if rate <= 0:
+        raise ValueError(f"bad rate limit {spec!r}: the rate must be positive")
+    return Limit(rate=rate, burst=max(1.0, float(burst or count)))
+
+
+class BucketBackend(Protocol):
+    def take(self, key: str, limit: Limit) -> float:
+        """Takes a token from `key`'s bucket; returns 0, or the seconds until one is available."""
+        ...
+
+
+class MemoryBuckets:
+    """Per-process token buckets; the least recently used ones go beyond `max_keys`."""
+
+    def __init__(self, max_keys: int) -> None:
+        self._max_keys = max_keys
+        # key -> (tokens, updated at)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self._max_keys:
+                # a forgotten bucket starts over full: limits only ever get looser
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# the same refill as MemoryBuckets, atomic in Redis and on the server's clock
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets shared by every worker and instance. Takes any client with
+    the redis-py `register_script` surface.
+    """
+
+    def __init__(self, client: Any, prefix: str = "qrcheckin:ratelimit:") -> None:
+        self._take = client.register_script(_TAKE_SCRIPT)
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBuckets":
+        import redis  # optional dependency: pip install ".[redis]"
+
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def take(self, key: str, limit: Limit) -> float:
+        return float(self._take(keys=[self._prefix + key], args=[limit.rate, limit.burst]))
+
+
+class RateLimiter:
+    """
+    Per-route, per-client token buckets. `limits` maps a route name to its
+    Limit (None: unlimited); each client of a route gets its own bucket.
+    """
+
+    def __init__(self, backend: BucketBackend, limits: dict[str, Limit | None]) -> None:
+        self.backend = backend
+        self.limits = limits
+        # a network round trip: check_async() runs it in a worker thread
+        self.shared = not isinstance(backend, MemoryBuckets)
+        self._throttled = {route: counter(f"rate_limit.{route}.throttled") for route in limits}
+
+    def check(self, route: str, client: str) -> float:
+        """0 when the request may go ahead, the seconds to wait before retrying otherwise."""
+        limit = self.limits.get(route)
+        if limit is None:
+            return 0.0
+        wait = self.backend.take(f"{route}:{client}", limit)
+        if wait > 0:
+            self._throttled[route].inc()
+        return wait
+
+    async def check_async(self, route: str, client: str) -> float:
+        if self.shared:
+            return await anyio.to_thread.run_sync(self.check, route, client)
+        return self.check(route, client)
+
+
+class AdmissionGate:
+    """
+    Caps the API requests a worker serves at once. Past `max_in_flight`,
+    requests are turned away (503) before they open a transaction, instead
+    of queueing for a pooled connection until they time out. 0 disables it.
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        self.max_in_flight = max_in_flight
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = counter("admission.rejected")
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def try_enter(self) -> bool:
+        with self._lock:
+            if self.max_in_flight and self._in_flight >= self.max_in_flight:
+                self.rejected.inc()
+                return False
+            self._in_flight += 1
+            return True
+
+    def leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+def _build_backend() -> BucketBackend:
+    if settings.RATE_LIMIT_URL:
+        return RedisBuckets.from_url(settings.RATE_LIMIT_URL)
+    return MemoryBuckets(settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(
+    _build_backend(),
+    {
+        "checkin": parse_limit(settings.RATE_LIMIT_CHECKIN),
+        "checkin_batch": parse_limit(settings.RATE_LIMIT_CHECKIN_BATCH),
+        "login": parse_limit(settings.RATE_LIMIT_LOGIN),
+        "register": parse_limit(settings.RATE_LIMIT_REGISTER),
+    },
+)
+admission_gate = AdmissionGate(settings.ADMISSION_MAX_IN_FLIGHT)
@@ -0,0 +1,84 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.services.scanner_cache import MemoryBackend
+
+
+@dataclass(frozen=True)
+class RecentCheckIn:
+    attendee_id: uuid.UUID
+    event_id: uuid.UUID
+    full_name: str
+    checked_in_at: datetime
+    # set once the event owner scanned this token, so JWT repeats can be answered too
+    owner_user_id: uuid.UUID | None = None
+
+
+class ScanCache:
+    """
+    Short-lived, per-process answers for scans that keep coming back:
+
+    - positive: tokens checked in during the last `positive_ttl` seconds, so a
+      camera decoding the same QR several times per second gets
+      `already_checked_in` without a query. Check-ins are never undone, so an
+      entry can only go stale by expiring.
+    - negative: tokens that matched no attendee, so floods of garbage or
+      forged codes are rejected in-process. Tokens are random, which means an
+      unknown token cannot become valid later; the TTL is only a safety net.
+
+    Both are bounded LRUs. A hit still has to be authorized for the scanning
+    principal; anything else falls through to check_in_many's usual path.
+    """
+
+    def __init__(
+        self,
+        positive_ttl: float,
+        positive_size: int,
+        negative_ttl: float,
+        negative_size: int,
+        enabled: bool = True,
+    ) -> None:
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._recent = MemoryBackend[RecentCheckIn](positive_size)
+        self._rejected = MemoryBackend[bool](negative_size)
+
+        self.positive_hits = counter("scan_cache.positive.hits")
+        self.positive_misses = counter("scan_cache.positive.misses")
+        self.negative_hits = counter("scan_cache.negative.hits")
+        self.negative_misses = counter("scan_cache.negative.misses")
+
+    def recent(self, qr_token: str) -> RecentCheckIn | None:
+        if not self.enabled:
+            return None
+        entry = self._recent.get(qr_token)
+        (self.positive_hits if entry is not None else self.positive_misses).inc()
+        return entry
+
+    def is_rejected(self, qr_token: str) -> bool:
+        if not self.enabled:
+            return False
+        rejected = self._rejected.get(qr_token) is not None
+        (self.negative_hits if rejected else self.negative_misses).inc()
+        return rejected
+
+    def remember(self, qr_token: str, entry: RecentCheckIn) -> None:
+        if self.enabled:
+            self._recent.set(qr_token, entry, self.positive_ttl)
+
+    def reject(self, qr_token: str) -> None:
+        if self.enabled:
+            self._rejected.set(qr_token, True, self.negative_ttl)
+
+
+scan_cache = ScanCache(
+    positive_ttl=settings.SCAN_CACHE_POSITIVE_TTL_S,
+    positive_size=settings.SCAN_CACHE_POSITIVE_SIZE,
+    negative_ttl=settings.SCAN_CACHE_NEGATIVE_TTL_S,
+    negative_size=settings.SCAN_CACHE_NEGATIVE_SIZE,
+    enabled=settings.SCAN_CACHE_ENABLED,
+)
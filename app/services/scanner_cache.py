@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Generic, Protocol, TypeVar
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.listener import listener
+from app.models.event import Event
+
+INVALIDATE_CHANNEL = "scanner_key_rotated"
+
+V = TypeVar("V")
+
+
+def key_digest(scanner_key: str) -> str:
+    # scanner keys are credentials: never keep them in a cache (or a NOTIFY) in clear
+    return hashlib.sha256(scanner_key.encode()).hexdigest()
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend(Generic[V]):
+    """Per-process LRU with a TTL per entry."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._data: OrderedDict[str, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: V, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """
+    Shared backend for multi-instance deployments. Takes any client with the
+    redis-py `get`/`set(ex=)`/`delete` surface.
+    """
+
+    def __init__(self, client: Any, prefix: str = "qrcheckin:scanner:") -> None:
+        self._client = client
+        self._prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis  # optional dependency: pip install ".[redis]"
+
+        return cls(redis.Redis.from_url(url, decode_responses=True))
+
+    def get(self, key: str) -> str | None:
+        value = self._client.get(self._prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode()
+        return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self._client.set(self._prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self._prefix + key)
+
+    def clear(self) -> None:
+        # shared entries are deleted by the rotating worker itself (see invalidate),
+        # so a worker that missed notifications has nothing to drop here
+        pass
+
+
+class ScannerKeyCache:
+    """
+    Maps a scanner key (by digest) to the event it unlocks, so scanner-key
+    check-ins can skip the events lookup. Rotation must call `invalidate`;
+    entries also expire after `ttl` seconds as a safety net.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # bumped by every invalidation, see put()
+        self._generation = 0
+        self.hits = counter("scanner_key_cache.hits")
+        self.misses = counter("scanner_key_cache.misses")
+
+    def get_event_id(self, scanner_key: str) -> uuid.UUID | None:
+        value = self.backend.get(key_digest(scanner_key))
+        if value is None:
+            self.misses.inc()
+            return None
+        self.hits.inc()
+        return uuid.UUID(value)
+
+    def peek(self, scanner_key: str) -> uuid.UUID | None:
+        """get_event_id() without counting a hit or miss, for callers other than check-in."""
+        value = self.backend.get(key_digest(scanner_key))
+        return uuid.UUID(value) if value is not None else None
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, scanner_key: str, event_id: uuid.UUID, generation: int) -> None:
+        """
+        Caches a key resolved from the database. `generation` is the value
+        read before that lookup: if a rotation was invalidated in between, the
+        key may already be revoked and is not cached.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self.backend.set(key_digest(scanner_key), str(event_id), self.ttl)
+
+    def invalidate(self, scanner_key: str) -> None:
+        self.invalidate_digest(key_digest(scanner_key))
+
+    def invalidate_digest(self, digest: str) -> None:
+        with self._lock:
+            self._generation += 1
+        self.backend.delete(digest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.backend.clear()
+
+
+def resolve_scanner_key(db: Session, scanner_key: str) -> uuid.UUID | None:
+    """The event a scanner key unlocks, from the cache or else the events table."""
+    event_id = scanner_key_cache.get_event_id(scanner_key)
+    if event_id is None:
+        generation = scanner_key_cache.generation
+        event_id = db.scalar(select(Event.id).where(Event.scanner_key == scanner_key))
+        if event_id is not None:
+            scanner_key_cache.put(scanner_key, event_id, generation)
+    return event_id
+
+
+def _build_backend() -> CacheBackend:
+    if settings.SCANNER_CACHE_URL:
+        return RedisBackend.from_url(settings.SCANNER_CACHE_URL)
+    return MemoryBackend[str](settings.SCANNER_CACHE_SIZE)
+
+
+scanner_key_cache = ScannerKeyCache(_build_backend(), settings.SCANNER_CACHE_TTL_S)
+# rotations in any worker evict the old key here too
+listener.subscribe(INVALIDATE_CHANNEL, scanner_key_cache.invalidate_digest)
+listener.on_listen(scanner_key_cache.clear)
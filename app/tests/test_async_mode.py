@@ -0,0 +1,110 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes.aio.attendees import router as attendees_router
+from app.api.routes.aio.checkin import router as checkin_router
+from app.api.routes.aio.stats import router as stats_router
+from app.api.routes.auth import router as auth_router
+from app.api.routes.events import router as events_router
+from app.api.routes.scanner import router as scanner_router
+
+
+def build_async_app() -> FastAPI:
+    # what app.api builds when settings.DB_ASYNC is on
+    api_router = APIRouter(prefix="/api/v1")
+    for router in (
+        auth_router,
+        events_router,
+        attendees_router,
+        checkin_router,
+        stats_router,
+        scanner_router,
+    ):
+        api_router.include_router(router)
+    app = FastAPI()
+    app.include_router(api_router)
+    return app
+
+
+@pytest.fixture(scope="module")
+def client():
+    # one portal (event loop) for the module, so pooled async connections stay usable
+    with TestClient(build_async_app()) as c:
+        yield c
+
+
+def get_token(client: TestClient, email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def test_async_attendees_checkin_and_stats(client: TestClient):
+    token = get_token(client, "async_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    r = client.post("/api/v1/events", json={"name": "Async Event"}, headers=headers)
+    assert r.status_code == 201
+    event_id = r.json()["id"]
+
+    r1 = client.post(
+        f"/api/v1/events/{event_id}/attendees",
+        json={"full_name": "Dana", "email": "dana@example.com"},
+        headers=headers,
+    )
+    assert r1.status_code == 201
+    attendee = r1.json()
+
+    r2 = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": "Eve"}, {"full_name": "Finn"}]},
+        headers=headers,
+    )
+    assert r2.status_code == 201
+    assert len(r2.json()) == 2
+
+    r3 = client.get(f"/api/v1/events/{event_id}/attendees?q=dana", headers=headers)
+    assert r3.status_code == 200
+    assert r3.json()["total"] == 1
+
+    r4 = client.get(f"/api/v1/events/{event_id}/attendees/{attendee['id']}/qr", headers=headers)
+    assert r4.status_code == 200
+    assert r4.json()["qr_token"] == attendee["qr_token"]
+
+    scanner_key = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers).json()[
+        "scanner_key"
+    ]
+    c1 = client.post(
+        "/api/v1/checkin",
+        json={"qr_token": attendee["qr_token"]},
+        headers={"X-Scanner-Key": scanner_key},
+    )
+    assert c1.status_code == 200
+    assert c1.json()["already_checked_in"] is False
+
+    c2 = client.post("/api/v1/checkin", json={"qr_token": attendee["qr_token"]}, headers=headers)
+    assert c2.status_code == 200
+    assert c2.json()["already_checked_in"] is True
+
+    c3 = client.post("/api/v1/checkin", json={"qr_token": "no-such-token-at-all"}, headers=headers)
+    assert c3.status_code == 404
+
+    s = client.get(f"/api/v1/events/{event_id}/stats", headers=headers)
+    assert s.status_code == 200
+    assert s.json() == {"total": 3, "checked_in": 1, "not_checked_in": 2}
+
+
+def test_async_forbidden_other_user(client: TestClient):
+    token_a = get_token(client, "async_a@example.com")
+    token_b = get_token(client, "async_b@example.com")
+    r = client.post(
+        "/api/v1/events", json={"name": "Private"}, headers={"Authorization": f"Bearer {token_a}"}
+    )
+    event_id = r.json()["id"]
+
+    r = client.get(
+        f"/api/v1/events/{event_id}/stats", headers={"Authorization": f"Bearer {token_b}"}
+    )
+    assert r.status_code == 403
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Export Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def test_export_streams_every_attendee():
+    token = get_token("export_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={
+            "attendees": [
+                {"full_name": f'Guest "{i}", Jr.', "email": f"g{i}@example.com"}
+                for i in range(3000)
+            ]
+        },
+        headers=headers,
+    )
+    created = {a["qr_token"]: a for a in r.json()}
+
+    r = client.get(f"/api/v1/events/{event_id}/attendees/export", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert len(rows) == 3000
+    assert {row["qr_token"] for row in rows} == set(created)
+    first = created[rows[0]["qr_token"]]
+    assert rows[0]["full_name"] == first["full_name"]
+    assert rows[0]["checked_in_at"] == ""
+
+    r = client.get(
+        f"/api/v1/events/{event_id}/attendees/export?format=ndjson&gzip=true", headers=headers
+    )
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 3000
+    assert lines[0]["id"] == first["id"]
+    assert lines[0]["email"] == first["email"]
+
+
+def test_export_forbidden_other_user():
+    event_id = create_event(get_token("export_a@example.com"))
+    other = {"Authorization": f"Bearer {get_token('export_b@example.com')}"}
+
+    r = client.get(f"/api/v1/events/{event_id}/attendees/export", headers=other)
+    assert r.status_code == 403
@@ -0,0 +1,88 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Import Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def chunked(data: bytes, size: int = 7):
+    # small chunks, so rows and UTF-8 characters are split across reads
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_csv_import_streams_rows_and_reports_errors():
+    token = get_token("import_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+
+    body = (
+        "\ufefffull_name,email,table\n"
+        "Zoë Müller,zoe@example.com,4\n"
+        '"Doe, Jane",,5\n'
+        ",nobody@example.com,6\n"
+        "Bad Email,not-an-email,7\n"
+        "Sam Lee,sam@example.com,8\n"
+    ).encode()
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/import",
+        content=chunked(body),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert r.status_code == 200
+    report = r.json()
+    assert report["imported"] == 3
+    assert report["failed"] == 2
+    assert [e["line"] for e in report["errors"]] == [4, 5]
+    assert report["errors"][0]["error"].startswith("full_name")
+
+    r = client.get(f"/api/v1/events/{event_id}/attendees?limit=10", headers=headers)
+    names = {a["full_name"]: a for a in r.json()["items"]}
+    assert set(names) == {"Zoë Müller", "Doe, Jane", "Sam Lee"}
+    assert names["Doe, Jane"]["email"] is None
+    assert len({a["qr_token"] for a in names.values()}) == 3
+
+
+def test_ndjson_import_and_bad_uploads():
+    token = get_token("import_ndjson@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    url = f"/api/v1/events/{event_id}/attendees/import"
+
+    lines = [json.dumps({"full_name": f"Guest {i}"}) for i in range(1200)]
+    lines.insert(10, "{not json")
+    lines.insert(20, "[1, 2]")
+    r = client.post(
+        f"{url}?format=ndjson", content=chunked("\n".join(lines).encode(), 4096), headers=headers
+    )
+    assert r.status_code == 200
+    assert r.json()["imported"] == 1200
+    assert [e["line"] for e in r.json()["errors"]] == [11, 21]
+
+    r = client.post(url, content=b"name\nx\n", headers={**headers, "Content-Type": "text/csv"})
+    assert r.status_code == 400
+    r = client.post(url, content=b"{}", headers={**headers, "Content-Type": "application/json"})
+    assert r.status_code == 415
+
+    other = {"Authorization": f"Bearer {get_token('import_other@example.com')}"}
+    r = client.post(f"{url}?format=csv", content=b"full_name\nx\n", headers=other)
+    assert r.status_code == 403
@@ -0,0 +1,90 @@
+import csv
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.qr_render import qr_cache
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "QR Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def test_qr_image_is_cached_and_revalidated():
+    token = get_token("qr_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees", json={"full_name": "Ada"}, headers=headers
+    )
+    attendee = r.json()
+    url = f"/api/v1/events/{event_id}/attendees/{attendee['id']}/qr"
+
+    r = client.get(f"{url}.png", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/png"
+    assert r.content.startswith(b"\x89PNG")
+    etag = r.headers["etag"]
+    assert etag == qr_cache.etag(attendee["qr_token"], "png")
+    # content-addressed: the digest names the file, the token does not
+    digest = etag.strip('"')
+    assert (qr_cache.directory / digest[:2] / f"{digest}.png").read_bytes() == r.content
+
+    r = client.get(f"{url}.png", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    r = client.get(f"{url}.svg", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("image/svg+xml")
+    assert b"<svg" in r.content
+    assert r.headers["etag"] != etag
+
+    assert client.get(f"{url}.gif", headers=headers).status_code == 422
+    other = {"Authorization": f"Bearer {get_token('qr_other@example.com')}"}
+    assert client.get(f"{url}.png", headers=other).status_code == 403
+
+
+def test_qr_archive_holds_every_attendee():
+    token = get_token("qr_batch_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    # more than one render chunk
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(300)]},
+        headers=headers,
+    )
+    created = {a["id"]: a for a in r.json()}
+
+    r = client.get(f"/api/v1/events/{event_id}/attendees/qr.zip", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(r.content)) as archive:
+        assert archive.testzip() is None
+        manifest = list(csv.DictReader(io.TextIOWrapper(archive.open("attendees.csv"))))
+        assert {row["id"] for row in manifest} == set(created)
+        assert {row["full_name"] for row in manifest} == {a["full_name"] for a in created.values()}
+        images = [name for name in archive.namelist() if name.endswith(".png")]
+        assert sorted(images) == sorted(f"{attendee_id}.png" for attendee_id in created)
+        some = next(iter(created.values()))
+        assert archive.read(f"{some['id']}.png") == client.get(
+            f"/api/v1/events/{event_id}/attendees/{some['id']}/qr.png", headers=headers
+        ).content
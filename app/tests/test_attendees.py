@@ -1,6 +1,10 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
+from app.db.session import SessionLocal, engine
 from app.main import app
+from app.services import attendee_search
+from app.services import attendees as attendee_service
 
 client = TestClient(app)
 
@@ -70,3 +74,133 @@ def test_attendees_forbidden_other_user():
         headers={"Authorization": f"Bearer {token_b}"},
     )
     assert r.status_code == 403
+
+
+def test_bulk_create_is_one_insert(monkeypatch):
+    token = get_token("attendee_bulk@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    existing = client.post(
+        f"/api/v1/events/{event_id}/attendees",
+        json={"full_name": "First", "email": None},
+        headers=headers,
+    ).json()["qr_token"]
+
+    # the first draw collides with an existing token; only that row is retried
+    draws = iter([existing])
+    real = attendee_service.new_qr_token
+    monkeypatch.setattr(
+        attendee_service,
+        "new_qr_token",
+        lambda event_id, attendee_id: next(draws, None) or real(event_id, attendee_id),
+    )
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        r = client.post(
+            f"/api/v1/events/{event_id}/attendees/bulk",
+            json={"attendees": [{"full_name": f"Guest {i}"} for i in range(2000)]},
+            headers=headers,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert r.status_code == 201
+    created = r.json()
+    assert [a["full_name"] for a in created] == [f"Guest {i}" for i in range(2000)]
+    assert len({a["qr_token"] for a in created} | {existing}) == 2001
+    inserts = [s for s in statements if s.lstrip().startswith("INSERT INTO attendees")]
+    assert len(inserts) == 2
+
+
+def test_list_attendees_cursor_handles_created_at_ties():
+    token = get_token("attendee_cursor@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    # one INSERT: every row shares the same created_at, only the id breaks ties
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(25)]},
+        headers=headers,
+    )
+    created = {a["id"] for a in r.json()}
+
+    seen: list[str] = []
+    url = f"/api/v1/events/{event_id}/attendees?limit=10&include_total=false"
+    r = client.get(url, headers=headers)
+    while True:
+        page = r.json()
+        assert page["total"] is None
+        seen.extend(a["id"] for a in page["items"])
+        if page["next_cursor"] is None:
+            break
+        r = client.get(f"{url}&cursor={page['next_cursor']}", headers=headers)
+
+    assert len(seen) == 25
+    assert set(seen) == created
+
+    r = client.get(f"/api/v1/events/{event_id}/attendees?limit=10&offset=20", headers=headers)
+    assert [a["id"] for a in r.json()["items"]] == seen[20:]
+    assert r.json()["total"] == 25
+
+
+def test_search_attendees_by_prefix():
+    token = get_token("attendee_search@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    other_event_id = create_event(token)
+    people = [
+        {"full_name": "John Smith", "email": "jsmith@example.com"},
+        {"full_name": "Johanna Smithers", "email": None},
+        {"full_name": "Mary Jones", "email": "mary.jones@corp.io"},
+    ]
+    client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk", json={"attendees": people}, headers=headers
+    )
+    client.post(
+        f"/api/v1/events/{other_event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": "John Elsewhere"}]},
+        headers=headers,
+    )
+    url = f"/api/v1/events/{event_id}/attendees/search"
+
+    r = client.get(url, params={"q": "jo"}, headers=headers)
+    assert r.status_code == 200
+    assert {a["full_name"] for a in r.json()} == {"John Smith", "Johanna Smithers", "Mary Jones"}
+
+    # every word must match
+    r = client.get(url, params={"q": "jo smi"}, headers=headers)
+    assert {a["full_name"] for a in r.json()} == {"John Smith", "Johanna Smithers"}
+
+    r = client.get(url, params={"q": "smi", "limit": 1}, headers=headers)
+    assert len(r.json()) == 1
+
+    # email words are searchable too
+    r = client.get(url, params={"q": "corp"}, headers=headers)
+    assert [a["full_name"] for a in r.json()] == ["Mary Jones"]
+
+    # tsquery syntax in the input is just text
+    r = client.get(url, params={"q": "!&|:*'"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json() == []
+
+    other = {"Authorization": f"Bearer {get_token('attendee_search_b@example.com')}"}
+    assert client.get(url, params={"q": "jo"}, headers=other).status_code == 403
+
+
+def test_trigram_probe_expires(monkeypatch):
+    monkeypatch.setattr(attendee_search, "_trigram_probe", None)
+    monkeypatch.setattr(attendee_search, "TRIGRAM_INDEX", "ix_attendees_no_such_index")
+    with SessionLocal() as db:
+        assert attendee_search.trigram_available(db) is False
+
+        # an index created after the probe is not seen until the probe expires
+        monkeypatch.setattr(attendee_search, "TRIGRAM_INDEX", "ix_attendees_search_vector")
+        assert attendee_search.trigram_available(db) is False
+        monkeypatch.setattr(attendee_search, "TRIGRAM_PROBE_TTL_S", 0.0)
+        assert attendee_search.trigram_available(db) is True
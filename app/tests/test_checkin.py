@@ -1,5 +1,9 @@
+import uuid
+
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
+from app.db.session import engine
 from app.main import app
 
 client = TestClient(app)
@@ -69,3 +73,50 @@ def test_checkin_invalid_token():
 
     r = client.post("/api/v1/checkin", json={"qr_token": "this-is-not-a-real-token"}, headers=headers)
     assert r.status_code == 404
+
+
+def test_checkin_is_a_single_statement():
+    token = get_token("checkin_queries@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    event_id = create_event(token)
+    qr_token = create_attendee(token, event_id)["qr_token"]
+    r = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers)
+    scanner_headers = {"X-Scanner-Key": r.json()["scanner_key"]}
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        c1 = client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=scanner_headers)
+        assert c1.status_code == 200
+        assert c1.json()["already_checked_in"] is False
+        assert len(statements) == 1
+
+        c2 = client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=scanner_headers)
+        assert c2.status_code == 200
+        assert c2.json()["already_checked_in"] is True
+        assert c2.json()["checked_in_at"] == c1.json()["checked_in_at"]
+        # a debounced repeat is answered from the recent check-ins cache
+        assert len(statements) == 1
+
+        c3 = client.post(
+            "/api/v1/checkin", json={"qr_token": qr_token}, headers={"X-Scanner-Key": "wrong-key"}
+        )
+        assert c3.status_code == 401
+        assert len(statements) == 2
+
+        unknown = f"unknown-token-{uuid.uuid4().hex}"
+        c4 = client.post("/api/v1/checkin", json={"qr_token": unknown}, headers=scanner_headers)
+        assert c4.status_code == 404
+        assert len(statements) == 3
+
+        # and a known-bad token is rejected in-process from then on
+        c5 = client.post("/api/v1/checkin", json={"qr_token": unknown}, headers=scanner_headers)
+        assert c5.status_code == 404
+        assert len(statements) == 3
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
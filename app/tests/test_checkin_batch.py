@@ -0,0 +1,135 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Batch Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendees(token: str, event_id: str, n: int) -> list[str]:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(n)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return [a["qr_token"] for a in r.json()]
+
+
+def get_scanner_key(token: str, event_id: str) -> str:
+    r = client.get(
+        f"/api/v1/events/{event_id}/scanner-key",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 200
+    return r.json()["scanner_key"]
+
+
+def test_batch_checkin_mixed_results():
+    owner_token = get_token("batch_owner@example.com")
+    event_id = create_event(owner_token)
+    t1, t2, t3 = create_attendees(owner_token, event_id, 3)
+    scanner_headers = {"X-Scanner-Key": get_scanner_key(owner_token, event_id)}
+
+    # t3 is already checked in before the replay arrives
+    r0 = client.post("/api/v1/checkin", json={"qr_token": t3}, headers=scanner_headers)
+    assert r0.status_code == 200
+
+    scanned_at = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(microsecond=0)
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={
+            "items": [
+                {"qr_token": t1, "device_id": "gate-1", "scanned_at": scanned_at.isoformat()},
+                {"qr_token": "not-a-real-token-123", "device_id": "gate-1"},
+                {"qr_token": t2, "device_id": "gate-2"},
+                {"qr_token": t1, "device_id": "gate-2"},
+                {"qr_token": t3, "device_id": "gate-2"},
+            ]
+        },
+        headers=scanner_headers,
+    )
+    assert r.status_code == 200
+    items = r.json()["items"]
+    assert [i["status_code"] for i in items] == [200, 404, 200, 200, 200]
+    assert [i["device_id"] for i in items] == ["gate-1", "gate-1", "gate-2", "gate-2", "gate-2"]
+
+    assert items[0]["result"]["already_checked_in"] is False
+    checked_in_at = datetime.fromisoformat(items[0]["result"]["checked_in_at"])
+    assert checked_in_at == scanned_at
+    assert items[1]["detail"] == "Invalid QR token"
+    assert items[2]["result"]["already_checked_in"] is False
+    assert items[3]["result"]["already_checked_in"] is True
+    assert items[3]["result"]["checked_in_at"] == items[0]["result"]["checked_in_at"]
+    assert items[4]["result"]["already_checked_in"] is True
+
+    # replaying the same batch is idempotent
+    r2 = client.post(
+        "/api/v1/checkin/batch",
+        json={"items": [{"qr_token": t1}, {"qr_token": t2}]},
+        headers=scanner_headers,
+    )
+    assert r2.status_code == 200
+    assert all(i["result"]["already_checked_in"] for i in r2.json()["items"])
+
+    s = client.get(
+        f"/api/v1/events/{event_id}/stats", headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    assert s.json()["checked_in"] == 3
+
+
+def test_batch_checkin_wrong_scanner_key():
+    owner_token = get_token("batch_badkey@example.com")
+    event_id = create_event(owner_token)
+    (t1,) = create_attendees(owner_token, event_id, 1)
+
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={"items": [{"qr_token": t1}]},
+        headers={"X-Scanner-Key": "definitely-not-the-key"},
+    )
+    assert r.status_code == 200
+    assert r.json()["items"][0]["status_code"] == 401
+    assert r.json()["items"][0]["result"] is None
+
+
+def test_batch_checkin_clamps_scan_times():
+    owner_token = get_token("batch_clock@example.com")
+    event_id = create_event(owner_token)
+    t1, t2 = create_attendees(owner_token, event_id, 2)
+    scanner_headers = {"X-Scanner-Key": get_scanner_key(owner_token, event_id)}
+
+    before = datetime.now(timezone.utc)
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={
+            "items": [
+                # a device whose clock is years behind, and one from the future
+                {"qr_token": t1, "scanned_at": "2001-01-01T00:00:00+00:00"},
+                {"qr_token": t2, "scanned_at": "2099-01-01T00:00:00+00:00"},
+            ]
+        },
+        headers=scanner_headers,
+    )
+    after = datetime.now(timezone.utc)
+    past, future = (datetime.fromisoformat(i["result"]["checked_in_at"]) for i in r.json()["items"])
+    assert before - timedelta(days=1) <= past <= after - timedelta(days=1)
+    assert before <= future <= after
@@ -0,0 +1,139 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.checkin_log import CheckinLog
+from app.services.checkin import CheckInResult, CheckInStatus
+from app.services.checkin_log import checkin_log_writer
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Log Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendees(token: str, event_id: str, n: int) -> list[str]:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(n)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return [a["qr_token"] for a in r.json()]
+
+
+def test_scans_are_logged_and_aggregated_per_device():
+    owner_token = get_token("log_owner@example.com")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    event_id = create_event(owner_token)
+    t1, t2 = create_attendees(owner_token, event_id, 2)
+    scanner_key = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers).json()[
+        "scanner_key"
+    ]
+    scanner = {"X-Scanner-Key": scanner_key}
+
+    client.post("/api/v1/checkin", json={"qr_token": t1, "device_id": "gate-a"}, headers=scanner)
+    client.post("/api/v1/checkin", json={"qr_token": t1, "device_id": "gate-a"}, headers=scanner)
+    client.post(
+        "/api/v1/checkin",
+        json={"qr_token": t2, "device_id": "gate-b"},
+        headers={"X-Scanner-Key": "wrong-scanner-key"},
+    )
+    client.post(
+        "/api/v1/checkin/batch",
+        json={"items": [{"qr_token": t2, "device_id": "gate-b"}]},
+        headers=scanner,
+    )
+    checkin_log_writer.flush()
+
+    with SessionLocal() as db:
+        outcomes = db.scalars(
+            select(CheckinLog.outcome)
+            .where(CheckinLog.event_id == event_id)
+            .order_by(CheckinLog.scanned_at)
+        ).all()
+    assert outcomes == ["checked_in", "already_checked_in", "unauthorized", "checked_in"]
+
+    r = client.get(f"/api/v1/events/{event_id}/devices", headers=headers)
+    assert r.status_code == 200
+    devices = {d["device_id"]: d for d in r.json()}
+    assert devices["gate-a"]["scans"] == 2
+    assert devices["gate-a"]["checked_in"] == 1
+    assert devices["gate-a"]["already_checked_in"] == 1
+    assert devices["gate-b"]["scans"] == 2
+    assert devices["gate-b"]["rejected"] == 1
+    assert devices["gate-b"]["scans_per_minute"] > 0
+
+
+def test_device_throughput_forbidden_other_user():
+    token_a = get_token("log_a@example.com")
+    token_b = get_token("log_b@example.com")
+    event_id = create_event(token_a)
+
+    r = client.get(
+        f"/api/v1/events/{event_id}/devices", headers={"Authorization": f"Bearer {token_b}"}
+    )
+    assert r.status_code == 403
+
+
+def test_bad_entry_does_not_sink_its_batch():
+    owner_token = get_token("log_bad_row@example.com")
+    event_id = uuid.UUID(create_event(owner_token))
+    checkin_log_writer.flush()
+
+    failed = checkin_log_writer.failed.value
+    # the second entry's event does not exist (e.g. deleted since the scan)
+    for device_id, logged_event_id in (("g1", event_id), ("g1", uuid.uuid4()), ("g2", event_id)):
+        result = CheckInResult(status=CheckInStatus.NOT_FOUND, event_id=logged_event_id)
+        checkin_log_writer.record(result, device_id, 1.0)
+    checkin_log_writer.flush()
+
+    with SessionLocal() as db:
+        devices = db.scalars(
+            select(CheckinLog.device_id).where(CheckinLog.event_id == event_id)
+        ).all()
+    assert sorted(devices) == ["g1", "g2"]
+    assert checkin_log_writer.failed.value == failed + 1
+
+
+def test_replayed_scans_are_logged_at_their_scan_time():
+    owner_token = get_token("log_replay@example.com")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    event_id = create_event(owner_token)
+    (t1,) = create_attendees(owner_token, event_id, 1)
+    scanner_key = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers).json()[
+        "scanner_key"
+    ]
+
+    scanned_at = (datetime.now(timezone.utc) - timedelta(hours=2)).replace(microsecond=0)
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={"items": [{"qr_token": t1, "scanned_at": scanned_at.isoformat()}]},
+        headers={"X-Scanner-Key": scanner_key},
+    )
+    assert r.status_code == 200
+    checkin_log_writer.flush()
+
+    with SessionLocal() as db:
+        logged = db.scalars(
+            select(CheckinLog.scanned_at).where(CheckinLog.event_id == event_id)
+        ).all()
+    assert logged == [scanned_at]
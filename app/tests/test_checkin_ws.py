@@ -0,0 +1,133 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.routes import checkin_ws
+from app.main import app
+from app.services.rate_limit import Limit, MemoryBuckets, rate_limiter
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "WS Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendees(token: str, event_id: str, n: int) -> list[str]:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(n)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return [a["qr_token"] for a in r.json()]
+
+
+def get_scanner_key(token: str, event_id: str) -> str:
+    r = client.get(
+        f"/api/v1/events/{event_id}/scanner-key",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 200
+    return r.json()["scanner_key"]
+
+
+def test_ws_pipelined_checkins():
+    owner_token = get_token("ws_owner@example.com")
+    event_id = create_event(owner_token)
+    t1, t2 = create_attendees(owner_token, event_id, 2)
+    scanner_key = get_scanner_key(owner_token, event_id)
+
+    with client.websocket_connect("/api/v1/checkin/ws") as ws:
+        ws.send_json({"scanner_key": scanner_key})
+        assert ws.receive_json() == {"type": "ready"}
+
+        # several frames in flight before reading any answer
+        ws.send_json({"id": 1, "qr_token": t1, "device_id": "gate-ws"})
+        ws.send_json({"id": 2, "qr_token": t2, "device_id": "gate-ws"})
+        ws.send_json({"id": 3, "qr_token": "not-a-real-token-123"})
+        ws.send_json({"id": 4, "qr_token": "short"})
+        answers = {m["id"]: m for m in (ws.receive_json() for _ in range(4))}
+
+        assert answers[1]["status_code"] == 200
+        assert answers[1]["result"]["already_checked_in"] is False
+        assert answers[1]["device_id"] == "gate-ws"
+        assert answers[2]["status_code"] == 200
+        assert answers[3]["status_code"] == 404
+        assert answers[3]["detail"] == "Invalid QR token"
+        assert answers[4]["status_code"] == 422
+
+        ws.send_json({"id": 5, "qr_token": t1})
+        repeat = ws.receive_json()
+        assert repeat["id"] == 5
+        assert repeat["result"]["already_checked_in"] is True
+
+    s = client.get(
+        f"/api/v1/events/{event_id}/stats", headers={"Authorization": f"Bearer {owner_token}"}
+    )
+    assert s.json()["checked_in"] == 2
+
+
+def test_ws_rejects_invalid_scanner_key():
+    with client.websocket_connect("/api/v1/checkin/ws") as ws:
+        ws.send_json({"scanner_key": "not-a-valid-scanner-key"})
+        with pytest.raises(WebSocketDisconnect) as exc:
+            ws.receive_json()
+        assert exc.value.code == 4401
+
+
+def test_ws_scans_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBuckets(max_keys=100))
+    monkeypatch.setitem(rate_limiter.limits, "checkin", Limit(rate=0.01, burst=2))
+    owner_token = get_token("ws_limited@example.com")
+    event_id = create_event(owner_token)
+    scanner_key = get_scanner_key(owner_token, event_id)
+
+    with client.websocket_connect("/api/v1/checkin/ws") as ws:
+        ws.send_json({"scanner_key": scanner_key})
+        assert ws.receive_json() == {"type": "ready"}
+        answers = []
+        for i in range(3):
+            ws.send_json({"id": i, "qr_token": "not-a-real-token-123"})
+            answers.append(ws.receive_json())
+
+    assert [a["status_code"] for a in answers] == [404, 404, 429]
+    assert answers[2]["id"] == 2
+    assert answers[2]["retry_after"] >= 1
+
+
+def test_ws_failed_scan_gets_an_error_frame(monkeypatch):
+    owner_token = get_token("ws_failure@example.com")
+    event_id = create_event(owner_token)
+    (t1,) = create_attendees(owner_token, event_id, 1)
+    scanner_key = get_scanner_key(owner_token, event_id)
+
+    def broken(db, scans):
+        raise OperationalError("UPDATE attendees", {}, Exception("connection lost"))
+
+    with client.websocket_connect("/api/v1/checkin/ws") as ws:
+        ws.send_json({"scanner_key": scanner_key})
+        assert ws.receive_json() == {"type": "ready"}
+        monkeypatch.setattr(checkin_ws, "check_in_many", broken)
+        ws.send_json({"id": 9, "qr_token": t1})
+        reply = ws.receive_json()
+        assert reply == {"id": 9, "status_code": 503, "detail": "Check-in failed, retry"}
+
+        # the connection survives the failure
+        monkeypatch.undo()
+        ws.send_json({"id": 10, "qr_token": t1})
+        assert ws.receive_json()["status_code"] == 200
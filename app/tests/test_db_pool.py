@@ -0,0 +1,74 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.pool import engine_options, pool_status
+from app.main import app
+
+client = TestClient(app)
+METRICS = {"Authorization": "Bearer test-metrics"}
+
+
+def test_metrics_need_the_metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics/db", headers=METRICS).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics")
+    assert client.get("/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer nope"}
+    assert client.get("/metrics/db", headers=wrong).status_code == 401
+    assert client.get("/metrics/db", headers=METRICS).status_code == 200
+
+
+def test_db_metrics_report_checkouts(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics")
+    before = client.get("/metrics/db", headers=METRICS).json()["sync"]
+    assert before["pool"] == "QueuePool"
+    assert before["size"] == settings.DB_POOL_SIZE
+    assert before["waiting"] == 0
+
+    r = client.post("/api/v1/auth/login", json={"email": "nobody@example.com", "password": "x"})
+    assert r.status_code == 401
+
+    after = client.get("/metrics/db", headers=METRICS).json()["sync"]
+    assert after["checkout_ms"]["count"] > before["checkout_ms"]["count"]
+    assert after["checked_out"] == 0
+    assert after["timeouts"] == before["timeouts"]
+    assert "async" in client.get("/metrics/db", headers=METRICS).json()
+
+
+def test_pgbouncer_mode_disables_pool_and_prepared_statements(monkeypatch):
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    options = engine_options("test_pgbouncer")
+    assert issubclass(options["poolclass"], NullPool)
+    assert options["connect_args"] == {"prepare_threshold": None}
+    assert "pool_size" not in options
+
+
+def test_only_checkouts_of_an_exhausted_pool_are_waiting(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    engine = create_engine(settings.DATABASE_URL, **engine_options("test_waiting"))
+    try:
+        held = engine.connect()
+        assert pool_status(engine.pool)["waiting"] == 0
+
+        queued = threading.Thread(target=lambda: engine.connect().close())
+        queued.start()
+        deadline = time.monotonic() + 5
+        while pool_status(engine.pool)["waiting"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool_status(engine.pool)["waiting"] == 1
+
+        held.close()
+        queued.join(5)
+        status = pool_status(engine.pool)
+        assert status["waiting"] == 0
+        assert status["wait_ms"]["count"] == 1
+    finally:
+        engine.dispose()
@@ -0,0 +1,115 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.services.event_counters import counter_reconciler, reconcile
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Counter Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def stats(event_id: str, headers: dict) -> dict:
+    r = client.get(f"/api/v1/events/{event_id}/stats", headers=headers)
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_counters_follow_every_write_path():
+    token = get_token("counters_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    assert stats(event_id, headers) == {"total": 0, "checked_in": 0, "not_checked_in": 0}
+
+    single = client.post(
+        f"/api/v1/events/{event_id}/attendees", json={"full_name": "One"}, headers=headers
+    ).json()
+    bulk = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Bulk {i}"} for i in range(20)]},
+        headers=headers,
+    ).json()
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/import",
+        content=b"full_name\nImported A\nImported B\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert r.json()["imported"] == 2
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={"items": [{"qr_token": a["qr_token"]} for a in [single, *bulk[:4], single]]},
+        headers=headers,
+    )
+    assert r.status_code == 200
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert stats(event_id, headers) == {"total": 23, "checked_in": 5, "not_checked_in": 18}
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert not [s for s in statements if "FROM attendees" in s]
+
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM attendees WHERE id = :id"), {"id": single["id"]})
+        db.commit()
+    assert stats(event_id, headers) == {"total": 22, "checked_in": 4, "not_checked_in": 18}
+
+    # deleting the event takes its counters along
+    with SessionLocal() as db:
+        db.execute(text("DELETE FROM events WHERE id = :id"), {"id": event_id})
+        db.commit()
+        assert not db.scalar(
+            text("SELECT count(*) FROM event_counters WHERE event_id = :id"), {"id": event_id}
+        )
+
+
+def test_reconcile_repairs_drift():
+    token = get_token("counters_drift@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(3)]},
+        headers=headers,
+    )
+
+    with SessionLocal() as db:
+        # rows written behind the triggers' back
+        db.execute(text("ALTER TABLE attendees DISABLE TRIGGER attendees_counters_update"))
+        db.execute(
+            text("UPDATE attendees SET checked_in_at = now() WHERE event_id = :id"),
+            {"id": event_id},
+        )
+        db.execute(text("ALTER TABLE attendees ENABLE TRIGGER attendees_counters_update"))
+        db.commit()
+    assert stats(event_id, headers)["checked_in"] == 0
+
+    with SessionLocal() as db:
+        assert reconcile(db, [uuid.UUID(event_id)]) == [uuid.UUID(event_id)]
+        # nothing left to repair
+        assert reconcile(db, [uuid.UUID(event_id)]) == []
+    assert stats(event_id, headers) == {"total": 3, "checked_in": 3, "not_checked_in": 0}
+    assert uuid.UUID(event_id) not in counter_reconciler.run_once()
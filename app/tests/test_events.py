@@ -1,6 +1,11 @@
+import uuid
+
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 
+from app.db.session import engine
 from app.main import app
+from app.services.principals import principal_cache
 
 client = TestClient(app)
 
@@ -58,3 +63,76 @@ def test_event_forbidden_for_other_user():
         headers={"Authorization": f"Bearer {token_b}"},
     )
     assert r2.status_code == 403
+
+
+def test_list_events_cursor_pages():
+    token = get_token("events_cursor@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    created = []
+    for i in range(5):
+        r = client.post("/api/v1/events", json={"name": f"Cursor {i}"}, headers=headers)
+        created.append(r.json()["id"])
+
+    seen = []
+    r = client.get("/api/v1/events?limit=2&include_total=false", headers=headers)
+    while True:
+        assert r.status_code == 200
+        page = r.json()
+        assert page["total"] is None
+        seen.extend(e["id"] for e in page["items"])
+        if page["next_cursor"] is None:
+            break
+        r = client.get(
+            f"/api/v1/events?limit=2&include_total=false&cursor={page['next_cursor']}",
+            headers=headers,
+        )
+
+    # newest first, every event exactly once
+    assert seen[:5] == created[::-1]
+    assert len(seen) == len(set(seen))
+
+    # the offset API still works and agrees with the cursor pages
+    r = client.get("/api/v1/events?limit=2&offset=2", headers=headers)
+    assert [e["id"] for e in r.json()["items"]] == seen[2:4]
+    assert r.json()["total"] == len(seen)
+
+    assert client.get("/api/v1/events?cursor=garbage", headers=headers).status_code == 400
+    assert client.get(
+        f"/api/v1/events?offset=2&cursor={page['next_cursor'] or 'x'}", headers=headers
+    ).status_code == 400
+
+
+def test_event_scoped_routes_resolve_ownership_in_one_query():
+    token = get_token("owned_event_user@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = client.post(
+        "/api/v1/events", json={"name": "Owned", "venue": None, "start_time": None}, headers=headers
+    ).json()["id"]
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        # principal cached by the create above: the events lookup only
+        assert client.get(f"/api/v1/events/{event_id}", headers=headers).status_code == 200
+        assert len(statements) == 1
+        assert "FROM events" in statements[0]
+
+        # cold cache: user and event in one joined query
+        principal_cache.clear()
+        statements.clear()
+        assert client.get(f"/api/v1/events/{event_id}", headers=headers).status_code == 200
+        assert len(statements) == 1
+        assert "FROM users LEFT OUTER JOIN events" in statements[0]
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    missing = client.get(f"/api/v1/events/{uuid.uuid4()}/stats", headers=headers)
+    assert missing.status_code == 404
+    principal_cache.clear()
+    missing = client.get(f"/api/v1/events/{uuid.uuid4()}/stats", headers=headers)
+    assert missing.status_code == 404
+    assert client.get(f"/api/v1/events/{event_id}/stats").status_code == 401
@@ -0,0 +1,126 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.main import app
+from app.services.checkin import CheckInStatus, Scan
+from app.services.group_commit import GroupCommitter, group_committer
+from app.services.principals import principal_cache
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Group Commit Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendees(token: str, event_id: str, n: int) -> list[str]:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(n)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return [a["qr_token"] for a in r.json()]
+
+
+def get_scanner_key(token: str, event_id: str) -> str:
+    r = client.get(
+        f"/api/v1/events/{event_id}/scanner-key",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 200
+    return r.json()["scanner_key"]
+
+
+def test_concurrent_scans_share_one_commit():
+    owner_token = get_token("group_owner@example.com")
+    event_id = create_event(owner_token)
+    tokens = create_attendees(owner_token, event_id, 5)
+    key = get_scanner_key(owner_token, event_id)
+
+    committer = GroupCommitter(window_s=0.2, max_batch=100)
+    flushes = committer.flushes.value
+    batches = committer.batch_size.count
+
+    futures = [committer.submit(Scan(qr_token=t, scanner_key=key)) for t in tokens]
+    futures.append(committer.submit(Scan(qr_token="not-a-real-token-123", scanner_key=key)))
+    # the same token again, from a scanner with a wrong key: written in a follow-up statement
+    futures.append(committer.submit(Scan(qr_token=tokens[0], scanner_key="wrong-key")))
+    results = [f.result(timeout=5) for f in futures]
+
+    assert [r.status for r in results[:5]] == [CheckInStatus.CHECKED_IN] * 5
+    assert results[5].status is CheckInStatus.NOT_FOUND
+    assert results[6].status is CheckInStatus.UNAUTHORIZED
+    assert committer.flushes.value == flushes + 2
+    assert committer.batch_size.count == batches + 2
+
+
+def test_checkin_route_in_group_commit_mode(monkeypatch):
+    owner_token = get_token("group_route@example.com")
+    event_id = create_event(owner_token)
+    (t1,) = create_attendees(owner_token, event_id, 1)
+    headers = {"X-Scanner-Key": get_scanner_key(owner_token, event_id)}
+    monkeypatch.setattr(settings, "CHECKIN_GROUP_COMMIT", True)
+
+    flushes = group_committer.flushes.value
+    r1 = client.post("/api/v1/checkin", json={"qr_token": t1}, headers=headers)
+    assert r1.status_code == 200
+    assert r1.json()["already_checked_in"] is False
+
+    r2 = client.post("/api/v1/checkin", json={"qr_token": t1}, headers=headers)
+    assert r2.status_code == 200
+    assert r2.json()["already_checked_in"] is True
+    assert group_committer.flushes.value == flushes + 2
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics")
+    metrics = client.get("/metrics", headers={"Authorization": "Bearer test-metrics"}).json()
+    assert metrics["checkin.group_commit.batch_size"]["count"] >= 2
+    assert metrics["checkin.group_commit.wait_ms"]["count"] >= 2
+
+
+def test_checkin_route_releases_its_connection_before_waiting(monkeypatch):
+    owner_token = get_token("group_release@example.com")
+    event_id = create_event(owner_token)
+    (t1,) = create_attendees(owner_token, event_id, 1)
+    monkeypatch.setattr(settings, "CHECKIN_GROUP_COMMIT", True)
+
+    sessions = []
+
+    def tracked_db():
+        with SessionLocal() as db:
+            sessions.append(db)
+            yield db
+
+    held = []
+    check_in = group_committer.check_in
+
+    def spy(scan):
+        held.append(sessions[0].in_transaction())
+        return check_in(scan)
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, tracked_db)
+    monkeypatch.setattr(group_committer, "check_in", spy)
+    # a cold cache: the bearer token is resolved with the request's session
+    principal_cache.clear()
+    r = client.post(
+        "/api/v1/checkin",
+        json={"qr_token": t1},
+        headers={"Authorization": f"Bearer {owner_token}"},
+    )
+    assert r.status_code == 200
+    assert r.json()["already_checked_in"] is False
+    assert held == [False]
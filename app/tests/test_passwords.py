@@ -0,0 +1,80 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.user import User
+from app.services.passwords import calibrate_rounds, password_hasher
+
+client = TestClient(app)
+
+
+def stored_hash(email: str) -> str:
+    with SessionLocal() as db:
+        return db.scalar(select(User.password_hash).where(User.email == email))
+
+
+def login(email: str):
+    return client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+
+
+def test_login_upgrades_hash_after_cost_change(monkeypatch):
+    email = f"rehash_{uuid.uuid4().hex[:8]}@example.com"
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    r = client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 201
+    assert stored_hash(email).startswith("$2b$04$")
+
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+    rehashed = password_hasher.rehashed.value
+    assert login(email).status_code == 200
+    assert stored_hash(email).startswith("$2b$05$")
+    assert password_hasher.rehashed.value == rehashed + 1
+
+    # stronger hashes are kept when the cost goes back down
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    assert login(email).status_code == 200
+    assert stored_hash(email).startswith("$2b$05$")
+    assert password_hasher.rehashed.value == rehashed + 1
+
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "wrong-password"})
+    assert r.status_code == 401
+
+
+def test_saturated_pool_answers_503(monkeypatch):
+    email = f"busy_{uuid.uuid4().hex[:8]}@example.com"
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+
+    # every process busy and the queue full
+    monkeypatch.setattr(password_hasher, "_pending", password_hasher.processes)
+    monkeypatch.setattr(password_hasher, "max_queue", 0)
+    rejected = password_hasher.rejected.value
+    r = login(email)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert password_hasher.rejected.value == rejected + 1
+
+
+def test_no_connection_is_held_while_hashing(monkeypatch):
+    email = f"idle_{uuid.uuid4().hex[:8]}@example.com"
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+
+    checked_out = []
+    verify = password_hasher.verify
+
+    async def watched_verify(password, password_hash):
+        checked_out.append(engine.pool.checkedout())
+        return await verify(password, password_hash)
+
+    monkeypatch.setattr(password_hasher, "verify", watched_verify)
+    assert login(email).status_code == 200
+    assert checked_out == [0]
+
+
+def test_calibration_stays_within_bounds():
+    assert calibrate_rounds(target_ms=0.001, min_rounds=4) == 4
+    assert calibrate_rounds(target_ms=10**9, min_rounds=4) == 16
@@ -0,0 +1,88 @@
+import uuid
+
+import psycopg
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.services.principals import INVALIDATE_CHANNEL, Principal, PrincipalCache, principal_cache
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def test_cached_principal_skips_users_lookup_until_invalidated():
+    email = f"principal_{uuid.uuid4().hex[:8]}@example.com"
+    headers = {"Authorization": f"Bearer {get_token(email)}"}
+    user_id = client.get("/api/v1/me", headers=headers).json()["id"]
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    conninfo = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        r = client.get("/api/v1/me", headers=headers)
+        assert r.json() == {"id": user_id, "email": email}
+        assert statements == []
+
+        with psycopg.connect(conninfo.render_as_string(hide_password=False)) as conn:
+            conn.execute(f'LISTEN "{INVALIDATE_CHANNEL}"')
+            conn.commit()
+            with SessionLocal() as db:
+                db.execute(
+                    text("UPDATE users SET password_hash = 'x' WHERE id = :id"), {"id": user_id}
+                )
+                db.commit()
+            payloads = [n.payload for n in conn.notifies(timeout=2, stop_after=1)]
+        assert payloads == [user_id]
+        # what the listener thread does in every worker
+        principal_cache.invalidate_user(payloads[0])
+
+        statements.clear()
+        assert client.get("/api/v1/me", headers=headers).status_code == 200
+        assert any("FROM users" in s for s in statements)
+
+        with SessionLocal() as db:
+            db.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+            db.commit()
+        principal_cache.invalidate_user(user_id)
+        assert client.get("/api/v1/me", headers=headers).status_code == 401
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+
+def test_principal_cache_bounds():
+    cache = PrincipalCache(max_size=2, ttl=60.0)
+    alice = Principal(id=uuid.uuid4(), email="alice@example.com")
+    bob = Principal(id=uuid.uuid4(), email="bob@example.com")
+
+    # expired tokens are never served
+    cache.put("expired", alice, expires_at=0.0, generation=cache.generation)
+    assert cache.get("expired") is None
+
+    # least recently used goes first
+    cache.put("a1", alice, None, cache.generation)
+    cache.put("b1", bob, None, cache.generation)
+    assert cache.get("a1") == alice
+    cache.put("a2", alice, None, cache.generation)
+    assert cache.get("b1") is None
+    assert len(cache) == 2
+
+    # a lookup that raced an invalidation is not cached
+    generation = cache.generation
+    cache.invalidate_user(alice.id)
+    assert len(cache) == 0
+    cache.put("a3", alice, None, generation)
+    assert cache.get("a3") is None
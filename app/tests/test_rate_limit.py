@@ -0,0 +1,113 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.rate_limit import Limit, MemoryBuckets, admission_gate, parse_limit, rate_limiter
+from app.services.scanner_cache import resolve_scanner_key
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Limited Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def get_scanner_key(token: str, event_id: str) -> str:
+    r = client.get(
+        f"/api/v1/events/{event_id}/scanner-key",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 200
+    scanner_key = r.json()["scanner_key"]
+    # what the key's first check-in does: it has a bucket of its own from then on
+    with SessionLocal() as db:
+        assert resolve_scanner_key(db, scanner_key) is not None
+    return scanner_key
+
+
+@pytest.fixture
+def fresh_buckets(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "backend", MemoryBuckets(max_keys=100))
+    monkeypatch.setitem(rate_limiter.limits, "checkin", Limit(rate=0.01, burst=2))
+    monkeypatch.setitem(rate_limiter.limits, "login", Limit(rate=0.01, burst=1))
+
+
+def test_checkin_is_throttled_per_scanner_key(fresh_buckets):
+    token = get_token(f"limited_{uuid.uuid4().hex[:8]}@example.com")
+    first = {"X-Scanner-Key": get_scanner_key(token, create_event(token))}
+    second = {"X-Scanner-Key": get_scanner_key(token, create_event(token))}
+
+    throttled = rate_limiter._throttled["checkin"].value
+    scan = {"qr_token": "no-such-token"}
+    codes = [
+        client.post("/api/v1/checkin", json=scan, headers=first).status_code for _ in range(3)
+    ]
+    assert codes == [404, 404, 429]
+    r = client.post("/api/v1/checkin", json=scan, headers=first)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    assert rate_limiter._throttled["checkin"].value == throttled + 2
+
+    # another scanner (and the owner's own token) have buckets of their own
+    r = client.post("/api/v1/checkin", json=scan, headers=second)
+    assert r.status_code == 404
+    r = client.post("/api/v1/checkin", json=scan, headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 404
+
+
+def test_unknown_scanner_keys_share_the_client_ip_bucket(fresh_buckets):
+    scan = {"qr_token": "no-such-token"}
+    codes = [
+        client.post(
+            "/api/v1/checkin", json=scan, headers={"X-Scanner-Key": uuid.uuid4().hex}
+        ).status_code
+        for _ in range(3)
+    ]
+    assert codes == [404, 404, 429]
+
+
+def test_login_is_throttled_per_client_ip(fresh_buckets):
+    email = f"stuffed_{uuid.uuid4().hex[:8]}@example.com"
+    body = {"email": email, "password": "wrong-password"}
+    assert client.post("/api/v1/auth/login", json=body).status_code == 401
+    assert client.post("/api/v1/auth/login", json=body).status_code == 429
+
+
+def test_admission_sheds_load_when_full(monkeypatch):
+    token = get_token("admission_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/me", headers=headers).status_code == 200
+    # the slot is given back once the request is done
+    assert admission_gate.in_flight == 0
+
+    monkeypatch.setattr(admission_gate, "max_in_flight", 1)
+    monkeypatch.setattr(admission_gate, "_in_flight", 1)
+    rejected = admission_gate.rejected.value
+    r = client.get("/api/v1/me", headers=headers)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
+    assert admission_gate.rejected.value == rejected + 1
+
+
+def test_parse_limit():
+    assert parse_limit("20/s:40") == Limit(rate=20.0, burst=40.0)
+    assert parse_limit("120/min") == Limit(rate=2.0, burst=120.0)
+    assert parse_limit(" ") is None
+    with pytest.raises(ValueError):
+        parse_limit("20 per second")
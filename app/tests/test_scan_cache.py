@@ -0,0 +1,100 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.scan_cache import scan_cache
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Debounce Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendee(token: str, event_id: str) -> dict:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees",
+        json={"full_name": "Bob", "email": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_cached_check_ins_are_still_authorized():
+    owner_token = get_token("debounce_owner@example.com")
+    owner = {"Authorization": f"Bearer {owner_token}"}
+    other = {"Authorization": f"Bearer {get_token('debounce_other@example.com')}"}
+    event_id = create_event(owner_token)
+    qr_token = create_attendee(owner_token, event_id)["qr_token"]
+    scanner = {
+        "X-Scanner-Key": client.get(f"/api/v1/events/{event_id}/scanner-key", headers=owner).json()[
+            "scanner_key"
+        ]
+    }
+
+    assert (
+        client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=scanner).json()[
+            "already_checked_in"
+        ]
+        is False
+    )
+
+    hits = scan_cache.positive_hits.value
+    r = client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=scanner)
+    assert r.status_code == 200
+    assert r.json()["already_checked_in"] is True
+    assert r.json()["full_name"] == "Bob"
+    assert scan_cache.positive_hits.value == hits + 1
+
+    # a cache hit for the wrong principal falls through to the usual checks
+    wrong_key = {"X-Scanner-Key": "debounce-wrong-key"}
+    assert (
+        client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=wrong_key).status_code
+        == 401
+    )
+    assert (
+        client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=other).status_code
+        == 403
+    )
+    r = client.post("/api/v1/checkin", json={"qr_token": qr_token}, headers=owner)
+    assert r.status_code == 200
+    assert r.json()["already_checked_in"] is True
+
+
+def test_rejected_tokens_are_counted(monkeypatch):
+    token = get_token("debounce_flood@example.com")
+    event_id = create_event(token)
+    headers = {"Authorization": f"Bearer {token}"}
+    scanner = {
+        "X-Scanner-Key": client.get(
+            f"/api/v1/events/{event_id}/scanner-key", headers=headers
+        ).json()["scanner_key"]
+    }
+    garbage = f"garbage-{uuid.uuid4().hex}"
+    hits = scan_cache.negative_hits.value
+
+    for _ in range(5):
+        r = client.post("/api/v1/checkin", json={"qr_token": garbage}, headers=scanner)
+        assert r.status_code == 404
+    assert scan_cache.negative_hits.value == hits + 4
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics")
+    metrics = client.get("/metrics", headers={"Authorization": "Bearer test-metrics"}).json()
+    assert metrics["scan_cache.negative.hits"] >= 4
+    assert "scan_cache.positive.misses" in metrics
@@ -0,0 +1,218 @@
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, update
+
+from app.core.config import settings
+from app.db.listener import listener, notify
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.event import Event
+from app.services.scanner_cache import (
+    INVALIDATE_CHANNEL,
+    MemoryBackend,
+    RedisBackend,
+    ScannerKeyCache,
+    key_digest,
+    scanner_key_cache,
+)
+from app.services.scanner_key import generate_scanner_key
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Cache Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendee(token: str, event_id: str) -> str:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees",
+        json={"full_name": "Carol", "email": "carol@example.com"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["qr_token"]
+
+
+def get_scanner_key(token: str, event_id: str) -> str:
+    r = client.get(
+        f"/api/v1/events/{event_id}/scanner-key",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 200
+    return r.json()["scanner_key"]
+
+
+class FakeRedis:
+    """Local stand-in for the redis-py client surface used by RedisBackend."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    def get(self, key: str) -> str | None:
+        return self.data.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    def delete(self, key: str) -> None:
+        self.data.pop(key, None)
+
+
+def test_cached_scanner_key_skips_events_lookup(monkeypatch):
+    owner_token = get_token("cache_owner@example.com")
+    event_id = create_event(owner_token)
+    t1 = create_attendee(owner_token, event_id)
+    t2 = create_attendee(owner_token, event_id)
+    headers = {"X-Scanner-Key": get_scanner_key(owner_token, event_id)}
+
+    hits, misses = scanner_key_cache.hits.value, scanner_key_cache.misses.value
+    r1 = client.post("/api/v1/checkin", json={"qr_token": t1}, headers=headers)
+    assert r1.status_code == 200
+    assert scanner_key_cache.misses.value == misses + 1
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        r2 = client.post("/api/v1/checkin", json={"qr_token": t2}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert r2.status_code == 200
+    assert r2.json()["already_checked_in"] is False
+    assert scanner_key_cache.hits.value == hits + 1
+    assert len(statements) == 1
+    assert "events" not in statements[0]
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics")
+    m = client.get("/metrics", headers={"Authorization": "Bearer test-metrics"})
+    assert m.status_code == 200
+    assert m.json()["scanner_key_cache.hits"] >= 1
+
+
+def test_rotate_invalidates_warm_cache():
+    owner_token = get_token("cache_rotate@example.com")
+    event_id = create_event(owner_token)
+    t1 = create_attendee(owner_token, event_id)
+    t2 = create_attendee(owner_token, event_id)
+    old_key = get_scanner_key(owner_token, event_id)
+
+    r1 = client.post("/api/v1/checkin", json={"qr_token": t1}, headers={"X-Scanner-Key": old_key})
+    assert r1.status_code == 200
+    assert scanner_key_cache.get_event_id(old_key) == uuid.UUID(event_id)
+
+    r = client.post(
+        f"/api/v1/events/{event_id}/scanner-key/rotate",
+        headers={"Authorization": f"Bearer {owner_token}"},
+    )
+    assert r.status_code == 200
+
+    r2 = client.post("/api/v1/checkin", json={"qr_token": t2}, headers={"X-Scanner-Key": old_key})
+    assert r2.status_code == 401
+
+
+def test_rotation_in_another_worker_invalidates_via_notify():
+    owner_token = get_token("cache_notify@example.com")
+    event_id = create_event(owner_token)
+    t1 = create_attendee(owner_token, event_id)
+    old_key = get_scanner_key(owner_token, event_id)
+
+    r1 = client.post("/api/v1/checkin", json={"qr_token": t1}, headers={"X-Scanner-Key": old_key})
+    assert r1.status_code == 200
+    assert scanner_key_cache.get_event_id(old_key) is not None
+
+    listener.start()
+    try:
+        time.sleep(0.5)  # let the listener connect and LISTEN
+        # what another worker's rotate_scanner_key does, without touching our cache
+        with SessionLocal() as db:
+            db.execute(
+                update(Event)
+                .where(Event.id == uuid.UUID(event_id))
+                .values(scanner_key=generate_scanner_key())
+            )
+            notify(db, INVALIDATE_CHANNEL, key_digest(old_key))
+            db.commit()
+
+        deadline = time.monotonic() + 5
+        while scanner_key_cache.get_event_id(old_key) is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert scanner_key_cache.get_event_id(old_key) is None
+    finally:
+        listener.stop()
+
+
+def test_lookup_racing_a_rotation_is_not_cached():
+    cache = ScannerKeyCache(MemoryBackend(max_size=10), ttl=60)
+    event_id = uuid.uuid4()
+    generation = cache.generation
+    # the rotation is invalidated while the old key is being looked up
+    cache.invalidate("old-scanner-key")
+    cache.put("old-scanner-key", event_id, generation)
+    assert cache.get_event_id("old-scanner-key") is None
+
+    cache.put("old-scanner-key", event_id, cache.generation)
+    assert cache.get_event_id("old-scanner-key") == event_id
+    cache.clear()
+    assert cache.get_event_id("old-scanner-key") is None
+
+
+def test_listener_reconnect_drops_cached_keys():
+    key = generate_scanner_key()
+    scanner_key_cache.put(key, uuid.uuid4(), scanner_key_cache.generation)
+
+    # rotations notified while the listener was down are lost: (re)LISTEN starts over
+    listener.start()
+    try:
+        deadline = time.monotonic() + 5
+        while scanner_key_cache.get_event_id(key) is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert scanner_key_cache.get_event_id(key) is None
+    finally:
+        listener.stop()
+
+
+def test_memory_backend_lru_and_ttl():
+    backend = MemoryBackend(max_size=2)
+    backend.set("a", "1", ttl=60)
+    backend.set("b", "2", ttl=60)
+    assert backend.get("a") == "1"
+    backend.set("c", "3", ttl=60)  # evicts "b", the least recently used
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+
+    backend.set("d", "4", ttl=-1)
+    assert backend.get("d") is None
+
+
+def test_shared_backend():
+    fake = FakeRedis()
+    cache_a = ScannerKeyCache(RedisBackend(fake), ttl=60)
+    cache_b = ScannerKeyCache(RedisBackend(fake), ttl=60)
+    event_id = uuid.uuid4()
+
+    cache_a.put("some-scanner-key", event_id, cache_a.generation)
+    assert cache_b.get_event_id("some-scanner-key") == event_id
+    assert not any("some-scanner-key" in k for k in fake.data)
+
+    cache_b.invalidate("some-scanner-key")
+    assert cache_a.get_event_id("some-scanner-key") is None
@@ -0,0 +1,128 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.db.session import engine
+from app.main import app
+from app.services.qr import InvalidTokenError, sign_qr_token, verify_qr_token
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def signing(monkeypatch):
+    monkeypatch.setattr(settings, "QR_SIGNING_KEYS", "k1:first-secret,k2:second-secret")
+    monkeypatch.setattr(settings, "QR_SIGNING_KID", "k2")
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Signed Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def test_signed_tokens_verify_offline(signing):
+    event_id, attendee_id = uuid.uuid4(), uuid.uuid4()
+    token = sign_qr_token(event_id, attendee_id)
+    assert token.startswith("q1.k2.")
+    signed = verify_qr_token(token)
+    assert (signed.kid, signed.event_id, signed.attendee_id) == ("k2", event_id, attendee_id)
+
+    # tokens of a retired kid verify while it stays listed
+    assert verify_qr_token(sign_qr_token(event_id, attendee_id, kid="k1")).kid == "k1"
+
+    head, _, mac = token.rpartition(".")
+    forged = f"{head}.{'A' if mac[0] != 'A' else 'B'}{mac[1:]}"
+    other_event = sign_qr_token(uuid.uuid4(), attendee_id)
+    # the ids are signed: moving a token to another event breaks it
+    moved = f"q1.k2.{other_event.split('.')[2]}.{mac}"
+    for bad in (forged, moved, token.replace("q1.k2.", "q1.k9."), "q1.k2.short.mac", "q1."):
+        with pytest.raises(InvalidTokenError):
+            verify_qr_token(bad)
+    # opaque tokens are left to the database
+    assert verify_qr_token("Zm9vYmFyYmF6cXV4") is None
+
+
+def test_check_in_with_signed_tokens(monkeypatch):
+    token = get_token("signed_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    other_event_id = create_event(token)
+    # issued before signing was turned on
+    opaque = client.post(
+        f"/api/v1/events/{event_id}/attendees", json={"full_name": "Opaque"}, headers=headers
+    ).json()
+    monkeypatch.setattr(settings, "QR_SIGNING_KEYS", "k1:first-secret,k2:second-secret")
+    monkeypatch.setattr(settings, "QR_SIGNING_KID", "k2")
+    attendee = client.post(
+        f"/api/v1/events/{event_id}/attendees", json={"full_name": "Signed"}, headers=headers
+    ).json()
+    assert attendee["qr_token"].startswith("q1.k2.")
+    assert verify_qr_token(attendee["qr_token"]).attendee_id == uuid.UUID(attendee["id"])
+    other = client.post(
+        f"/api/v1/events/{other_event_id}/attendees",
+        json={"full_name": "Elsewhere"},
+        headers=headers,
+    ).json()
+    r = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers)
+    scanner = {"X-Scanner-Key": r.json()["scanner_key"]}
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    head, _, mac = attendee["qr_token"].rpartition(".")
+    forged = f"{head}.{'A' if mac[0] != 'A' else 'B'}{mac[1:]}"
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        # a bad MAC is refused on the CPU
+        r = client.post("/api/v1/checkin", json={"qr_token": forged}, headers=scanner)
+        assert r.status_code == 404
+        assert statements == []
+
+        r = client.post("/api/v1/checkin", json={"qr_token": attendee["qr_token"]}, headers=scanner)
+        assert r.status_code == 200
+        assert r.json()["attendee_id"] == attendee["id"]
+        assert r.json()["already_checked_in"] is False
+        assert len(statements) == 1
+        assert "attendee_id" in statements[0]
+
+        # so is a valid token of another event, once the scanner key is resolved
+        r = client.post("/api/v1/checkin", json={"qr_token": other["qr_token"]}, headers=scanner)
+        assert r.status_code == 401
+        assert len(statements) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    # opaque tokens keep working, also next to signed ones in one statement
+    second = client.post(
+        f"/api/v1/events/{event_id}/attendees", json={"full_name": "Second"}, headers=headers
+    ).json()
+    statements.clear()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        r = client.post(
+            "/api/v1/checkin/batch",
+            json={"items": [{"qr_token": opaque["qr_token"]}, {"qr_token": second["qr_token"]}]},
+            headers=scanner,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    assert [item["status_code"] for item in r.json()["items"]] == [200, 200]
+    assert [item["result"]["full_name"] for item in r.json()["items"]] == ["Opaque", "Second"]
+    assert len(statements) == 1
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import uuid
+
+import psycopg
+from fastapi.testclient import TestClient
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.main import app
+from app.services.rate_limit import admission_gate
+from app.services.stats_stream import STATS_CHANNEL, StatsHub
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Live Stats Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def _message(chunk: str) -> dict[str, int]:
+    event, data = chunk.strip().split("\n")
+    assert event == "event: stats"
+    return json.loads(data.removeprefix("data: "))
+
+
+def test_check_in_notifies_and_streams_stats():
+    token = get_token("stream_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    attendees = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": "Ada"}, {"full_name": "Grace"}]},
+        headers=headers,
+    ).json()
+
+    conninfo = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    hub = StatsHub(interval=0.01, max_age=60.0)
+
+    async def scenario() -> list[dict[str, int]]:
+        stream = hub.stream(uuid.UUID(event_id))
+        try:
+            first = _message(await anext(stream))
+            with psycopg.connect(conninfo.render_as_string(hide_password=False)) as conn:
+                conn.execute(f'LISTEN "{STATS_CHANNEL}"')
+                conn.commit()
+                r = client.post(
+                    "/api/v1/checkin", json={"qr_token": attendees[0]["qr_token"]}, headers=headers
+                )
+                assert r.status_code == 200
+                payloads = [n.payload for n in conn.notifies(timeout=2, stop_after=1)]
+            assert payloads == [event_id]
+            # what the listener thread does for this worker
+            hub.on_notify(event_id)
+            return [first, _message(await anext(stream))]
+        finally:
+            await stream.aclose()
+
+    first, second = asyncio.run(scenario())
+    assert first == {"total": 2, "checked_in": 0, "not_checked_in": 2}
+    assert second == {"total": 2, "checked_in": 1, "not_checked_in": 1}
+    # the last viewer left: nothing is kept for the event
+    assert not hub._watched
+
+
+def test_stream_requires_owner(monkeypatch):
+    owner = get_token("stream_owner2@example.com")
+    other = get_token("stream_other@example.com")
+    event_id = create_event(owner)
+
+    r = client.get(
+        f"/api/v1/events/{event_id}/stats/stream", headers={"Authorization": f"Bearer {other}"}
+    )
+    assert r.status_code == 403
+
+    # streams live as long as the dashboard: they never take an admission slot
+    monkeypatch.setattr(admission_gate, "max_in_flight", 1)
+    monkeypatch.setattr(admission_gate, "_in_flight", 1)
+    r = client.get(
+        f"/api/v1/events/{event_id}/stats/stream", headers={"Authorization": f"Bearer {other}"}
+    )
+    assert r.status_code == 403
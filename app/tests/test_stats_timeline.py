@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={"name": "Timeline Event", "venue": None, "start_time": None},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def test_timeline_buckets_replayed_check_ins():
+    token = get_token("timeline_owner@example.com")
+    headers = {"Authorization": f"Bearer {token}"}
+    event_id = create_event(token)
+    attendees = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(6)]},
+        headers=headers,
+    ).json()
+
+    # on the hour, so the hourly buckets below split the arrivals the same way at any time
+    doors = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    doors -= timedelta(hours=3)
+    # two arrivals in the first minute, one four minutes later, three an hour later
+    offsets = [timedelta(seconds=5), timedelta(seconds=40), timedelta(minutes=4, seconds=1)]
+    offsets += [timedelta(hours=1, minutes=2)] * 3
+    r = client.post(
+        "/api/v1/checkin/batch",
+        json={
+            "items": [
+                {"qr_token": a["qr_token"], "scanned_at": (doors + offset).isoformat()}
+                for a, offset in zip(attendees, offsets, strict=True)
+            ]
+        },
+        headers=headers,
+    )
+    assert r.status_code == 200
+    url = f"/api/v1/events/{event_id}/stats/timeline"
+
+    r = client.get(url, params={"bucket": "1m"}, headers=headers)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["bucket_seconds"] == 60
+    assert body["checked_in_by_window_end"] == 6
+    # every minute from the first to the last check-in, empty ones as zeros
+    assert len(body["buckets"]) == 63
+    assert [b["checked_in"] for b in body["buckets"][:5]] == [2, 0, 0, 0, 1]
+    assert body["buckets"][-1]["cumulative"] == 6
+    assert body["peak"]["checked_in"] == 3
+    assert body["peak_per_minute"] == 3.0
+
+    body = client.get(url, params={"bucket": "1h"}, headers=headers).json()
+    assert sum(b["checked_in"] for b in body["buckets"]) == 6
+    assert body["peak_per_minute"] == 3 / 60
+
+    # a window starting after the first arrivals keeps counting from them
+    start, end = doors + timedelta(minutes=2), doors + timedelta(minutes=10)
+    body = client.get(
+        url,
+        params={"bucket": "5m", "start": start.isoformat(), "end": end.isoformat()},
+        headers=headers,
+    ).json()
+    first = start - timedelta(minutes=start.minute % 5)
+    starts = [datetime.fromisoformat(b["start"].replace("Z", "+00:00")) for b in body["buckets"]]
+    assert starts[0] == first
+    assert starts[-1] < end <= starts[-1] + timedelta(minutes=5)
+    assert body["buckets"][-1]["cumulative"] == 3
+
+    other = {"Authorization": f"Bearer {get_token('timeline_other@example.com')}"}
+    assert client.get(url, headers=other).status_code == 403
+    assert client.get(url, params={"bucket": "2m"}, headers=headers).status_code == 422
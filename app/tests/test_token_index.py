@@ -0,0 +1,163 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, event, select, update
+
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.attendee import Attendee
+from app.services.token_index import EventIndex, token_index
+
+client = TestClient(app)
+
+
+def get_token(email: str) -> str:
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+    r = client.post("/api/v1/auth/login", json={"email": email, "password": "Password123!"})
+    assert r.status_code == 200
+    return r.json()["access_token"]
+
+
+def create_event(token: str, start_time: datetime | None) -> str:
+    r = client.post(
+        "/api/v1/events",
+        json={
+            "name": "Warm Event",
+            "venue": None,
+            "start_time": start_time.isoformat() if start_time else None,
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()["id"]
+
+
+def create_attendees(token: str, event_id: str, n: int) -> list[dict]:
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/bulk",
+        json={"attendees": [{"full_name": f"Guest {i}"} for i in range(n)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert r.status_code == 201
+    return r.json()
+
+
+def test_event_index_entries_round_trip():
+    index = EventIndex(uuid.uuid4(), uuid.uuid4())
+    attendee_id = uuid.uuid4()
+    index.put("tok", attendee_id, "Alice", None)
+    assert index.get("tok").checked_in_at is None
+
+    at = datetime(2026, 5, 1, 18, 30, 0, 123456, tzinfo=timezone.utc)
+    index.put("tok", attendee_id, "Alice", at)
+    entry = index.get("tok")
+    assert entry.attendee_id == attendee_id
+    assert entry.full_name == "Alice"
+    assert entry.checked_in_at == at
+    assert index.get("other") is None
+    assert len(index) == 1
+
+
+def test_imminent_event_scans_skip_the_lookup():
+    owner_token = get_token("warm_owner@example.com")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    soon = datetime.now(timezone.utc) + timedelta(minutes=30)
+    event_id = create_event(owner_token, soon)
+    cold_event_id = create_event(owner_token, None)
+    first, second, third = create_attendees(owner_token, event_id, 3)
+    scanner_key = client.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers).json()[
+        "scanner_key"
+    ]
+    scanner = {"X-Scanner-Key": scanner_key}
+
+    token_index.refresh()
+    assert token_index.find(first["qr_token"]) is not None
+    assert token_index.find(create_attendees(owner_token, cold_event_id, 1)[0]["qr_token"]) is None
+    # added after the warm-up
+    late = create_attendees(owner_token, event_id, 1)[0]
+    assert token_index.find(late["qr_token"]) is not None
+
+    # checked in through another worker, unknown to this index
+    with SessionLocal() as db:
+        db.execute(
+            update(Attendee)
+            .where(Attendee.qr_token == third["qr_token"])
+            .values(checked_in_at=datetime.now(timezone.utc))
+        )
+        db.commit()
+
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        c1 = client.post("/api/v1/checkin", json={"qr_token": first["qr_token"]}, headers=scanner)
+        assert c1.status_code == 200
+        assert c1.json()["already_checked_in"] is False
+        assert c1.json()["full_name"] == "Guest 0"
+        assert len(statements) == 1
+        assert statements[0].lstrip().startswith("UPDATE attendees")
+        assert "events" not in statements[0]
+
+        # a repeat scan never reaches Postgres
+        c2 = client.post("/api/v1/checkin", json={"qr_token": first["qr_token"]}, headers=scanner)
+        assert c2.status_code == 200
+        assert c2.json()["already_checked_in"] is True
+        assert c2.json()["checked_in_at"] == c1.json()["checked_in_at"]
+        assert len(statements) == 1
+
+        c3 = client.post("/api/v1/checkin", json={"qr_token": third["qr_token"]}, headers=scanner)
+        assert c3.status_code == 200
+        assert c3.json()["already_checked_in"] is True
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    # the owner is authorized from memory too; other users still get 403
+    c4 = client.post("/api/v1/checkin", json={"qr_token": second["qr_token"]}, headers=headers)
+    assert c4.status_code == 200
+    other = {"Authorization": f"Bearer {get_token('warm_other@example.com')}"}
+    c5 = client.post("/api/v1/checkin", json={"qr_token": late["qr_token"]}, headers=other)
+    assert c5.status_code == 403
+    c6 = client.post(
+        "/api/v1/checkin", json={"qr_token": late["qr_token"]}, headers={"X-Scanner-Key": "nope"}
+    )
+    assert c6.status_code == 401
+
+
+def test_refresh_reloads_events_changed_elsewhere():
+    owner_token = get_token("warm_reload@example.com")
+    headers = {"Authorization": f"Bearer {owner_token}"}
+    event_id = create_event(owner_token, datetime.now(timezone.utc) + timedelta(minutes=30))
+    kept, deleted = create_attendees(owner_token, event_id, 2)
+    token_index.refresh()
+    assert token_index.find(deleted["qr_token"]) is not None
+
+    # imported by this worker: known before the next refresh
+    r = client.post(
+        f"/api/v1/events/{event_id}/attendees/import",
+        content=b"full_name,email\nIvy Import,\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    assert r.json()["imported"] == 1
+    with SessionLocal() as db:
+        qr_token = db.scalar(
+            select(Attendee.qr_token).where(
+                Attendee.event_id == uuid.UUID(event_id), Attendee.full_name == "Ivy Import"
+            )
+        )
+    imported = token_index.find(qr_token)
+    assert imported is not None
+    assert imported[1].checked_in_at is None
+
+    # deleted through another worker (or by hand): gone after the next refresh
+    with SessionLocal() as db:
+        db.execute(delete(Attendee).where(Attendee.qr_token == deleted["qr_token"]))
+        db.commit()
+    reloads = token_index.reloads.value
+    token_index.refresh()
+    assert token_index.find(deleted["qr_token"]) is None
+    assert token_index.find(kept["qr_token"]) is not None
+    assert token_index.reloads.value == reloads + 1
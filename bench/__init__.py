@@ -0,0 +1,5 @@
+"""
+Local benchmarks. They expect a reachable Postgres (DATABASE_URL) with
+migrations applied, the same setup the test suite uses, and are run from
+the repo root, e.g. `python -m bench.bench_async`.
+"""
@@ -0,0 +1,103 @@
+"""
+Compares sync (threadpool) and async (AsyncEngine) serving of POST /api/v1/checkin.
+
+Each mode gets its own single-worker uvicorn process; N attendees are seeded
+into a fresh event and scanned once each by C concurrent scanners using the
+event's scanner key. Reports requests/sec and latency percentiles.
+
+    python -m bench.bench_async --attendees 5000 --concurrency 128
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from bench.common import THROTTLED, seed, start_server
+
+
+async def drive(base_url: str, scanner_key: str, tokens: list[str], concurrency: int) -> dict:
+    queue: asyncio.Queue[str] = asyncio.Queue()
+    for t in tokens:
+        queue.put_nowait(t)
+    latencies: list[float] = []
+    errors = 0
+    throttled = 0
+
+    async def scanner(client: httpx.AsyncClient) -> None:
+        nonlocal errors, throttled
+        while not queue.empty():
+            qr_token = queue.get_nowait()
+            started = time.perf_counter()
+            r = await client.post("/api/v1/checkin", json={"qr_token": qr_token})
+            latencies.append(time.perf_counter() - started)
+            if r.status_code in THROTTLED:
+                throttled += 1
+            elif r.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, headers={"X-Scanner-Key": scanner_key}, limits=limits, timeout=60
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(scanner(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throttled": throttled,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--attendees", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("sync", "async"):
+        proc = start_server(args.port, {"DB_ASYNC": "true" if mode == "async" else "false"})
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            seeded = seed(base_url, args.attendees)
+            results[mode] = asyncio.run(
+                drive(base_url, seeded.scanner_key, seeded.qr_tokens, args.concurrency)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(
+        f"{'mode':<6} {'requests':>9} {'errors':>7} {'throttled':>9} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for mode, r in results.items():
+        print(
+            f"{mode:<6} {r['requests']:>9} {r['errors']:>7} {r['throttled']:>9} {r['rps']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(
+                {"attendees": args.attendees, "concurrency": args.concurrency, "results": results},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
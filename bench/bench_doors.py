@@ -0,0 +1,293 @@
+"""
+Simulates event doors against POST /api/v1/checkin.
+
+Seeds an event with N attendees, then S concurrent scanners work through a
+scan plan with a realistic mix:
+
+- first scans of every attendee, in random order
+- duplicate scans of tokens already issued (cameras re-reading a badge)
+- invalid tokens (damaged or foreign codes)
+
+Each scan authenticates with the event's X-Scanner-Key, or with the owner's
+JWT for a share of them. Reports throughput, latency percentiles per scan
+kind, and DB cost per scan: statements sent by the app (the db.statements
+counter on /metrics) and transactions committed by Postgres (pg_stat_database).
+
+Results can be written as JSON tagged with the current commit, and a
+previous result can be passed to --compare:
+
+    python -m bench.bench_doors --attendees 5000 --scanners 64 --json doors.json
+    python -m bench.bench_doors --compare doors.json
+
+Without --url a single-worker server is started (extra settings can be passed
+with --env KEY=VALUE, e.g. --env CHECKIN_GROUP_COMMIT=true).
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import secrets
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import httpx
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from bench.common import METRICS_TOKEN, THROTTLED, seed, start_server
+
+FIRST = "first"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+
+# what each kind of scan should answer; anything else counts as an error
+_EXPECTED = {FIRST: {200}, DUPLICATE: {200}, INVALID: {404}}
+
+
+@dataclass
+class PlannedScan:
+    kind: str
+    qr_token: str
+    jwt: bool
+
+
+def plan_scans(
+    tokens: list[str], duplicate_rate: float, invalid_rate: float, jwt_share: float, rng
+) -> list[PlannedScan]:
+    """First scans in random order, with duplicates and invalid codes mixed in."""
+    order = tokens[:]
+    rng.shuffle(order)
+    issued: list[str] = []
+    plan: list[PlannedScan] = []
+    pending = iter(order)
+    remaining = len(order)
+    while remaining:
+        roll = rng.random()
+        if roll < invalid_rate:
+            kind, qr_token = INVALID, secrets.token_urlsafe(32)
+        elif roll < invalid_rate + duplicate_rate and issued:
+            kind, qr_token = DUPLICATE, rng.choice(issued[-200:])
+        else:
+            kind, qr_token = FIRST, next(pending)
+            issued.append(qr_token)
+            remaining -= 1
+        plan.append(PlannedScan(kind=kind, qr_token=qr_token, jwt=rng.random() < jwt_share))
+    return plan
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def db_statements(base_url: str) -> int:
+    headers = {"Authorization": f"Bearer {METRICS_TOKEN}"}
+    return httpx.get(f"{base_url}/metrics", headers=headers).json().get("db.statements", 0)
+
+
+def pg_transactions(conninfo: str) -> int:
+    with psycopg.connect(conninfo, autocommit=True) as conn:
+        return conn.execute(
+            "SELECT xact_commit + xact_rollback FROM pg_stat_database "
+            "WHERE datname = current_database()"
+        ).fetchone()[0]
+
+
+async def drive(
+    base_url: str, plan: list[PlannedScan], scanner_key: str, access_token: str, scanners: int
+) -> dict:
+    queue: asyncio.Queue[PlannedScan] = asyncio.Queue()
+    for scan in plan:
+        queue.put_nowait(scan)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    throttled = 0
+    auth = {
+        True: {"Authorization": f"Bearer {access_token}"},
+        False: {"X-Scanner-Key": scanner_key},
+    }
+
+    async def scanner(client: httpx.AsyncClient, door: int) -> None:
+        nonlocal throttled
+        while not queue.empty():
+            scan = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                r = await client.post(
+                    "/api/v1/checkin",
+                    json={"qr_token": scan.qr_token, "device_id": f"door-{door}"},
+                    headers=auth[scan.jwt],
+                )
+                status = r.status_code
+            except httpx.TransportError:
+                status = 0
+            latencies[scan.kind].append(time.perf_counter() - started)
+            if status in THROTTLED:
+                throttled += 1
+            elif status not in _EXPECTED[scan.kind]:
+                errors[str(status)] += 1
+
+    limits = httpx.Limits(max_connections=scanners, max_keepalive_connections=scanners)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(scanner(client, i) for i in range(scanners)))
+        elapsed = time.perf_counter() - started
+
+    everything = [v for values in latencies.values() for v in values]
+    return {
+        "requests": len(everything),
+        "elapsed_s": elapsed,
+        "rps": len(everything) / elapsed,
+        "errors": dict(errors),
+        "throttled": throttled,
+        "latency": summarize(everything),
+        "by_kind": {kind: summarize(values) for kind, values in sorted(latencies.items())},
+    }
+
+
+def git_commit() -> dict:
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    return {"sha": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "-uno"))}
+
+
+def print_report(results: dict, baseline: dict | None) -> None:
+    run = results["run"]
+    print(
+        f"{run['requests']} scans in {run['elapsed_s']:.1f}s: {run['rps']:.1f} scans/s, "
+        f"errors {run['errors'] or 'none'}, throttled {run.get('throttled', 0)}"
+    )
+    print(
+        f"db: {results['db']['statements_per_scan']:.2f} statements/scan, "
+        f"{results['db']['transactions_per_scan']:.2f} transactions/scan"
+    )
+    print(f"{'kind':<10} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    rows = {"all": run["latency"], **run["by_kind"]}
+    for kind, s in rows.items():
+        print(
+            f"{kind:<10} {s['count']:>7} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} "
+            f"{s['p99_ms']:>8.2f} {s['max_ms']:>8.2f}"
+        )
+    if baseline:
+        old = baseline["run"]
+        sha = baseline.get("commit", {}).get("sha", "")[:10] or "baseline"
+        print(f"vs {sha}:")
+        for label, new_value, old_value in (
+            ("scans/s", run["rps"], old["rps"]),
+            ("p50 ms", run["latency"]["p50_ms"], old["latency"]["p50_ms"]),
+            ("p99 ms", run["latency"]["p99_ms"], old["latency"]["p99_ms"]),
+            (
+                "stmts/scan",
+                results["db"]["statements_per_scan"],
+                baseline["db"]["statements_per_scan"],
+            ),
+        ):
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            print(f"  {label:<11} {old_value:>9.2f} -> {new_value:>9.2f} ({change:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--attendees", type=int, default=2000)
+    parser.add_argument("--scanners", type=int, default=32, help="concurrent simulated doors")
+    parser.add_argument("--duplicate-rate", type=float, default=0.25)
+    parser.add_argument("--invalid-rate", type=float, default=0.05)
+    parser.add_argument("--jwt-share", type=float, default=0.1, help="scans sent with the JWT")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    parser.add_argument("--compare", help="a previous --json result to compare against")
+    args = parser.parse_args()
+
+    env = dict(item.split("=", 1) for item in args.env)
+    proc = None if args.url else start_server(args.port, env)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    conninfo = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    conninfo = conninfo.render_as_string(hide_password=False)
+    try:
+        seeded = seed(base_url, args.attendees)
+        plan = plan_scans(
+            seeded.qr_tokens,
+            args.duplicate_rate,
+            args.invalid_rate,
+            args.jwt_share,
+            random.Random(args.seed),
+        )
+        statements_before = db_statements(base_url)
+        transactions_before = pg_transactions(conninfo)
+        run = asyncio.run(
+            drive(base_url, plan, seeded.scanner_key, seeded.access_token, args.scanners)
+        )
+        statements = db_statements(base_url) - statements_before
+        transactions = pg_transactions(conninfo) - transactions_before
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    results = {
+        "benchmark": "doors",
+        "commit": git_commit(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "attendees": args.attendees,
+            "scanners": args.scanners,
+            "duplicate_rate": args.duplicate_rate,
+            "invalid_rate": args.invalid_rate,
+            "jwt_share": args.jwt_share,
+            "seed": args.seed,
+            "env": env,
+        },
+        "run": run,
+        "db": {
+            # the server's own counter; with --url and several workers it covers one of them
+            "statements": statements,
+            "statements_per_scan": statements / run["requests"],
+            # database-wide, so other traffic on the same database shows up here
+            "transactions": transactions,
+            "transactions_per_scan": transactions / run["requests"],
+        },
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmarks GET /api/v1/events/{id}/attendees/export on a large event.
+
+Seeds N attendees straight into Postgres (generate_series; going through the
+API would dominate the run), streams the export in each requested format and
+reports time to first byte, total time, rows/s, bytes on the wire and the
+server's peak RSS, which should stay flat as N grows. The seeded event is
+deleted afterwards unless --keep is given.
+
+    python -m bench.bench_export --attendees 1000000
+"""
+
+import argparse
+import json
+import time
+import zlib
+
+import httpx
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from bench.common import seed, start_server
+
+_SEED_SQL = """
+    INSERT INTO attendees (id, event_id, full_name, email, qr_token)
+    SELECT gen_random_uuid(), %(event_id)s, 'Guest ' || i, 'guest' || i || '@example.com',
+           md5(random()::text) || md5(i::text)
+    FROM generate_series(1, %(n)s) AS i
+"""
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def export(base_url: str, access_token: str, event_id: str, fmt: str, gzip: bool) -> dict:
+    url = f"{base_url}/api/v1/events/{event_id}/attendees/export"
+    params = {"format": fmt, "gzip": str(gzip).lower()}
+    headers = {"Authorization": f"Bearer {access_token}", "Accept-Encoding": "identity"}
+    decompress = zlib.decompressobj(31) if gzip else None
+    wire_bytes = 0
+    lines = 0
+    first_byte = None
+    started = time.perf_counter()
+    with httpx.stream("GET", url, params=params, headers=headers, timeout=None) as r:
+        r.raise_for_status()
+        # raw bytes: count what crosses the wire, decompress ourselves
+        for chunk in r.iter_raw():
+            if first_byte is None:
+                first_byte = time.perf_counter() - started
+            wire_bytes += len(chunk)
+            data = decompress.decompress(chunk) if decompress else chunk
+            lines += data.count(b"\n")
+    elapsed = time.perf_counter() - started
+    rows = lines - 1 if fmt == "csv" else lines
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "ttfb_ms": (first_byte or 0.0) * 1000,
+        "rows_per_s": rows / elapsed,
+        "wire_mb": wire_bytes / 1_000_000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--attendees", type=int, default=1_000_000)
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded event")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    conninfo = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    conninfo = conninfo.render_as_string(hide_password=False)
+    proc = start_server(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+    results: dict = {"attendees": args.attendees, "runs": {}}
+    try:
+        seeded = seed(base_url, 0)
+        started = time.perf_counter()
+        with psycopg.connect(conninfo) as conn:
+            conn.execute(_SEED_SQL, {"event_id": seeded.event_id, "n": args.attendees})
+        print(f"seeded {args.attendees:,} attendees in {time.perf_counter() - started:.1f}s")
+
+        rss_before = peak_rss_mb(proc.pid)
+        for fmt, gzip in (("csv", False), ("csv", True), ("ndjson", False), ("ndjson", True)):
+            name = f"{fmt}{'+gzip' if gzip else ''}"
+            results["runs"][name] = export(
+                base_url, seeded.access_token, seeded.event_id, fmt, gzip
+            )
+        results["server_peak_rss_mb"] = {"before": rss_before, "after": peak_rss_mb(proc.pid)}
+
+        if not args.keep:
+            with psycopg.connect(conninfo) as conn:
+                conn.execute("DELETE FROM events WHERE id = %s", (seeded.event_id,))
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    print(f"{'format':<12} {'rows':>10} {'seconds':>8} {'ttfb ms':>8} {'rows/s':>10} {'MB':>8}")
+    for name, r in results["runs"].items():
+        print(
+            f"{name:<12} {r['rows']:>10,} {r['seconds']:>8.1f} {r['ttfb_ms']:>8.1f} "
+            f"{r['rows_per_s']:>10,.0f} {r['wire_mb']:>8.1f}"
+        )
+    rss = results["server_peak_rss_mb"]
+    print(f"server peak RSS: {rss['before']:.0f} MB before exports, {rss['after']:.0f} MB after")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmarks attendee search on large events.
+
+For each size, seeds one event straight into Postgres (generate_series with
+names drawn from small first/last name lists, so matches are realistic rather
+than unique) and times, in-process, the queries the door UI sends while
+someone types: short prefixes, full names, and names with a typo. The indexed
+search (search_attendees) is compared against the `%q%` ILIKE filter of the
+attendee listing, which has to scan every attendee of the event.
+
+    python -m bench.bench_search --sizes 100000 1000000
+
+Typo queries only return results where pg_trgm is installed.
+"""
+
+import argparse
+import json
+import random
+import secrets
+import time
+import uuid
+
+from sqlalchemy import or_, select, text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, engine
+from app.models.attendee import Attendee
+from app.services.attendee_search import search_attendees, trigram_available
+from bench.bench_doors import summarize
+
+FIRST_NAMES = [
+    "James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David",
+    "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas",
+    "Sarah", "Charles", "Karen", "Priya", "Wei", "Fatima", "Mateo", "Aiko", "Olusegun",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+    "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor",
+    "Moore", "Jackson", "Martin", "Nakamura", "Okafor", "Chen", "Patel", "Kowalski", "Novak",
+]
+
+QUERIES = {
+    "prefix": ["j", "ma", "pat", "smi", "rod", "jo sm", "el mar", "ok"],
+    "full": ["John Smith", "Priya Patel", "Wei Chen", "garcia", "susan.moore"],
+    "typo": ["Jonh Smith", "Patrica Lopes", "Wiliam Tayler", "Mateo Rodrigez"],
+}
+
+_SEED_SQL = """
+    INSERT INTO attendees (id, event_id, full_name, email, qr_token)
+    SELECT gen_random_uuid(), :event_id, f || ' ' || l,
+           lower(f) || '.' || lower(l) || i || '@example.com',
+           md5(random()::text) || md5(i::text)
+    FROM (
+        SELECT i,
+               fs[1 + floor(random() * cardinality(fs))::int] AS f,
+               ls[1 + floor(random() * cardinality(ls))::int] AS l
+        FROM generate_series(1, :n) AS i,
+             (SELECT CAST(:first AS text[]) AS fs, CAST(:last AS text[]) AS ls) AS lists
+    ) names
+"""
+
+
+def seed_event(db: Session, attendees: int) -> uuid.UUID:
+    user_id = db.scalar(
+        text(
+            "INSERT INTO users (id, email, password_hash) "
+            "VALUES (gen_random_uuid(), :email, 'x') RETURNING id"
+        ),
+        {"email": f"bench-search-{secrets.token_hex(4)}@example.com"},
+    )
+    event_id = db.scalar(
+        text(
+            "INSERT INTO events (id, owner_user_id, name, scanner_key) "
+            "VALUES (gen_random_uuid(), :user_id, 'search bench', :key) RETURNING id"
+        ),
+        {"user_id": user_id, "key": secrets.token_urlsafe(32)},
+    )
+    db.execute(
+        text(_SEED_SQL),
+        {"event_id": event_id, "first": FIRST_NAMES, "last": LAST_NAMES, "n": attendees},
+    )
+    db.commit()
+    # also clears dead entries of earlier runs out of the GIN index
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE attendees"))
+    return event_id
+
+
+def ilike_search(db: Session, event_id: uuid.UUID, q: str, limit: int) -> list[Attendee]:
+    like = f"%{q.strip()}%"
+    return list(
+        db.scalars(
+            select(Attendee)
+            .where(
+                Attendee.event_id == event_id,
+                or_(Attendee.full_name.ilike(like), Attendee.email.ilike(like)),
+            )
+            .order_by(Attendee.created_at.desc())
+            .limit(limit)
+        )
+    )
+
+
+def time_queries(db: Session, search, event_id: uuid.UUID, queries: list[str], rounds: int):
+    latencies = []
+    found = 0
+    for _ in range(rounds):
+        for q in random.sample(queries, len(queries)):
+            started = time.perf_counter()
+            found += len(search(db, event_id, q, 10))
+            latencies.append(time.perf_counter() - started)
+            db.rollback()
+    return {**summarize(latencies), "avg_results": found / len(latencies)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args()
+
+    results: dict = {"runs": {}}
+    with SessionLocal() as db:
+        results["pg_trgm"] = trigram_available(db)
+        for size in args.sizes:
+            started = time.perf_counter()
+            event_id = seed_event(db, size)
+            print(f"seeded {size:,} attendees in {time.perf_counter() - started:.1f}s")
+            try:
+                for kind, queries in QUERIES.items():
+                    for name, search in (("search", search_attendees), ("ilike", ilike_search)):
+                        key = f"{size}/{kind}/{name}"
+                        results["runs"][key] = time_queries(
+                            db, search, event_id, queries, args.rounds
+                        )
+            finally:
+                db.rollback()
+                db.execute(
+                    text(
+                        "DELETE FROM users WHERE id = "
+                        "(SELECT owner_user_id FROM events WHERE id = :id)"
+                    ),
+                    {"id": event_id},
+                )
+                db.commit()
+
+    print(f"pg_trgm: {'yes' if results['pg_trgm'] else 'no (typo queries find nothing)'}")
+    print(
+        f"{'size/kind/impl':<28} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'results':>8}"
+    )
+    for key, r in results["runs"].items():
+        print(
+            f"{key:<28} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+            f"{r['avg_results']:>8.1f}"
+        )
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
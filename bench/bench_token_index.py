@@ -0,0 +1,75 @@
+"""
+Measures the memory footprint of the in-memory token index (app.services.token_index).
+
+Builds one EventIndex of N synthetic attendees shaped like real ones
+(secrets.token_urlsafe(32) tokens, short names, a share already checked in)
+and reports the bytes allocated per attendee and per 100k attendees, plus
+the lookup rate. No database is needed.
+
+    python -m bench.bench_token_index --attendees 100000
+"""
+
+import argparse
+import json
+import secrets
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from app.services.token_index import EventIndex
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--attendees", type=int, default=100_000)
+    parser.add_argument("--checked-in", type=float, default=0.3, help="share already checked in")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    # generated up front so the tokens and names themselves are not measured twice
+    rows = [
+        (
+            secrets.token_urlsafe(32),
+            uuid.uuid4(),
+            f"Guest {i:08d}",
+            datetime.now(timezone.utc) if i < args.attendees * args.checked_in else None,
+        )
+        for i in range(args.attendees)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    index = EventIndex(uuid.uuid4(), uuid.uuid4())
+    for token, attendee_id, name, checked_in_at in rows:
+        # copies, so the index owns its strings like it does when loaded from Postgres
+        index.put("".join(token), attendee_id, "".join(name), checked_in_at)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(s.size_diff for s in after.compare_to(before, "filename"))
+
+    tokens = [r[0] for r in rows]
+    started = time.perf_counter()
+    for token in tokens:
+        index.get(token)
+    lookups_per_s = len(tokens) / (time.perf_counter() - started)
+
+    results = {
+        "attendees": args.attendees,
+        "bytes_total": allocated,
+        "bytes_per_attendee": allocated / args.attendees,
+        "mb_per_100k": allocated / args.attendees * 100_000 / 1_000_000,
+        "lookups_per_s": lookups_per_s,
+    }
+    print(f"attendees          {results['attendees']:>12,}")
+    print(f"allocated          {results['bytes_total'] / 1_000_000:>12.1f} MB")
+    print(f"per attendee       {results['bytes_per_attendee']:>12.0f} B")
+    print(f"per 100k attendees {results['mb_per_100k']:>12.1f} MB")
+    print(f"lookups            {results['lookups_per_s']:>12,.0f} /s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
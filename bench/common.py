@@ -0,0 +1,93 @@
+"""Helpers shared by the HTTP benchmarks: a throwaway server and a seeded event."""
+
+import os
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+
+import httpx
+
+# the benchmarks measure the request path, not the throttles in front of it; set these
+# in the environment or in `env` to benchmark with them
+_UNTHROTTLED = {
+    "RATE_LIMIT_CHECKIN": "",
+    "RATE_LIMIT_CHECKIN_BATCH": "",
+    "RATE_LIMIT_LOGIN": "",
+    "RATE_LIMIT_REGISTER": "",
+    "ADMISSION_MAX_IN_FLIGHT": "0",
+}
+# answers of the throttles, counted apart from errors
+THROTTLED = (429, 503)
+# bearer token of /metrics on servers started here; export METRICS_TOKEN for --url servers
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN") or "bench"
+
+
+def start_server(port: int, env: dict[str, str] | None = None) -> subprocess.Popen:
+    """
+    Starts a single-worker uvicorn on `port`, with `env` layered over
+    os.environ, and rate limits and admission control off unless either sets them.
+    """
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**_UNTHROTTLED, **os.environ, "METRICS_TOKEN": METRICS_TOKEN, **(env or {})},
+    )
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+@dataclass
+class Seeded:
+    access_token: str
+    event_id: str
+    scanner_key: str
+    qr_tokens: list[str]
+
+
+def seed(base_url: str, attendees: int) -> Seeded:
+    """Creates an owner, an event and its attendees through the API."""
+    with httpx.Client(base_url=base_url, timeout=60) as c:
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        c.post("/api/v1/auth/register", json={"email": email, "password": "Password123!"})
+        token = c.post(
+            "/api/v1/auth/login", json={"email": email, "password": "Password123!"}
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        event_id = c.post("/api/v1/events", json={"name": "bench"}, headers=headers).json()["id"]
+
+        tokens: list[str] = []
+        for start in range(0, attendees, 5000):
+            stop = min(start + 5000, attendees)
+            chunk = [{"full_name": f"Guest {i}"} for i in range(start, stop)]
+            r = c.post(
+                f"/api/v1/events/{event_id}/attendees/bulk",
+                json={"attendees": chunk},
+                headers=headers,
+            )
+            r.raise_for_status()
+            tokens.extend(a["qr_token"] for a in r.json())
+
+        scanner_key = c.get(f"/api/v1/events/{event_id}/scanner-key", headers=headers).json()[
+            "scanner_key"
+        ]
+        return Seeded(
+            access_token=token, event_id=event_id, scanner_key=scanner_key, qr_tokens=tokens
+        )